@@ -11,6 +11,7 @@ from .const import DOMAIN
 from .coordinator import SmartVentControllerCoordinator
 from . import script, automation
 from .device import async_create_room_devices, async_remove_room_devices
+from .topology import room_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,6 +36,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
 
     coordinator = SmartVentControllerCoordinator(hass, entry)
+    # Registered before anything can fail, so a failed setup releases them too.
+    entry.async_on_unload(coordinator.async_stop_tracking)
+    entry.async_on_unload(coordinator.async_close_samples)
     await coordinator.async_initialize()
     await coordinator.async_config_entry_first_refresh()
 
@@ -49,10 +53,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await script.async_setup_entry(hass, entry)
     await automation.async_setup_entry(hass, entry)
     await _async_register_services(hass, entry)
+    entry.async_on_unload(entry.add_update_listener(_async_entry_updated))
 
     return True
 
 
+async def _async_entry_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Let the coordinator react to changed rooms or options."""
+    coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if coordinator is None:
+        return
+    if coordinator.store.journal != bool(entry.options.get("store_journal", False)):
+        # The store's write mode is fixed when it is created; unloading
+        # flushes pending changes before the new store loads them.
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    coordinator.async_entry_updated()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload Smart Vent Controller entry."""
     try:
@@ -66,7 +84,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         coordinator = hass.data[DOMAIN].pop(entry.entry_id, None)
         if coordinator:
-            await coordinator.store.async_save()
+            await coordinator.store.async_flush()
 
     return unload_ok
 
@@ -78,9 +96,9 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry):
         room = call.data.get("room")
         priority = call.data.get("priority")
         rooms = list(entry.data.get("rooms", []))
+        key = room_key(room)
         for i, rc in enumerate(rooms):
-            key = rc.get("name", "").lower().replace(" ", "_")
-            if key == room.lower().replace(" ", "_"):
+            if room_key(rc.get("name", "")) == key:
                 rooms[i] = {**rc, "priority": priority}
                 break
         data = dict(entry.data)
@@ -95,12 +113,12 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry):
         if coordinator is None:
             _LOGGER.error("Coordinator not found for override_room")
             return
-        room_key = room.lower().replace(" ", "_")
-        coordinator.set_room_override(room_key, enabled, duration)
-        await coordinator.store.async_save()
+        key = room_key(room)
+        coordinator.set_room_override(key, enabled, duration)
+        coordinator.store.schedule_save()
         _LOGGER.info(
             "Room override %s for %s (%d min)",
-            "enabled" if enabled else "disabled", room_key, duration,
+            "enabled" if enabled else "disabled", key, duration,
         )
 
     async def reset_to_defaults(call):
@@ -142,7 +160,7 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry):
             payload = await hass.async_add_executor_job(_read)
         if payload:
             coordinator.store.import_efficiency(payload)
-            await coordinator.store.async_save()
+            coordinator.store.schedule_save()
             _LOGGER.info("Efficiency data imported")
 
     hass.services.async_register(DOMAIN, "set_room_priority", set_room_priority)
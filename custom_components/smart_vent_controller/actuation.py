@@ -0,0 +1,219 @@
+"""Confirmation tracking for vent position commands.
+
+A ``set_cover_position`` call only means the command was handed to the
+integration; the vent has moved once its ``current_position`` reports the
+target.  :class:`ActuationTracker` remembers every command in flight, is fed
+the vents' state changes by the coordinator, and records how long each
+confirmation took.  Until a command is confirmed or overdue the vent control
+script does not send the same target again; an overdue command is re-sent by
+the script's next run, with an exponentially growing deadline, and given up
+on after ``max_retries`` retries.  A vent that was given up on is left alone
+until its target changes or it reports a different position.
+"""
+from __future__ import annotations
+
+import bisect
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+# Upper bounds (seconds) of the confirmation latency histogram buckets.
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+SEND = "send"
+RETRY = "retry"
+IN_FLIGHT = "in_flight"
+ABANDONED = "abandoned"
+
+
+@dataclass(slots=True)
+class PendingCommand:
+    """A position command that has not been confirmed yet."""
+
+    target: int
+    sent_at: float
+    deadline: float
+    attempts: int = 1
+    # Last position the vent reported while the command was pending.
+    position: float | None = None
+
+
+class ActuationTracker:
+    """Vent commands in flight, their confirmations and latencies."""
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff: float = 2.0,
+        tolerance: int = 2,
+        on_result: Callable[[str, float, bool], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the tracker.
+
+        Args:
+            timeout: Seconds the first attempt may take to confirm
+            max_retries: Re-sends of an unconfirmed command before giving up
+            backoff: Factor the deadline grows by with every retry
+            tolerance: Position difference (percent) that still confirms
+            on_result: Called with (entity_id, latency, confirmed) whenever a
+                command is confirmed or given up on
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self._on_result = on_result
+        self._clock = clock
+        self.pending: dict[str, PendingCommand] = {}
+        # Given-up commands: entity -> (target, position when given up).
+        self.abandoned: dict[str, tuple[int, float | None]] = {}
+        self._histograms: dict[str, list[int]] = {}
+        self._latency_sums: dict[str, float] = {}
+        self.confirmed = 0
+        self.suppressed = 0
+        self.retries = 0
+        self.given_up = 0
+
+    def check(self, entity_id: str, target: int) -> str:
+        """Decide what to do about moving *entity_id* to *target*.
+
+        Returns :data:`SEND` for a new command, :data:`RETRY` for an overdue
+        command to re-send, :data:`IN_FLIGHT` if the same command is still
+        waiting for confirmation, or :data:`ABANDONED` if it was given up on.
+        """
+        abandoned = self.abandoned.get(entity_id)
+        if abandoned is not None:
+            if abandoned[0] == target:
+                return ABANDONED
+            del self.abandoned[entity_id]
+        command = self.pending.get(entity_id)
+        if command is None or command.target != target:
+            return SEND
+        if self._clock() < command.deadline:
+            self.suppressed += 1
+            return IN_FLIGHT
+        if command.attempts > self.max_retries:
+            self._give_up(entity_id, command)
+            return ABANDONED
+        return RETRY
+
+    def sent(self, entity_id: str, target: int) -> None:
+        """Record a command for *entity_id* as queued.
+
+        Re-sending the pending target counts as a retry and lengthens its
+        deadline; any other target replaces the pending command.
+        """
+        now = self._clock()
+        command = self.pending.get(entity_id)
+        if command is not None and command.target == target:
+            command.attempts += 1
+            command.sent_at = now
+            command.deadline = now + self._timeout_for(command.attempts)
+            self.retries += 1
+            return
+        self.pending[entity_id] = PendingCommand(
+            target, now, now + self._timeout_for(1)
+        )
+
+    def dispatched(self, entity_ids: Iterable[str]) -> None:
+        """Restart the clock of queued commands as they actually go out."""
+        now = self._clock()
+        for entity_id in entity_ids:
+            command = self.pending.get(entity_id)
+            if command is not None:
+                command.sent_at = now
+                command.deadline = now + self._timeout_for(command.attempts)
+
+    def failed(self, entity_ids: Iterable[str]) -> None:
+        """Forget commands whose service call failed (nothing is in flight)."""
+        for entity_id in entity_ids:
+            self.pending.pop(entity_id, None)
+
+    def observe(self, entity_id: str, position: Any) -> bool:
+        """Confirm the pending command of *entity_id* if it reached *position*.
+
+        A given-up vent that reports a different position is released, so
+        its target may be sent again.
+        """
+        try:
+            position = float(position)
+        except (TypeError, ValueError):
+            return False
+        abandoned = self.abandoned.get(entity_id)
+        if abandoned is not None:
+            target, last = abandoned
+            if last is None:
+                self.abandoned[entity_id] = (target, position)
+            elif abs(position - last) > self.tolerance:
+                del self.abandoned[entity_id]
+            return False
+        command = self.pending.get(entity_id)
+        if command is None:
+            return False
+        if abs(position - command.target) > self.tolerance:
+            command.position = position
+            return False
+        del self.pending[entity_id]
+        latency = max(0.0, self._clock() - command.sent_at)
+        self.confirmed += 1
+        histogram = self._histograms.get(entity_id)
+        if histogram is None:
+            histogram = self._histograms[entity_id] = [0] * (len(LATENCY_BUCKETS) + 1)
+        histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self._latency_sums[entity_id] = self._latency_sums.get(entity_id, 0.0) + latency
+        if self._on_result is not None:
+            self._on_result(entity_id, latency, True)
+        return True
+
+    def forget(self, keep: Iterable[str]) -> None:
+        """Drop pending commands and histograms of vents not in *keep*."""
+        keep = set(keep)
+        for entity_id in [e for e in self.pending if e not in keep]:
+            del self.pending[entity_id]
+        for entity_id in [e for e in self.abandoned if e not in keep]:
+            del self.abandoned[entity_id]
+        for entity_id in [e for e in self._histograms if e not in keep]:
+            del self._histograms[entity_id]
+            self._latency_sums.pop(entity_id, None)
+
+    def _timeout_for(self, attempt: int) -> float:
+        return self.timeout * self.backoff ** (attempt - 1)
+
+    def _give_up(self, entity_id: str, command: PendingCommand) -> None:
+        del self.pending[entity_id]
+        self.abandoned[entity_id] = (command.target, command.position)
+        self.given_up += 1
+        if self._on_result is not None:
+            self._on_result(entity_id, self._clock() - command.sent_at, False)
+
+    def latency_histogram(self, entity_id: str) -> dict[str, int]:
+        """Confirmation latency bucket counts of one vent."""
+        counts = self._histograms.get(entity_id, [0] * (len(LATENCY_BUCKETS) + 1))
+        buckets = {f"le_{bound:g}s": count for bound, count in zip(LATENCY_BUCKETS, counts)}
+        buckets["inf"] = counts[-1]
+        return buckets
+
+    def stats(self) -> dict[str, Any]:
+        """Counters plus per-vent confirmation latency histograms."""
+        return {
+            "in_flight": len(self.pending),
+            "confirmed": self.confirmed,
+            "duplicates_suppressed": self.suppressed,
+            "retries": self.retries,
+            "given_up": self.given_up,
+            "abandoned": len(self.abandoned),
+            "vents": {
+                entity_id: {
+                    "confirmations": sum(counts),
+                    "latency_avg_ms": round(
+                        self._latency_sums[entity_id] / sum(counts) * 1000, 1
+                    ),
+                    "histogram": self.latency_histogram(entity_id),
+                }
+                for entity_id, counts in self._histograms.items()
+            },
+        }
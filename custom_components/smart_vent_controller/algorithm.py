@@ -5,9 +5,14 @@ and operate on plain data structures for testability.
 """
 from __future__ import annotations
 
+import heapq
 import math
+import time
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import time as dt_time
+from functools import lru_cache
+from operator import itemgetter
 
 
 @dataclass(frozen=True)
@@ -33,6 +38,81 @@ class AlgorithmSettings:
 DEFAULT_SETTINGS = AlgorithmSettings()
 
 
+class RoomBatch:
+    """Per-room algorithm inputs stored as parallel columns.
+
+    Accepted wherever the algorithm functions take a list of room dicts;
+    building one avoids allocating a dict per room on every run.  Column
+    defaults match the dict keys' defaults (``temp`` None, ``rate`` 0.0,
+    ``active`` True, ``delta`` 0.0, ``occupied`` False, ``priority`` 5).
+    """
+
+    __slots__ = ("keys", "temps", "rates", "active", "deltas", "occupied", "priorities")
+
+    def __init__(self) -> None:
+        self.keys: list[str] = []
+        self.temps: list[float | None] = []
+        self.rates: list[float] = []
+        self.active: list[bool] = []
+        self.deltas: list[float] = []
+        self.occupied: list[bool] = []
+        self.priorities: list[float] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def append(
+        self,
+        key: str,
+        temp: float | None,
+        rate: float = 0.0,
+        active: bool = True,
+        delta: float = 0.0,
+        occupied: bool = False,
+        priority: float = 5,
+    ) -> None:
+        """Add one room to the end of every column."""
+        self.keys.append(key)
+        self.temps.append(temp)
+        self.rates.append(rate)
+        self.active.append(active)
+        self.deltas.append(delta)
+        self.occupied.append(occupied)
+        self.priorities.append(priority)
+
+    def row(self, index: int) -> dict:
+        """Return room *index* in the legacy dict form."""
+        return {
+            "key": self.keys[index],
+            "temp": self.temps[index],
+            "rate": self.rates[index],
+            "active": self.active[index],
+            "delta": self.deltas[index],
+            "occupied": self.occupied[index],
+            "priority": self.priorities[index],
+        }
+
+    @classmethod
+    def from_dicts(cls, rooms: list[dict]) -> RoomBatch:
+        """Build a batch from legacy per-room dicts."""
+        batch = cls()
+        for room in rooms:
+            batch.append(
+                room.get("key", ""),
+                room.get("temp"),
+                room.get("rate", 0.0),
+                room.get("active", True),
+                room.get("delta", 0),
+                room.get("occupied", False),
+                room.get("priority", 5),
+            )
+        return batch
+
+
+def _as_batch(rooms: RoomBatch | list[dict]) -> RoomBatch:
+    return rooms if isinstance(rooms, RoomBatch) else RoomBatch.from_dicts(rooms)
+
+
 def round_to_granularity(value: float, granularity: int) -> int:
     """Round a vent position to the nearest allowed increment."""
     if granularity <= 0:
@@ -41,6 +121,42 @@ def round_to_granularity(value: float, granularity: int) -> int:
     return max(0, min(100, rounded))
 
 
+def round_plan_to_granularity(
+    targets: dict[str, float], granularity: int
+) -> dict[str, int]:
+    """Round a whole vent plan to the allowed increments without losing flow.
+
+    Every room is first rounded down to its increment; the flow lost that
+    way is then handed back one step at a time to the rooms with the largest
+    remainders (largest-remainder apportionment).  Each room ends within one
+    step of its continuous target and the plan's total open % is never below
+    the continuous total, so a plan that met ``min_combined_vent_flow``
+    before rounding still meets it afterwards.
+
+    Returns ``{room_key: position}``.
+    """
+    step = granularity if granularity > 0 else 1
+    plan: dict[str, int] = {}
+    remainders: list[tuple[float, int, str, int]] = []
+    lost = 0.0
+    for order, (key, value) in enumerate(targets.items()):
+        value = max(0.0, min(100.0, value))
+        low = min(100, int(value // step) * step)
+        plan[key] = low
+        if value > low:
+            high = min(100, low + step)
+            lost += value - low
+            remainders.append(((value - low) / (high - low), order, key, high))
+
+    remainders.sort(key=lambda item: (-item[0], item[1]))
+    for _, _, key, high in remainders:
+        if lost <= 1e-9:
+            break
+        lost -= high - plan[key]
+        plan[key] = high
+    return plan
+
+
 def is_night_time(
     now: dt_time,
     night_start: dt_time = dt_time(22, 0),
@@ -109,6 +225,81 @@ def compute_efficiency_sample(
     return max(normalised, settings.min_temp_change_rate)
 
 
+# Largest exponent math.exp accepts; anything above it saturates at 100%.
+_MAX_EXP_ARG = 709.0
+
+
+class ExponentialTable:
+    """Piecewise-linear lookup of the exponential vent model.
+
+    Tabulates ``min(100, base_const * exp(ratio * exp_const) * 100)`` over
+    ``0 <= ratio <= ratio_limit``, the ratio at which the model reaches 100 %.
+    Linear interpolation of a convex function errs by at most
+    ``step**2 / 8 * max|f''|`` and ``f'' = exp_const**2 * f <= 100 * exp_const**2``
+    on that domain, so the step is chosen to keep every lookup within
+    *max_error* percentage points of the exact model.
+
+    Use :func:`exponential_table` to get a cached instance per settings.
+    """
+
+    __slots__ = (
+        "settings", "max_error", "ratio_limit", "step", "_inv_step", "_values", "_slopes"
+    )
+
+    def __init__(
+        self, settings: AlgorithmSettings = DEFAULT_SETTINGS, max_error: float = 0.01
+    ) -> None:
+        base_const = settings.base_const
+        exp_const = settings.exp_const
+        if max_error <= 0:
+            raise ValueError("max_error must be positive")
+        if base_const <= 0 or exp_const <= 0:
+            raise ValueError("lookup table needs positive base_const and exp_const")
+
+        self.settings = settings
+        self.max_error = max_error
+        self.ratio_limit = max(0.0, math.log(1.0 / base_const) / exp_const)
+        max_step = math.sqrt(8.0 * max_error / (100.0 * exp_const * exp_const))
+        intervals = max(1, math.ceil(self.ratio_limit / max_step))
+        self.step = self.ratio_limit / intervals or max_step
+        self._inv_step = 1.0 / self.step
+        values = [
+            min(100.0, base_const * math.exp(i * self.step * exp_const) * 100.0)
+            for i in range(intervals + 1)
+        ]
+        # Sentinel so a ratio rounding onto the last knot can still interpolate.
+        values.append(values[-1])
+        self._values = values
+        # Per-interval slope (per unit of ratio * inv_step), so a lookup is
+        # one multiply-add.
+        self._slopes = [b - a for a, b in zip(values, values[1:])] + [0.0]
+
+    def __len__(self) -> int:
+        return len(self._values) - 1
+
+    def __call__(self, ratio: float) -> float:
+        """Vent % for a needed/achievable rate *ratio* (>= 0)."""
+        if ratio >= self.ratio_limit:
+            return 100.0
+        if ratio <= 0.0:
+            return self._values[0]
+        position = ratio * self._inv_step
+        index = int(position)
+        return self._values[index] + self._slopes[index] * (position - index)
+
+
+@lru_cache(maxsize=8)
+def exponential_table(
+    settings: AlgorithmSettings = DEFAULT_SETTINGS, max_error: float = 0.01
+) -> ExponentialTable:
+    """Return the shared :class:`ExponentialTable` for *settings*.
+
+    Settings are frozen, so a change of settings is a new cache key and
+    gets a freshly built table.
+    """
+    return ExponentialTable(settings, max_error)
+
+
 def calculate_vent_target(
     current_temp: float,
     setpoint: float,
@@ -116,18 +307,31 @@ def calculate_vent_target(
     longest_time: float,
     hvac_mode: str,
     settings: AlgorithmSettings = DEFAULT_SETTINGS,
+    table: ExponentialTable | None = None,
 ) -> float:
     """Calculate an ideal vent open percentage for one room (exponential model).
 
+    With *table* (built from the same *settings*) the exponential is looked
+    up instead of evaluated (within ``table.max_error`` of the exact value).
+    The settings check on every call costs more than the lookup saves, so a
+    table only speeds up :func:`calculate_targets_batch`.
+
     Returns a float 0..100.
     """
+    if table is not None and table.settings != settings:
+        raise ValueError("table was built from different settings")
     if has_reached_setpoint(hvac_mode, setpoint, current_temp):
         return 0.0
     if efficiency_rate <= 0 or longest_time <= 0:
         return 100.0
 
     target_rate = abs(setpoint - current_temp) / longest_time
-    pct = settings.base_const * math.exp((target_rate / efficiency_rate) * settings.exp_const)
+    if table is not None:
+        return table(target_rate / efficiency_rate)
+    exponent = (target_rate / efficiency_rate) * settings.exp_const
+    if exponent > _MAX_EXP_ARG:
+        return 100.0
+    pct = settings.base_const * math.exp(exponent)
     return max(0.0, min(100.0, pct * 100.0))
 
 
@@ -150,22 +354,21 @@ def calculate_linear_target(
 
 
 def calculate_longest_time_to_target(
-    rooms: list[dict],
+    rooms: RoomBatch | list[dict],
     hvac_mode: str,
     setpoint: float,
     max_running_minutes: float = 60.0,
 ) -> float:
     """Find the longest estimated minutes-to-setpoint across active rooms.
 
-    Each room dict must contain keys: ``temp`` (float), ``rate`` (float),
-    ``active`` (bool, optional, default True).
+    *rooms* is a :class:`RoomBatch` or a list of dicts with keys ``temp``
+    (float), ``rate`` (float), ``active`` (bool, optional, default True).
     """
+    batch = _as_batch(rooms)
     longest = -1.0
-    for room in rooms:
-        if not room.get("active", True):
+    for temp, rate, active in zip(batch.temps, batch.rates, batch.active):
+        if not active:
             continue
-        temp = room.get("temp")
-        rate = room.get("rate", 0.0)
         if temp is None or rate <= 0:
             continue
         if has_reached_setpoint(hvac_mode, setpoint, temp):
@@ -176,57 +379,161 @@ def calculate_longest_time_to_target(
     return longest
 
 
+def calculate_targets_batch(
+    temps: Sequence[float | None],
+    rates: Sequence[float],
+    active: Sequence[bool],
+    hvac_mode: str,
+    setpoint: float,
+    longest_time: float,
+    strategy: str = "simple",
+    settings: AlgorithmSettings = DEFAULT_SETTINGS,
+    table: ExponentialTable | None = None,
+) -> list[float]:
+    """Compute target vent % for parallel columns of room inputs in one pass.
+
+    Column-oriented equivalent of calling :func:`calculate_vent_target` /
+    :func:`calculate_linear_target` per room: the setpoint check and the
+    rate ratio are evaluated once per room, and the exponential only when
+    the strategy needs it.  Results are identical to the scalar functions.
+    An optional *table* (built from the same *settings*) replaces the
+    exponential with a lookup.
+
+    Returns a list of floats 0..100 aligned with the input columns.
+    """
+    if table is not None and table.settings != settings:
+        raise ValueError("table was built from different settings")
+    cooling = hvac_mode in ("cool", "cooling")
+    use_exp = strategy in ("learned", "hybrid")
+    use_lin = strategy != "learned"
+    hybrid = strategy == "hybrid"
+    base_const = settings.base_const
+    exp_const = settings.exp_const
+    exp = math.exp
+    if table is not None:
+        # The lookup is inlined below; these are its only inputs.
+        ratio_limit = table.ratio_limit
+        inv_step = table._inv_step
+        values = table._values
+        slopes = table._slopes
+
+    targets: list[float] = []
+    append = targets.append
+    for temp, rate, is_active in zip(temps, rates, active):
+        if not is_active:
+            append(0.0)
+            continue
+        if temp is None:
+            append(100.0)
+            continue
+        if (temp <= setpoint) if cooling else (temp >= setpoint):
+            append(0.0)
+            continue
+        if rate <= 0 or longest_time <= 0:
+            append(100.0)
+            continue
+
+        ratio = (abs(setpoint - temp) / longest_time) / rate
+        if use_exp:
+            if table is not None:
+                if ratio >= ratio_limit:
+                    exp_pct = 100.0
+                else:
+                    position = ratio * inv_step
+                    index = int(position)
+                    exp_pct = values[index] + slopes[index] * (position - index)
+            else:
+                exponent = ratio * exp_const
+                if exponent > _MAX_EXP_ARG:
+                    exp_pct = 100.0
+                else:
+                    exp_pct = max(0.0, min(100.0, base_const * exp(exponent) * 100.0))
+        if use_lin:
+            lin_pct = max(0.0, min(100.0, ratio * 100.0))
+
+        if hybrid:
+            append((exp_pct + lin_pct) / 2.0)
+        elif use_exp:
+            append(exp_pct)
+        else:
+            append(lin_pct)
+    return targets
+
+
 def calculate_all_vent_targets(
-    rooms: list[dict],
+    rooms: RoomBatch | list[dict],
     hvac_mode: str,
     setpoint: float,
     longest_time: float,
     strategy: str = "simple",
     settings: AlgorithmSettings = DEFAULT_SETTINGS,
+    table: ExponentialTable | None = None,
 ) -> dict[str, float]:
     """Compute target vent % for every room.
 
-    Each room dict must have: ``key`` (str), ``temp`` (float),
-    ``rate`` (float), ``active`` (bool, default True).
+    *rooms* is a :class:`RoomBatch` or a list of dicts with ``key`` (str),
+    ``temp`` (float), ``rate`` (float), ``active`` (bool, default True).
+    *table* is passed through to :func:`calculate_targets_batch`.
 
     Returns ``{room_key: target_pct}``.
     """
-    targets: dict[str, float] = {}
-    for room in rooms:
-        key = room["key"]
-        temp = room.get("temp")
-        rate = room.get("rate", 0.0)
-        active = room.get("active", True)
+    batch = _as_batch(rooms)
+    values = calculate_targets_batch(
+        batch.temps,
+        batch.rates,
+        batch.active,
+        hvac_mode,
+        setpoint,
+        longest_time,
+        strategy,
+        settings,
+        table,
+    )
+    return dict(zip(batch.keys, values))
+
+
+def _airflow_deficit(
+    targets: dict[str, float],
+    batch: RoomBatch,
+    conventional_vent_count: int,
+    settings: AlgorithmSettings,
+) -> tuple[list[int], float]:
+    """Return active room indices and the total % still needed for minimum flow."""
+    total_devices = conventional_vent_count
+    flow_sum = conventional_vent_count * settings.standard_vent_default_open
 
+    active_idx: list[int] = []
+    for index, (key, active) in enumerate(zip(batch.keys, batch.active)):
         if not active:
-            targets[key] = 0.0
-            continue
-        if temp is None:
-            targets[key] = 100.0
             continue
+        active_idx.append(index)
+        total_devices += 1
+        flow_sum += targets.get(key, 0.0)
 
-        if strategy == "learned":
-            targets[key] = calculate_vent_target(
-                temp, setpoint, rate, longest_time, hvac_mode, settings
-            )
-        elif strategy == "hybrid":
-            exp_target = calculate_vent_target(
-                temp, setpoint, rate, longest_time, hvac_mode, settings
-            )
-            lin_target = calculate_linear_target(
-                temp, setpoint, rate, longest_time, hvac_mode
-            )
-            targets[key] = (exp_target + lin_target) / 2.0
-        else:
-            targets[key] = calculate_linear_target(
-                temp, setpoint, rate, longest_time, hvac_mode
-            )
-    return targets
+    if total_devices <= 0:
+        return active_idx, 0.0
+    if flow_sum / total_devices >= settings.min_combined_vent_flow:
+        return active_idx, 0.0
+    return active_idx, settings.min_combined_vent_flow * total_devices - flow_sum
+
+
+def _airflow_weights(
+    batch: RoomBatch, active_idx: list[int], hvac_mode: str
+) -> list[float]:
+    """Temperature-proportional boost weights (neediest room ~1.0, floor 0.1)."""
+    column = batch.temps
+    temps = [70.0 if column[i] is None else column[i] for i in active_idx]
+    min_temp = min(temps) - 0.1
+    max_temp = max(temps) + 0.1
+    temp_range = max_temp - min_temp if max_temp != min_temp else 1.0
+    if hvac_mode in ("cool", "cooling"):
+        return [max((temp - min_temp) / temp_range, 0.1) for temp in temps]
+    return [max((max_temp - temp) / temp_range, 0.1) for temp in temps]
 
 
 def adjust_for_minimum_airflow(
     targets: dict[str, float],
-    rooms: list[dict],
+    rooms: RoomBatch | list[dict],
     hvac_mode: str,
     conventional_vent_count: int = 0,
     settings: AlgorithmSettings = DEFAULT_SETTINGS,
@@ -235,52 +542,72 @@ def adjust_for_minimum_airflow(
 
     Modifies and returns *targets* in-place.  Rooms that need more conditioning
     (colder in heating, warmer in cooling) get proportionally more boost.
+
+    Solved in closed form by proportional water-filling: every active room is
+    raised by ``level * weight`` where *level* is the single value that covers
+    the deficit once rooms saturating at 100% are taken out.  The result is
+    independent of room order and costs O(n log n).
     """
-    total_devices = conventional_vent_count
-    flow_sum = conventional_vent_count * settings.standard_vent_default_open
+    batch = _as_batch(rooms)
+    active_idx, needed = _airflow_deficit(
+        targets, batch, conventional_vent_count, settings
+    )
+    if needed <= 0 or not active_idx:
+        return targets
 
-    active_keys: list[str] = []
-    for room in rooms:
-        if not room.get("active", True):
-            continue
-        key = room["key"]
-        active_keys.append(key)
-        total_devices += 1
-        flow_sum += targets.get(key, 0.0)
+    keys = [batch.keys[i] for i in active_idx]
+    weights = _airflow_weights(batch, active_idx, hvac_mode)
+    headroom = [max(0.0, 100.0 - targets.get(key, 0.0)) for key in keys]
+
+    # Rooms saturate in order of headroom / weight; walk that order until the
+    # remaining unsaturated weight can absorb the rest of the deficit.
+    order = sorted(range(len(keys)), key=lambda i: headroom[i] / weights[i])
+    weight_left = sum(weights)
+    saturated = 0.0
+    level = math.inf
+    for i in order:
+        if saturated + headroom[i] / weights[i] * weight_left >= needed:
+            level = (needed - saturated) / weight_left
+            break
+        saturated += headroom[i]
+        weight_left -= weights[i]
+
+    for key, weight, room_headroom in zip(keys, weights, headroom):
+        targets[key] = min(100.0, targets.get(key, 0.0) + min(room_headroom, level * weight))
+    return targets
 
-    if total_devices <= 0:
-        return targets
 
-    avg_flow = flow_sum / total_devices
-    if avg_flow >= settings.min_combined_vent_flow:
-        return targets
+def adjust_for_minimum_airflow_iterative(
+    targets: dict[str, float],
+    rooms: RoomBatch | list[dict],
+    hvac_mode: str,
+    conventional_vent_count: int = 0,
+    settings: AlgorithmSettings = DEFAULT_SETTINGS,
+) -> dict[str, float]:
+    """Original incremental airflow boost, kept for comparison and regression.
 
-    needed = settings.min_combined_vent_flow * total_devices - flow_sum
-    temps = [r.get("temp", 70.0) for r in rooms if r["key"] in active_keys]
-    if not temps:
+    Bumps every active room by ``increment_pct * weight`` per pass for up to
+    ``max_iterations`` passes, so the result overshoots by up to one bump
+    and depends on room order.  Modifies and returns *targets* in-place.
+    """
+    batch = _as_batch(rooms)
+    active_idx, needed = _airflow_deficit(
+        targets, batch, conventional_vent_count, settings
+    )
+    if needed <= 0 or not active_idx:
         return targets
-    min_temp = min(temps) - 0.1
-    max_temp = max(temps) + 0.1
-    temp_range = max_temp - min_temp if max_temp != min_temp else 1.0
+
+    keys = [batch.keys[i] for i in active_idx]
+    weights = _airflow_weights(batch, active_idx, hvac_mode)
 
     iterations = 0
     while needed > 0 and iterations < settings.max_iterations:
         iterations += 1
-        for room in rooms:
-            key = room["key"]
-            if key not in active_keys:
-                continue
+        for key, weight in zip(keys, weights):
             current = targets.get(key, 0.0)
             if current >= 100:
                 continue
-            temp = room.get("temp", 70.0)
-
-            if hvac_mode in ("cool", "cooling"):
-                proportion = (temp - min_temp) / temp_range
-            else:
-                proportion = (max_temp - temp) / temp_range
-
-            bump = settings.increment_pct * max(proportion, 0.1)
+            bump = settings.increment_pct * weight
             targets[key] = min(100.0, current + bump)
             needed -= bump
             if needed <= 0:
@@ -289,6 +616,92 @@ def adjust_for_minimum_airflow(
     return targets
 
 
+def _next_position(position: int, granularity: int) -> int:
+    """Next allowed vent position above *position* (100 is always allowed)."""
+    return min(100, (position // granularity + 1) * granularity)
+
+
+def solve_vent_plan(
+    ideal: dict[str, float],
+    floors: dict[str, float],
+    rooms: RoomBatch | list[dict],
+    hvac_mode: str,
+    granularity: int,
+    conventional_vent_count: int = 0,
+    settings: AlgorithmSettings = DEFAULT_SETTINGS,
+    time_budget: float | None = None,
+) -> dict[str, int]:
+    """Solve floors, minimum airflow and granularity as one integer plan.
+
+    *ideal* holds the unconstrained targets (rooms without one are treated as
+    0%) and *floors* the per-room lower bounds (min-open, relief,
+    selected-room minimums).  Positions are
+    restricted to multiples of *granularity* (plus 100).  Each room starts at
+    the allowed position nearest its ideal, clamped to its floor; any airflow
+    deficit is then covered one step at a time by the room whose step adds
+    the least weighted squared deviation per % of flow, with the same
+    temperature weighting as :func:`adjust_for_minimum_airflow`.  The result
+    always satisfies every constraint that can be satisfied.
+
+    If *time_budget* (seconds) runs out, the remaining deficit is covered by
+    opening rooms fully in cost order, which stays feasible but not minimal.
+
+    Returns ``{room_key: position}``.
+    """
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    step = granularity if granularity > 0 else 1
+    batch = _as_batch(rooms)
+
+    plan: dict[str, int] = {}
+    for key in (*ideal, *batch.keys):
+        if key in plan:
+            continue
+        lower = max(0.0, min(100.0, floors.get(key, 0.0)))
+        floor_pos = min(100, math.ceil(lower / step - 1e-9) * step)
+        plan[key] = max(round_to_granularity(ideal.get(key, 0.0), step), floor_pos)
+
+    active_idx, needed = _airflow_deficit(
+        plan, batch, conventional_vent_count, settings
+    )
+    needed -= 1e-9
+    if needed <= 0 or not active_idx:
+        return plan
+
+    weights = _airflow_weights(batch, active_idx, hvac_mode)
+
+    def step_cost(key: str, weight: float) -> tuple[float, int]:
+        current = plan[key]
+        nxt = _next_position(current, step)
+        target = ideal.get(key, 0.0)
+        delta = (nxt - target) ** 2 - (current - target) ** 2
+        return delta / weight / (nxt - current), nxt
+
+    heap: list[tuple[float, int, str, float, int]] = []
+    for order, (index, weight) in enumerate(zip(active_idx, weights)):
+        key = batch.keys[index]
+        if plan[key] < 100:
+            cost, nxt = step_cost(key, weight)
+            heap.append((cost, order, key, weight, nxt))
+    heapq.heapify(heap)
+
+    while needed > 0 and heap:
+        if deadline is not None and time.monotonic() > deadline:
+            for _, _, key, _, _ in sorted(heap):
+                needed -= 100 - plan[key]
+                plan[key] = 100
+                if needed <= 0:
+                    break
+            break
+        _, order, key, weight, nxt = heapq.heappop(heap)
+        needed -= nxt - plan[key]
+        plan[key] = nxt
+        if nxt < 100:
+            cost, nxt = step_cost(key, weight)
+            heapq.heappush(heap, (cost, order, key, weight, nxt))
+
+    return plan
+
+
 def compute_simple_targets(
     rooms_data: list[dict],
     selected_keys: list[str],
@@ -310,8 +723,35 @@ def compute_simple_targets(
     return targets
 
 
+def relief_active_mode(hvac_mode: str, hvac_action: str) -> str:
+    """Direction relief is judged in: the running action, else the mode."""
+    return hvac_action if hvac_action in ("heating", "cooling") else hvac_mode
+
+
+def is_relief_candidate(delta: float, active_mode: str) -> bool:
+    """True if a room with *delta* (target - current) doesn't need conditioning."""
+    if active_mode in ("heat", "heating") and delta > 0:
+        # Room is below target in heating — still needs heat
+        return False
+    if active_mode in ("cool", "cooling") and delta < 0:
+        # Room is above target in cooling — still needs cooling
+        return False
+    return True
+
+
+def relief_score(delta: float, occupied: bool, priority: float) -> float:
+    """Relief ranking score; higher is a better relief candidate.
+
+    Occupied rooms (+10000) beat priority (+priority*100), which beats
+    closeness to setpoint (rooms with the smallest |delta| cost the least
+    energy to open).
+    """
+    occ_rank = 10000.0 if occupied else 0.0
+    return occ_rank + priority * 100.0 - abs(delta)
+
+
 def select_relief_rooms(
-    rooms_data: list[dict],
+    rooms_data: RoomBatch | list[dict],
     selected_keys: list[str],
     hvac_mode: str,
     hvac_action: str,
@@ -322,40 +762,22 @@ def select_relief_rooms(
     Relief rooms absorb back-pressure when too many vents are restricted.
     Candidates are rooms not currently selected for conditioning whose
     temperature delta indicates they don't need conditioning in the current
-    direction.
-
-    Scoring (higher = better relief candidate):
-      - Occupied rooms preferred (they benefit from airflow): +10000
-      - Higher priority rooms preferred: +priority*100
-      - Rooms closest to satisfied (smallest |delta|) preferred
+    direction (:func:`is_relief_candidate`), ranked by :func:`relief_score`.
 
-    Returns up to *max_relief* room dicts sorted by descending score.
+    Returns up to *max_relief* room dicts sorted by descending score (the
+    caller's own dicts for list input, :meth:`RoomBatch.row` for a batch).
+    Ties keep input order.
     """
-    active_mode = hvac_action if hvac_action in ("heating", "cooling") else hvac_mode
-    candidates: list[dict] = []
-    for room in rooms_data:
-        key = room.get("key", "")
-        if key in selected_keys:
-            continue
-        delta = room.get("delta", 0)
-        # Only consider rooms that don't need conditioning in the current direction
-        if active_mode in ("heat", "heating") and delta > 0:
-            # Room is below target in heating — still needs heat, skip
-            continue
-        if active_mode in ("cool", "cooling") and delta < 0:
-            # Room is above target in cooling — still needs cooling, skip
-            continue
-        candidates.append(room)
-
-    scored: list[tuple[float, dict]] = []
-    for room in candidates:
-        occ_rank = 10000.0 if room.get("occupied", False) else 0.0
-        priority_rank = room.get("priority", 5) * 100.0
-        # Rooms with smallest absolute delta are best relief candidates
-        # (they're closest to satisfied, so opening vents costs least energy)
-        temp_rank = -abs(room.get("delta", 0))
-        score = occ_rank + priority_rank + temp_rank
-        scored.append((score, room))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [room for _, room in scored[:max_relief]]
+    batch = _as_batch(rooms_data)
+    active_mode = relief_active_mode(hvac_mode, hvac_action)
+    selected = set(selected_keys)
+
+    scored = (
+        (relief_score(delta, batch.occupied[index], batch.priorities[index]), index)
+        for index, (key, delta) in enumerate(zip(batch.keys, batch.deltas))
+        if key not in selected and is_relief_candidate(delta, active_mode)
+    )
+    best = heapq.nlargest(max_relief, scored, key=itemgetter(0))
+    if isinstance(rooms_data, RoomBatch):
+        return [batch.row(index) for _, index in best]
+    return [rooms_data[index] for _, index in best]
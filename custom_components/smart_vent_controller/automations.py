@@ -104,21 +104,23 @@ class SmartVentConditionerAutomation:
         if coordinator is None:
             return
 
-        rooms_csv = coordinator.get_rooms_to_condition_value()
+        # One snapshot for the whole run so both scripts see the same readings.
+        snapshot = coordinator.refresh_snapshot()
+        rooms_csv = coordinator.get_rooms_to_condition_value(snapshot)
         if rooms_csv in ("", "none", "unknown", "unavailable"):
             rooms_csv = ""
 
         auto_vent = self.entry.options.get("auto_vent_control", True)
         if auto_vent:
             try:
-                await self.vent_script.async_run(rooms_csv)
+                await self.vent_script.async_run(rooms_csv, snapshot)
             except Exception as exc:
                 _LOGGER.error("Error in vent control: %s", exc, exc_info=True)
 
         auto_thermo = self.entry.options.get("auto_thermostat_control", True)
         if auto_thermo and rooms_csv:
             try:
-                await self.thermostat_script.async_run(rooms_csv)
+                await self.thermostat_script.async_run(rooms_csv, snapshot)
             except Exception as exc:
                 _LOGGER.error("Error in thermostat control: %s", exc, exc_info=True)
 
@@ -224,7 +226,7 @@ class ClearManualOverrideAutomation:
             return
 
         coordinator.store.last_thermostat_setpoint = float(current_setpoint)
-        await coordinator.store.async_save()
+        coordinator.store.schedule_save()
         _LOGGER.info(
             "Manual override cleared after cycle completion. Resuming auto control."
         )
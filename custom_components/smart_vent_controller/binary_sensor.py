@@ -20,14 +20,12 @@ async def async_setup_entry(
 ) -> None:
     """Set up Smart Vent Controller binary sensors."""
     coordinator: SmartVentControllerCoordinator = hass.data[DOMAIN][entry.entry_id]
-    rooms = entry.data.get("rooms", [])
-
     entities: list[BinarySensorEntity] = []
 
-    for room in rooms:
-        room_name = room.get("name", "")
-        room_key = room_name.lower().replace(" ", "_")
-        occ_sensor = room.get("occupancy_sensor", "")
+    for room in coordinator.topology:
+        room_key = room.key
+        room_name = room.name
+        occ_sensor = room.occupancy_sensor
 
         if occ_sensor:
             entities.append(
@@ -72,7 +70,7 @@ class RoomOccupiedRecentSensor(BinarySensorEntity):
 
     @property
     def is_on(self):
-        occ_state = self.coordinator.hass.states.get(self._occ_sensor)
+        occ_state = self.coordinator.get_state(self._occ_sensor)
         if not occ_state or occ_state.state != "on":
             return False
 
@@ -113,7 +111,9 @@ class RoomConditioningActiveSensor(BinarySensorEntity):
 
     @property
     def is_on(self):
-        csv = self.coordinator.get_rooms_to_condition_value()
+        csv = self.coordinator.get_rooms_to_condition_value(
+            self.coordinator.snapshot
+        )
         if csv in ("none", ""):
             return False
         return self._room_key in csv.split(",")
@@ -170,7 +170,7 @@ class ThermostatManualOverrideSensor(BinarySensorEntity):
         main = self._entry.data.get("main_thermostat")
         if not main or not self._entry.options.get("auto_thermostat_control", True):
             return False
-        thermo = self.coordinator.hass.states.get(main)
+        thermo = self.coordinator.get_state(main)
         if not thermo:
             return False
         current = thermo.attributes.get("temperature")
@@ -189,7 +189,7 @@ class ThermostatManualOverrideSensor(BinarySensorEntity):
         main = self._entry.data.get("main_thermostat")
         if not main:
             return {}
-        thermo = self.coordinator.hass.states.get(main)
+        thermo = self.coordinator.get_state(main)
         if not thermo:
             return {}
         current = thermo.attributes.get("temperature", 0)
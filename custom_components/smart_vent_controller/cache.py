@@ -1,25 +1,70 @@
-"""Caching utilities for Smart Vent Controller."""
+"""Caching utilities for Smart Vent Controller.
 
-from typing import Any, Optional
-from datetime import datetime, timedelta
-from collections import defaultdict
-from homeassistant.util import dt as dt_util
+The coordinator keeps a :class:`RoomDataCache` of per-room snapshots and an
+:class:`EntityStateCache` of state objects.  Both are invalidated by
+state-change events for the tracked entities, so they are created without a
+TTL and a cached value is served until its entity changes.
+"""
+
+import asyncio
+import heapq
 import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .ratelimit import AdaptiveRateLimiter
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class _Entry:
+    """A cached value and its monotonic expiry time (None: never expires)."""
+
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: Any, expires_at: Optional[float]):
+        self.value = value
+        self.expires_at = expires_at
+
+
 class TimedCache:
-    """Simple time-based cache with TTL."""
-    
-    def __init__(self, ttl_seconds: int = 5):
+    """Time-based cache with TTL, optional LRU capacity and statistics.
+
+    Expiry uses ``time.monotonic()`` and a min-heap of expiry times, so
+    expired entries are evicted as the cache is used rather than only when
+    they are read again.  Superseded heap items are skipped lazily and the
+    heap is compacted when they outnumber live entries, so memory stays
+    bounded however many keys come and go.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = 5,
+        max_entries: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         """Initialize cache with TTL.
         
         Args:
-            ttl_seconds: Time to live in seconds
+            ttl_seconds: Time to live in seconds, or None to keep entries
+                until they are invalidated
+            max_entries: Evict the least recently used entry beyond this
+                many (None: unbounded)
+            clock: Monotonic time source, in seconds
         """
-        self._cache: dict[str, tuple[Any, datetime]] = {}
-        self._ttl = timedelta(seconds=ttl_seconds)
+        self._cache: OrderedDict[str, _Entry] = OrderedDict()
+        self._expiry: list[tuple[float, int, str, _Entry]] = []
+        self._counter = 0
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired.
@@ -30,16 +75,16 @@ class TimedCache:
         Returns:
             Cached value or None if expired/not found
         """
-        if key not in self._cache:
+        if self._expiry:
+            self._expire(self._clock())
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
             return None
-        
-        value, timestamp = self._cache[key]
-        
-        if dt_util.utcnow() - timestamp > self._ttl:
-            del self._cache[key]
-            return None
-        
-        return value
+        self.hits += 1
+        if self._max_entries is not None:
+            self._cache.move_to_end(key)
+        return entry.value
     
     def set(self, key: str, value: Any) -> None:
         """Set value in cache.
@@ -48,11 +93,28 @@ class TimedCache:
             key: Cache key
             value: Value to cache
         """
-        self._cache[key] = (value, dt_util.utcnow())
+        expires_at = None
+        if self._ttl is not None:
+            now = self._clock()
+            self._expire(now)
+            expires_at = now + self._ttl
+        entry = _Entry(value, expires_at)
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        if expires_at is not None:
+            self._counter += 1
+            heapq.heappush(self._expiry, (expires_at, self._counter, key, entry))
+            if len(self._expiry) > 2 * len(self._cache) + 16:
+                self._compact()
+        if self._max_entries is not None:
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+                self.evictions += 1
     
     def clear(self) -> None:
         """Clear all cached values."""
         self._cache.clear()
+        self._expiry.clear()
     
     def invalidate(self, key: str) -> None:
         """Invalidate a specific cache key.
@@ -60,23 +122,67 @@ class TimedCache:
         Args:
             key: Cache key to invalidate
         """
-        if key in self._cache:
-            del self._cache[key]
+        self._cache.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._cache.get(key)
+        return entry is not None and (
+            entry.expires_at is None or entry.expires_at > self._clock()
+        )
+
+    def stats(self) -> dict[str, int]:
+        """Counters for diagnostics."""
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+        }
+
+    def _expire(self, now: float) -> None:
+        heap = self._expiry
+        while heap and heap[0][0] <= now:
+            _, _, key, entry = heapq.heappop(heap)
+            # Skip items for entries that were since replaced or removed.
+            if self._cache.get(key) is entry:
+                del self._cache[key]
+                self.expirations += 1
+
+    def _compact(self) -> None:
+        self._expiry = [
+            item for item in self._expiry if self._cache.get(item[2]) is item[3]
+        ]
+        heapq.heapify(self._expiry)
 
 
 class RoomDataCache:
     """Cache for room data to reduce state reads."""
     
-    def __init__(self, ttl_seconds: int = 5):
+    def __init__(
+        self, ttl_seconds: Optional[float] = 5, max_entries: Optional[int] = None
+    ):
         """Initialize room data cache.
         
         Args:
-            ttl_seconds: Cache TTL in seconds
+            ttl_seconds: Cache TTL in seconds (None: until invalidated)
+            max_entries: LRU capacity (None: unbounded)
         """
-        self._cache = TimedCache(ttl_seconds)
-        self._room_keys: set[str] = set()
+        self._cache = TimedCache(ttl_seconds, max_entries)
+        self.invalidations = 0
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
     
-    def get_room_data(self, room_key: str) -> Optional[dict[str, Any]]:
+    def get_room_data(self, room_key: str) -> Optional[Any]:
         """Get cached room data.
         
         Args:
@@ -85,17 +191,16 @@ class RoomDataCache:
         Returns:
             Cached room data or None
         """
-        return self._cache.get(f"room_{room_key}")
+        return self._cache.get(room_key)
     
-    def set_room_data(self, room_key: str, data: dict[str, Any]) -> None:
+    def set_room_data(self, room_key: str, data: Any) -> None:
         """Cache room data.
         
         Args:
             room_key: Room key
             data: Room data to cache
         """
-        self._room_keys.add(room_key)
-        self._cache.set(f"room_{room_key}", data)
+        self._cache.set(room_key, data)
     
     def invalidate_room(self, room_key: str) -> None:
         """Invalidate cached data for a room.
@@ -103,24 +208,58 @@ class RoomDataCache:
         Args:
             room_key: Room key
         """
-        self._cache.invalidate(f"room_{room_key}")
+        self.invalidations += 1
+        self._cache.invalidate(room_key)
     
     def invalidate_all(self) -> None:
         """Invalidate all cached room data."""
         self._cache.clear()
-        self._room_keys.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Counters for diagnostics."""
+        return {**self._cache.stats(), "invalidations": self.invalidations}
 
 
 class EntityStateCache:
     """Cache for entity states to reduce state reads."""
     
-    def __init__(self, ttl_seconds: int = 2):
+    def __init__(
+        self, ttl_seconds: Optional[float] = 2, max_entries: Optional[int] = None
+    ):
         """Initialize entity state cache.
         
         Args:
-            ttl_seconds: Cache TTL in seconds
+            ttl_seconds: Cache TTL in seconds (None: until invalidated)
+            max_entries: LRU capacity (None: unbounded)
+        """
+        self._cache = TimedCache(ttl_seconds, max_entries)
+        self.invalidations = 0
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def get(self, hass, entity_id: str) -> Optional[Any]:
+        """Read-through lookup of an entity's state object.
+        
+        Args:
+            hass: Home Assistant instance
+            entity_id: Entity ID
+        
+        Returns:
+            The state object, or None if the entity does not exist
         """
-        self._cache = TimedCache(ttl_seconds)
+        cached = self._cache.get(entity_id)
+        if cached is not None:
+            return cached[0]
+        state = hass.states.get(entity_id)
+        # Wrapped so that a missing entity is cached too.
+        self._cache.set(entity_id, (state,))
+        return state
     
     def get_state(self, entity_id: str) -> Optional[Any]:
         """Get cached entity state.
@@ -131,7 +270,8 @@ class EntityStateCache:
         Returns:
             Cached state or None
         """
-        return self._cache.get(f"state_{entity_id}")
+        cached = self._cache.get(entity_id)
+        return cached[0] if cached is not None else None
     
     def set_state(self, entity_id: str, state: Any) -> None:
         """Cache entity state.
@@ -140,7 +280,7 @@ class EntityStateCache:
             entity_id: Entity ID
             state: State to cache
         """
-        self._cache.set(f"state_{entity_id}", state)
+        self._cache.set(entity_id, (state,))
     
     def invalidate(self, entity_id: str) -> None:
         """Invalidate cached state for an entity.
@@ -148,28 +288,149 @@ class EntityStateCache:
         Args:
             entity_id: Entity ID
         """
-        self._cache.invalidate(f"state_{entity_id}")
+        self.invalidations += 1
+        self._cache.invalidate(entity_id)
     
     def invalidate_all(self) -> None:
         """Invalidate all cached states."""
         self._cache.clear()
 
+    def stats(self) -> dict[str, int]:
+        """Counters for diagnostics."""
+        return {**self._cache.stats(), "invalidations": self.invalidations}
+
+
+@dataclass(slots=True)
+class CallOutcome:
+    """Result of one dispatched service call."""
+
+    domain: str
+    service: str
+    service_data: dict[str, Any]
+    success: bool
+    latency: float
+    error: Optional[BaseException] = None
+
+    @property
+    def entity_ids(self) -> list[str]:
+        """Entities targeted by the call (several if it was coalesced)."""
+        return _target_entities(self.service_data)
+
+
+def _target_entities(service_data: dict[str, Any]) -> list[str]:
+    entity_ids = service_data.get("entity_id")
+    if entity_ids is None:
+        return []
+    if isinstance(entity_ids, str):
+        return [entity_ids]
+    return list(entity_ids)
+
+
+def _coalesce_calls(calls: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Merge calls that differ only in ``entity_id`` into one call each.
+
+    Merged calls target a list of entity ids, in the order they were added,
+    and keep the position of the first call of their group.
+    """
+    merged: dict[Any, dict[str, Any]] = {}
+    members: dict[Any, set[str]] = {}
+    result: list[dict[str, Any]] = []
+    for call in calls:
+        data = call["service_data"]
+        entity_ids = data.get("entity_id")
+        if entity_ids is None:
+            result.append(call)
+            continue
+        try:
+            key = (
+                call["domain"],
+                call["service"],
+                frozenset((k, v) for k, v in data.items() if k != "entity_id"),
+            )
+            hash(key)
+        except TypeError:
+            result.append(call)
+            continue
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        group = merged.get(key)
+        if group is None:
+            group = {
+                "domain": call["domain"],
+                "service": call["service"],
+                "service_data": {**data, "entity_id": []},
+            }
+            merged[key] = group
+            members[key] = set()
+            result.append(group)
+        targets = group["service_data"]["entity_id"]
+        seen = members[key]
+        for entity_id in entity_ids:
+            if entity_id not in seen:
+                seen.add(entity_id)
+                targets.append(entity_id)
+    return result
+
 
 class ServiceCallBatcher:
-    """Batch service calls to reduce overhead."""
+    """Batch service calls and dispatch them concurrently.
+
+    Pending calls are dispatched on :meth:`flush` (and whenever
+    ``batch_size`` calls are pending), at most ``max_concurrency`` at a time.
+    With ``coalesce`` set, calls whose service data differ only in
+    ``entity_id`` are merged into one call targeting all their entities
+    (one per platform and at most a burst of entities each, with a
+    ``rate_limiter``).  Every call is made blocking, so the concurrency
+    bound, the latency and the outcome cover the service handler itself.
+    With a ``rate_limiter``, each call first waits for its entities'
+    platforms to have tokens and reports its latency back (or only its
+    failure, with ``observe_latency`` off, when confirmation latencies are
+    fed to the limiter elsewhere).  ``on_dispatch`` is called
+    with a call's entity ids right before the call is made.  A call that
+    takes longer than ``call_timeout`` is cancelled and counts as failed.
+    Every dispatched call gets a :class:`CallOutcome`; a failing call is
+    recorded and logged but does not stop the rest of the batch.
+    """
     
-    def __init__(self, hass, batch_size: int = 10, batch_delay: float = 0.1):
+    def __init__(
+        self,
+        hass,
+        batch_size: Optional[int] = 10,
+        max_concurrency: int = 1,
+        call_timeout: Optional[float] = None,
+        coalesce: bool = False,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        observe_latency: bool = True,
+        on_dispatch: Optional[Callable[[list[str]], None]] = None,
+    ):
         """Initialize service call batcher.
         
         Args:
             hass: Home Assistant instance
-            batch_size: Maximum calls per batch
-            batch_delay: Delay between batches in seconds
+            batch_size: Flush once this many calls are pending (None: only
+                on flush/exit)
+            max_concurrency: Calls in flight at once (1: one after another)
+            call_timeout: Seconds a call may take before it is cancelled
+                (None: no limit)
+            coalesce: Merge calls that differ only in their entity_id
+            rate_limiter: Per-platform limiter pacing the calls
+            observe_latency: Report call latencies (not just failures) to
+                the rate limiter
+            on_dispatch: Called with a call's entity ids as it is made
         """
         self.hass = hass
         self.batch_size = batch_size
-        self.batch_delay = batch_delay
+        self.max_concurrency = max(1, max_concurrency)
+        self.call_timeout = call_timeout
+        self.coalesce = coalesce
+        self.rate_limiter = rate_limiter
+        self.observe_latency = observe_latency
+        self.on_dispatch = on_dispatch
+        self.rate_limited = 0.0
+        self.calls_added = 0
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
         self._pending_calls: list[dict[str, Any]] = []
+        self.outcomes: list[CallOutcome] = []
     
     async def add_call(self, domain: str, service: str, service_data: dict[str, Any]) -> None:
         """Add a service call to the batch.
@@ -184,39 +445,110 @@ class ServiceCallBatcher:
             "service": service,
             "service_data": service_data,
         })
+        self.calls_added += 1
         
-        if len(self._pending_calls) >= self.batch_size:
+        if self.batch_size is not None and len(self._pending_calls) >= self.batch_size:
             await self.flush()
     
-    async def flush(self) -> None:
-        """Execute all pending service calls."""
+    async def flush(self) -> list[CallOutcome]:
+        """Execute all pending service calls.
+        
+        Returns:
+            The outcomes of the calls dispatched by this flush, in the order
+            they were added (one per merged call when coalescing)
+        """
         if not self._pending_calls:
-            return
-        
-        # Group by domain/service for efficiency
-        grouped: dict[tuple[str, str], list[dict]] = defaultdict(list)
-        for call in self._pending_calls:
-            key = (call["domain"], call["service"])
-            grouped[key].append(call["service_data"])
-        
-        # Execute grouped calls
-        for (domain, service), service_data_list in grouped.items():
-            if len(service_data_list) == 1:
-                # Single call
-                await self.hass.services.async_call(
-                    domain, service, service_data_list[0]
+            return []
+        calls, self._pending_calls = self._pending_calls, []
+        if self.coalesce:
+            calls = _coalesce_calls(calls)
+            if self.rate_limiter is not None:
+                calls = self._split_for_limiter(calls)
+        
+        outcomes = await asyncio.gather(*(self._dispatch(call) for call in calls))
+        self.outcomes.extend(outcomes)
+        
+        failed = [o for o in outcomes if not o.success]
+        if failed:
+            _LOGGER.warning(
+                "%d of %d service calls failed (first: %s.%s %s: %r)",
+                len(failed), len(outcomes),
+                failed[0].domain, failed[0].service,
+                failed[0].service_data.get("entity_id"), failed[0].error,
+            )
+        return list(outcomes)
+    
+    def _split_for_limiter(self, calls: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Split merged calls into per-platform calls of at most one burst."""
+        result: list[dict[str, Any]] = []
+        for call in calls:
+            entity_ids = call["service_data"].get("entity_id")
+            if not isinstance(entity_ids, list) or len(entity_ids) <= 1:
+                result.append(call)
+                continue
+            for chunk in self.rate_limiter.split(entity_ids):
+                result.append({
+                    **call,
+                    "service_data": {**call["service_data"], "entity_id": chunk},
+                })
+        return result
+
+    async def _dispatch(self, call: dict[str, Any]) -> CallOutcome:
+        limiter = self.rate_limiter
+        async with self._semaphore:
+            if limiter is not None:
+                self.rate_limited += await limiter.acquire(
+                    _target_entities(call["service_data"])
                 )
-            else:
-                # Multiple calls - execute sequentially but grouped
-                for service_data in service_data_list:
+            if self.on_dispatch is not None:
+                self.on_dispatch(_target_entities(call["service_data"]))
+            start = time.perf_counter()
+            try:
+                async with asyncio.timeout(self.call_timeout):
                     await self.hass.services.async_call(
-                        domain, service, service_data
+                        call["domain"], call["service"], call["service_data"],
+                        blocking=True,
                     )
-                    # Small delay to prevent overwhelming
-                    import asyncio
-                    await asyncio.sleep(0.01)
-        
-        self._pending_calls.clear()
+            except Exception as err:  # noqa: BLE001 - reported per call
+                outcome = CallOutcome(
+                    call["domain"], call["service"], call["service_data"],
+                    False, time.perf_counter() - start, err,
+                )
+            else:
+                outcome = CallOutcome(
+                    call["domain"], call["service"], call["service_data"],
+                    True, time.perf_counter() - start,
+                )
+            if limiter is not None and (self.observe_latency or not outcome.success):
+                limiter.observe(outcome.entity_ids, outcome.latency, outcome.success)
+            return outcome
+
+    @property
+    def failures(self) -> list[CallOutcome]:
+        """Outcomes of every failed call so far."""
+        return [o for o in self.outcomes if not o.success]
+
+    def succeeded_entities(self) -> list[str]:
+        """Entities whose calls succeeded so far."""
+        return [e for o in self.outcomes if o.success for e in o.entity_ids]
+
+    def stats(self) -> dict[str, Any]:
+        """Call counts and latency summary of every call so far."""
+        latencies = sorted(o.latency for o in self.outcomes)
+        return {
+            "requested": self.calls_added,
+            "calls": len(latencies),
+            "failures": len(self.failures),
+            "timeouts": sum(
+                isinstance(o.error, TimeoutError) for o in self.outcomes
+            ),
+            "max_concurrency": self.max_concurrency,
+            "latency_avg_ms": (
+                round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0
+            ),
+            "latency_max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            "rate_limited_ms": round(self.rate_limited * 1000, 1),
+        }
     
     async def __aenter__(self):
         """Async context manager entry."""
@@ -225,4 +557,3 @@ class ServiceCallBatcher:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit - flush remaining calls."""
         await self.flush()
-
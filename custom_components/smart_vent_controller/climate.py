@@ -24,7 +24,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import DOMAIN, DEFAULT_DEFAULT_THERMOSTAT_TEMP
 from .coordinator import SmartVentControllerCoordinator
 from .device import get_room_device_id
-from .error_handling import get_safe_attribute
+from .state_access import UNAVAILABLE_STATES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -51,21 +51,18 @@ async def async_setup_entry(
 ) -> None:
     """Set up per-room climate entities."""
     coordinator: SmartVentControllerCoordinator = hass.data[DOMAIN][entry.entry_id]
-    rooms = entry.data.get("rooms", [])
     default_temp = entry.options.get("default_thermostat_temp", DEFAULT_DEFAULT_THERMOSTAT_TEMP)
 
     entities: list[ClimateEntity] = []
-    for room in rooms:
-        room_name = room.get("name", "")
-        room_key = room_name.lower().replace(" ", "_")
+    for room in coordinator.topology:
         entities.append(
             RoomClimateEntity(
                 coordinator,
                 entry,
-                room_key,
-                room_name,
-                room.get("climate_entity", ""),
-                room.get("temp_sensor", ""),
+                room.key,
+                room.name,
+                room.climate_entity or "",
+                room.temp_sensor or "",
                 default_temp,
             )
         )
@@ -122,7 +119,7 @@ class RoomClimateEntity(ClimateEntity):
     @property
     def hvac_mode(self) -> HVACMode:
         main = self._entry.data.get("main_thermostat", "")
-        state = self.coordinator.hass.states.get(main)
+        state = self.coordinator.get_state(main)
         if state:
             return _MODE_MAP.get(state.state, HVACMode.OFF)
         return HVACMode.OFF
@@ -134,32 +131,18 @@ class RoomClimateEntity(ClimateEntity):
     @property
     def hvac_action(self) -> HVACAction | None:
         main = self._entry.data.get("main_thermostat", "")
-        action = get_safe_attribute(
-            self.coordinator.hass, main, "hvac_action", "idle"
-        )
+        state = self.coordinator.get_state(main)
+        action = "idle"
+        if state is not None and state.state not in UNAVAILABLE_STATES:
+            action = state.attributes.get("hvac_action", "idle")
         return _ACTION_MAP.get(action, HVACAction.IDLE)
 
     # -- Temperature -------------------------------------------------------
 
     @property
     def current_temperature(self) -> float | None:
-        if self._temp_sensor:
-            state = self.coordinator.hass.states.get(self._temp_sensor)
-            if state and state.state not in ("unknown", "unavailable", "None", "none"):
-                try:
-                    return float(state.state)
-                except (ValueError, TypeError):
-                    pass
-        if self._climate_entity:
-            climate = self.coordinator.hass.states.get(self._climate_entity)
-            if climate:
-                temp = climate.attributes.get("current_temperature")
-                if temp is not None:
-                    try:
-                        return float(temp)
-                    except (ValueError, TypeError):
-                        pass
-        return None
+        room = self.coordinator.snapshot.rooms.get(self._room_key)
+        return room.current_temp if room else None
 
     @property
     def target_temperature(self) -> float | None:
@@ -167,15 +150,9 @@ class RoomClimateEntity(ClimateEntity):
         if stored is not None:
             return stored
         # Fall back to external climate entity setpoint
-        if self._climate_entity:
-            climate = self.coordinator.hass.states.get(self._climate_entity)
-            if climate:
-                temp = climate.attributes.get("temperature")
-                if temp is not None:
-                    try:
-                        return float(temp)
-                    except (ValueError, TypeError):
-                        pass
+        room = self.coordinator.snapshot.rooms.get(self._room_key)
+        if room is not None and room.climate_target is not None:
+            return room.climate_target
         return self._default_temp
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
@@ -183,7 +160,7 @@ class RoomClimateEntity(ClimateEntity):
         if temp is None:
             return
         self.coordinator.store.set_room_setpoint(self._room_key, float(temp))
-        await self.coordinator.store.async_save()
+        self.coordinator.store.schedule_save()
         self.async_write_ha_state()
 
     # -- Coordinator updates -----------------------------------------------
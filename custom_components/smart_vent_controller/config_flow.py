@@ -48,8 +48,15 @@ from .const import (
     DEFAULT_POLL_INTERVAL_IDLE_SEC,
     DEFAULT_AUTOMATION_COOLDOWN_SEC,
     DEFAULT_COOL_BOOST_F,
+    DEFAULT_PLAN_SOLVER,
+    DEFAULT_PLAN_SOLVER_BUDGET_MS,
+    DEFAULT_VENT_COMMAND_CONCURRENCY,
+    DEFAULT_VENT_RATE_LIMIT,
+    DEFAULT_VENT_RATE_TARGET_LATENCY_MS,
     CONTROL_STRATEGIES,
+    PLAN_SOLVERS,
 )
+from .topology import room_key
 
 
 # ---------------------------------------------------------------------------
@@ -84,6 +91,8 @@ def _all_settings_defaults() -> dict[str, Any]:
         "relief_open_pct": DEFAULT_RELIEF_OPEN_PCT,
         "max_relief_rooms": DEFAULT_MAX_RELIEF_ROOMS,
         "conventional_vent_count": DEFAULT_CONVENTIONAL_VENT_COUNT,
+        "plan_solver": DEFAULT_PLAN_SOLVER,
+        "plan_solver_budget_ms": DEFAULT_PLAN_SOLVER_BUDGET_MS,
         "room_hysteresis_f": DEFAULT_ROOM_HYSTERESIS_F,
         "heat_boost_f": DEFAULT_HEAT_BOOST_F,
         "cool_boost_f": DEFAULT_COOL_BOOST_F,
@@ -96,6 +105,10 @@ def _all_settings_defaults() -> dict[str, Any]:
         "poll_interval_active_sec": DEFAULT_POLL_INTERVAL_ACTIVE_SEC,
         "poll_interval_idle_sec": DEFAULT_POLL_INTERVAL_IDLE_SEC,
         "automation_cooldown_sec": DEFAULT_AUTOMATION_COOLDOWN_SEC,
+        "vent_command_concurrency": DEFAULT_VENT_COMMAND_CONCURRENCY,
+        "vent_rate_limit": DEFAULT_VENT_RATE_LIMIT,
+        "vent_rate_adaptive": True,
+        "vent_rate_target_latency_ms": DEFAULT_VENT_RATE_TARGET_LATENCY_MS,
         "occupancy_linger_min": DEFAULT_OCCUPANCY_LINGER_MIN,
         "occupancy_linger_night_min": DEFAULT_OCCUPANCY_LINGER_NIGHT_MIN,
         "require_occupancy": True,
@@ -104,6 +117,8 @@ def _all_settings_defaults() -> dict[str, Any]:
         "auto_thermostat_control": True,
         "auto_vent_control": True,
         "debug_mode": False,
+        "store_journal": False,
+        "store_max_age_days": 0,
     }
 
 
@@ -139,6 +154,16 @@ def _settings_algorithm_schema(defaults: dict | None = None) -> vol.Schema:
         vol.Optional("conventional_vent_count",
                      default=d.get("conventional_vent_count", DEFAULT_CONVENTIONAL_VENT_COUNT)):
             _num(0, 30, step=1),
+        vol.Optional("plan_solver",
+                     default=d.get("plan_solver", DEFAULT_PLAN_SOLVER)):
+            selector.SelectSelector(selector.SelectSelectorConfig(
+                options=PLAN_SOLVERS,
+                mode=selector.SelectSelectorMode.DROPDOWN,
+                translation_key="plan_solver",
+            )),
+        vol.Optional("plan_solver_budget_ms",
+                     default=d.get("plan_solver_budget_ms", DEFAULT_PLAN_SOLVER_BUDGET_MS)):
+            _num(10, 5000, step=10, unit="ms"),
     })
 
 
@@ -187,6 +212,17 @@ def _settings_hvac_schema(defaults: dict | None = None) -> vol.Schema:
         vol.Optional("automation_cooldown_sec",
                      default=d.get("automation_cooldown_sec", DEFAULT_AUTOMATION_COOLDOWN_SEC)):
             _num(0, 300, step=5, unit="sec"),
+        vol.Optional("vent_command_concurrency",
+                     default=d.get("vent_command_concurrency", DEFAULT_VENT_COMMAND_CONCURRENCY)):
+            _num(1, 32, step=1),
+        vol.Optional("vent_rate_limit",
+                     default=d.get("vent_rate_limit", DEFAULT_VENT_RATE_LIMIT)):
+            _num(1, 50, step=1, unit="cmd/s"),
+        vol.Optional("vent_rate_adaptive", default=d.get("vent_rate_adaptive", True)):
+            selector.BooleanSelector(),
+        vol.Optional("vent_rate_target_latency_ms",
+                     default=d.get("vent_rate_target_latency_ms", DEFAULT_VENT_RATE_TARGET_LATENCY_MS)):
+            _num(200, 30000, step=100, unit="ms"),
     })
 
 
@@ -211,6 +247,10 @@ def _settings_behavior_schema(defaults: dict | None = None) -> vol.Schema:
             selector.BooleanSelector(),
         vol.Optional("debug_mode", default=d.get("debug_mode", False)):
             selector.BooleanSelector(),
+        vol.Optional("store_journal", default=d.get("store_journal", False)):
+            selector.BooleanSelector(),
+        vol.Optional("store_max_age_days", default=d.get("store_max_age_days", 0)):
+            _num(0, 3650, step=1, unit="days"),
     })
 
 
@@ -632,10 +672,10 @@ class SmartVentControllerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
             existing_keys = [
-                r.get("name", "").lower().replace(" ", "_")
+                room_key(r.get("name", ""))
                 for r in self._reconfigure_rooms
             ]
-            if room_name.lower().replace(" ", "_") in existing_keys:
+            if room_key(room_name) in existing_keys:
                 return self.async_show_form(
                     step_id="add_room",
                     data_schema=self._room_edit_schema({}),
@@ -758,8 +798,7 @@ class SmartVentControllerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             device_registry = dr.async_get(self.hass)
             entity_registry = er.async_get(self.hass)
             for name in old_room_names:
-                room_key = name.lower().replace(" ", "_")
-                device_id = (DOMAIN, f"{entry.entry_id}_{room_key}")
+                device_id = (DOMAIN, f"{entry.entry_id}_{room_key(name)}")
                 device = device_registry.async_get_device(identifiers={device_id})
                 if device:
                     entities = er.async_entries_for_device(
@@ -27,9 +27,22 @@ DEFAULT_INITIAL_EFFICIENCY = 50
 DEFAULT_CONTROL_STRATEGY = "simple"
 DEFAULT_POLL_INTERVAL_ACTIVE_SEC = 30
 DEFAULT_POLL_INTERVAL_IDLE_SEC = 120
+SNAPSHOT_FULL_REFRESH_SEC = 600
+ENTITY_CACHE_MAX_ENTRIES = 4096
 DEFAULT_AUTOMATION_COOLDOWN_SEC = 30
+DEFAULT_PLAN_SOLVER = "sequential"
+DEFAULT_PLAN_SOLVER_BUDGET_MS = 200
+DEFAULT_VENT_COMMAND_CONCURRENCY = 8
+DEFAULT_VENT_RATE_LIMIT = 10
+DEFAULT_VENT_RATE_TARGET_LATENCY_MS = 5000
+VENT_RATE_MIN = 0.5
+VENT_COMMAND_TIMEOUT_SEC = 30
+ACTUATION_CONFIRM_TIMEOUT_SEC = 30
+ACTUATION_MAX_RETRIES = 2
+ACTUATION_POSITION_TOLERANCE_PCT = 2
 
 CONTROL_STRATEGIES = ["simple", "learned", "hybrid"]
+PLAN_SOLVERS = ["sequential", "joint"]
 
 # Configuration keys
 CONF_MAIN_THERMOSTAT = "main_thermostat"
@@ -58,6 +71,8 @@ DEFAULT_COOL_BOOST_F = 1.0
 CONF_AUTO_THERMOSTAT_CONTROL = "auto_thermostat_control"
 CONF_AUTO_VENT_CONTROL = "auto_vent_control"
 CONF_DEBUG_MODE = "debug_mode"
+CONF_STORE_JOURNAL = "store_journal"
+CONF_STORE_MAX_AGE_DAYS = "store_max_age_days"
 CONF_HVAC_MIN_RUNTIME_MIN = "hvac_min_runtime_min"
 CONF_HVAC_MIN_OFF_TIME_MIN = "hvac_min_off_time_min"
 CONF_DEFAULT_THERMOSTAT_TEMP = "default_thermostat_temp"
@@ -68,7 +83,18 @@ CONF_MIN_ADJUSTMENT_INTERVAL_MIN = "min_adjustment_interval_min"
 CONF_TEMP_ERROR_OVERRIDE_F = "temp_error_override_f"
 CONF_CONVENTIONAL_VENT_COUNT = "conventional_vent_count"
 CONF_CONTROL_STRATEGY = "control_strategy"
+CONF_PLAN_SOLVER = "plan_solver"
+CONF_PLAN_SOLVER_BUDGET_MS = "plan_solver_budget_ms"
+CONF_VENT_COMMAND_CONCURRENCY = "vent_command_concurrency"
+CONF_VENT_RATE_LIMIT = "vent_rate_limit"
+CONF_VENT_RATE_ADAPTIVE = "vent_rate_adaptive"
+CONF_VENT_RATE_TARGET_LATENCY_MS = "vent_rate_target_latency_ms"
 CONF_POLL_INTERVAL_ACTIVE_SEC = "poll_interval_active_sec"
 CONF_POLL_INTERVAL_IDLE_SEC = "poll_interval_idle_sec"
 
 STORAGE_VERSION = 1
+STORE_SAVE_DELAY_SEC = 5
+STORE_SAVE_MAX_DELAY_SEC = 30
+STORE_RUNTIME_CHECKPOINT_SEC = 300
+STORE_JOURNAL_COMPACT_BYTES = 64 * 1024
+EFFICIENCY_SAMPLE_CAPACITY = 256
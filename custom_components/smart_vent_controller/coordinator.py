@@ -3,6 +3,10 @@
 Manages polling, efficiency learning, cycle tracking, and persistent state.
 All runtime state that was previously spread across input_number entities
 now lives here and is persisted via SmartVentStore.
+
+Room readings are kept current by state-change events: only rooms whose
+entities changed are re-read on a refresh, and a periodic full read guards
+against missed events.
 """
 from __future__ import annotations
 
@@ -10,20 +14,45 @@ import logging
 from datetime import timedelta
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.util import dt as dt_util
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.storage import STORAGE_DIR
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
     DOMAIN,
+    ACTUATION_CONFIRM_TIMEOUT_SEC,
+    ACTUATION_MAX_RETRIES,
+    ACTUATION_POSITION_TOLERANCE_PCT,
     DEFAULT_POLL_INTERVAL_ACTIVE_SEC,
     DEFAULT_POLL_INTERVAL_IDLE_SEC,
     DEFAULT_INITIAL_EFFICIENCY,
+    DEFAULT_VENT_RATE_LIMIT,
+    DEFAULT_VENT_RATE_TARGET_LATENCY_MS,
+    EFFICIENCY_SAMPLE_CAPACITY,
+    ENTITY_CACHE_MAX_ENTRIES,
+    SNAPSHOT_FULL_REFRESH_SEC,
+    VENT_RATE_MIN,
 )
+from .actuation import ActuationTracker
 from .cache import RoomDataCache, EntityStateCache
+from .error_handling import safe_int
+from .planner import IncrementalTargetPlanner, ReliefCandidateIndex
+from .ratelimit import AdaptiveRateLimiter
+from .samples import (
+    ACCEPTED,
+    REJECTED,
+    EfficiencySample,
+    EfficiencySampleStore,
+    sample_mode,
+)
 from .store import SmartVentStore
 from .algorithm import compute_efficiency_sample
+from .snapshot import HouseSnapshot, update_house_snapshot
+from .topology import RoomTopology, room_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -49,20 +78,208 @@ class SmartVentControllerCoordinator(DataUpdateCoordinator):
             update_interval=self._idle_interval,
         )
         self.config_entry = entry
-        self.rooms = entry.data.get("rooms", [])
+        self._topology = RoomTopology.from_entry_data(entry.data)
+
+        # Invalidated by state-change events rather than expiring.
+        self.room_cache = RoomDataCache(ttl_seconds=None)
+        self.entity_cache = EntityStateCache(
+            ttl_seconds=None, max_entries=ENTITY_CACHE_MAX_ENTRIES
+        )
+
+        self.store = SmartVentStore(
+            hass,
+            entry.entry_id,
+            journal=bool(entry.options.get("store_journal", False)),
+        )
+        # Every raw cycle observation, next to the blended rates in the store.
+        self.samples = EfficiencySampleStore(
+            hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry.entry_id}.samples"),
+            EFFICIENCY_SAMPLE_CAPACITY,
+        )
 
-        self.room_cache = RoomDataCache(ttl_seconds=5)
-        self.entity_cache = EntityStateCache(ttl_seconds=2)
+        # Paces vent commands per radio platform across script runs.
+        self.rate_limiter = AdaptiveRateLimiter(
+            **self._rate_limit_options(),
+            min_rate=VENT_RATE_MIN,
+            platform_of=self._entity_platform,
+        )
+        # Vent commands awaiting the state change that confirms them; the
+        # confirmation latency is what the rate limiter adapts to.
+        self.actuation = ActuationTracker(
+            timeout=ACTUATION_CONFIRM_TIMEOUT_SEC,
+            max_retries=ACTUATION_MAX_RETRIES,
+            tolerance=ACTUATION_POSITION_TOLERANCE_PCT,
+            on_result=self._actuation_result,
+        )
 
-        self.store = SmartVentStore(hass, entry.entry_id)
+        # Vent plans cached across runs of every vent control script.
+        self.planner = IncrementalTargetPlanner()
+        self.relief_index = ReliefCandidateIndex()
 
         self.automations: list[Any] = []
 
         self._is_hvac_active = False
+        self._snapshot: HouseSnapshot | None = None
+        self._last_full_refresh = 0.0
+
+        self._unsub_state_events = None
+        self._sample_rooms: tuple[str, ...] = ()
+        self._changed_since_poll: set[str] = set()
+        self.changed_rooms: frozenset[str] = frozenset()
+        self.full_refreshes = 0
+        self.incremental_refreshes = 0
+        self.rooms_reread = 0
 
     async def async_initialize(self) -> None:
         """Load persisted state from disk. Call once during entry setup."""
         await self.store.async_load()
+        self._collect_store_garbage()
+        # The sample file stays closed until a sample is recorded or read;
+        # rings of removed rooms are released when the rooms change.
+        self._sample_rooms = self.topology.keys
+        self._start_tracking()
+
+    def _collect_store_garbage(self) -> None:
+        """Drop stored data of removed rooms and vents (and stale entries)."""
+        topology = self.topology
+        max_age_days = safe_int(
+            self.config_entry.options.get("store_max_age_days"), 0, 0, 3650
+        )
+        result = self.store.collect_garbage(
+            topology.keys,
+            topology.vents,
+            dt_util.utcnow().timestamp(),
+            max_age_days * 86400 or None,
+        )
+        if result["removed"]:
+            self.store.schedule_save()
+            _LOGGER.debug(
+                "Removed %d stale store entries (%d bytes)",
+                result["removed"], result["bytes_reclaimed"],
+            )
+
+    async def _async_retain_samples(self, room_keys: tuple[str, ...]) -> None:
+        """Release the efficiency sample rings of removed rooms."""
+        try:
+            released = await self.hass.async_add_executor_job(
+                self.samples.retain, list(room_keys)
+            )
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Could not reclaim efficiency samples: %s", err)
+            return
+        if released:
+            _LOGGER.debug("Released %d efficiency sample rings", released)
+
+    @callback
+    def async_entry_updated(self) -> None:
+        """React to changed rooms or options.
+
+        Drops cached vent plans, applies the vent rate limit options and
+        drops the stored data and efficiency samples of rooms and vents that
+        are no longer configured.
+        """
+        self.planner.invalidate()
+        self.rate_limiter.configure(**self._rate_limit_options())
+        self._collect_store_garbage()
+        room_keys = self.topology.keys
+        if room_keys and room_keys != self._sample_rooms:
+            self._sample_rooms = room_keys
+            self.hass.async_create_task(self._async_retain_samples(room_keys))
+
+    async def async_close_samples(self) -> None:
+        """Close the efficiency sample file. Call on entry unload."""
+        await self.hass.async_add_executor_job(self.samples.close)
+
+    def _rate_limit_options(self) -> dict[str, Any]:
+        options = self.config_entry.options
+        return {
+            "max_rate": safe_int(
+                options.get("vent_rate_limit"), DEFAULT_VENT_RATE_LIMIT, 1, 50
+            ),
+            "target_latency": safe_int(
+                options.get("vent_rate_target_latency_ms"),
+                DEFAULT_VENT_RATE_TARGET_LATENCY_MS, 200, 30000,
+            ) / 1000.0,
+            "adaptive": bool(options.get("vent_rate_adaptive", True)),
+        }
+
+    # -- room topology ------------------------------------------------------
+
+    @property
+    def topology(self) -> RoomTopology:
+        """Compiled rooms, recompiled when the entry's rooms are replaced."""
+        if not self._topology.is_current(self.config_entry.data):
+            self._topology = RoomTopology.from_entry_data(self.config_entry.data)
+            self._last_full_refresh = 0.0
+            self.room_cache.invalidate_all()
+            self.entity_cache.invalidate_all()
+            self.rate_limiter.forget_platforms()
+            self.actuation.forget(self._topology.vents)
+            if self._unsub_state_events is not None:
+                self.async_stop_tracking()
+                self._start_tracking()
+            _LOGGER.debug("Room topology recompiled (%d rooms)", len(self._topology))
+        return self._topology
+
+    @property
+    def rooms(self) -> list[dict]:
+        """Room configuration dicts, as stored in the config entry."""
+        return self.topology.source
+
+    def _entity_platform(self, entity_id: str) -> str:
+        """Integration providing *entity_id* (its domain if unregistered)."""
+        entry = er.async_get(self.hass).async_get(entity_id)
+        if entry is not None and entry.platform:
+            return entry.platform
+        return entity_id.split(".", 1)[0]
+
+    def _actuation_result(self, entity_id: str, latency: float, confirmed: bool) -> None:
+        self.rate_limiter.observe((entity_id,), latency, confirmed)
+
+    # -- state-change tracking ----------------------------------------------
+
+    def _start_tracking(self) -> None:
+        if self._unsub_state_events is not None:
+            return
+        entity_ids = self._topology.tracked_entities()
+        if entity_ids:
+            self._unsub_state_events = async_track_state_change_event(
+                self.hass, entity_ids, self._handle_state_event
+            )
+
+    def async_stop_tracking(self) -> None:
+        """Unsubscribe from state-change events. Call on entry unload."""
+        if self._unsub_state_events is not None:
+            self._unsub_state_events()
+            self._unsub_state_events = None
+
+    @callback
+    def _handle_state_event(self, event: Event) -> None:
+        entity_id = event.data.get("entity_id")
+        topology = self._topology
+        self.entity_cache.invalidate(entity_id)
+        if entity_id in self.actuation.pending or entity_id in self.actuation.abandoned:
+            new_state = event.data.get("new_state")
+            if new_state is not None:
+                self.actuation.observe(
+                    entity_id, new_state.attributes.get("current_position")
+                )
+        for room_id in topology.entity_rooms.get(entity_id, ()):
+            key = topology.keys[room_id]
+            self.room_cache.invalidate_room(key)
+            self._changed_since_poll.add(key)
+
+    def get_state(self, entity_id: str | None):
+        """State object of *entity_id*, from the cache for tracked entities."""
+        if not entity_id:
+            return None
+        topology = self.topology
+        if self._unsub_state_events is None or (
+            entity_id not in topology.entity_rooms
+            and entity_id != topology.main_thermostat
+        ):
+            return self.hass.states.get(entity_id)
+        return self.entity_cache.get(self.hass, entity_id)
 
     # -- polling interval management ----------------------------------------
 
@@ -72,21 +289,78 @@ class SmartVentControllerCoordinator(DataUpdateCoordinator):
             self.update_interval = new_interval
             _LOGGER.debug("Polling interval changed to %s", new_interval)
 
+    # -- snapshot -----------------------------------------------------------
+
+    @property
+    def snapshot(self) -> HouseSnapshot:
+        """The readings of the last refresh (taken now if there was none)."""
+        if self._snapshot is None:
+            return self.refresh_snapshot()
+        return self._snapshot
+
+    def refresh_snapshot(self, full: bool = False) -> HouseSnapshot:
+        """Bring the shared snapshot up to date and return it.
+
+        Only rooms with a state change since the last refresh are re-read
+        (the rest are cache hits), unless *full* is set, events are not being
+        tracked, or the last full read is older than
+        ``SNAPSHOT_FULL_REFRESH_SEC``.
+        """
+        topology = self.topology
+        now = dt_util.utcnow().timestamp()
+        if (
+            full
+            or self._snapshot is None
+            or self._unsub_state_events is None
+            or now - self._last_full_refresh >= SNAPSHOT_FULL_REFRESH_SEC
+        ):
+            self.room_cache.invalidate_all()
+            self.entity_cache.invalidate_all()
+            self._last_full_refresh = now
+            self.full_refreshes += 1
+        else:
+            self.incremental_refreshes += 1
+        misses = self.room_cache.misses
+        self._snapshot = update_house_snapshot(
+            self.hass,
+            topology,
+            self.room_cache,
+            self.entity_cache,
+            self.store.get_room_setpoint,
+        )
+        self.rooms_reread += self.room_cache.misses - misses
+        return self._snapshot
+
+    def state_index_stats(self) -> dict[str, Any]:
+        """Counters for diagnostics."""
+        return {
+            "tracking": self._unsub_state_events is not None,
+            "tracked_entities": len(self._topology.entity_rooms),
+            "rooms_changed_last_interval": len(self.changed_rooms),
+            "full_refreshes": self.full_refreshes,
+            "incremental_refreshes": self.incremental_refreshes,
+            "rooms_reread": self.rooms_reread,
+            "room_cache": self.room_cache.stats(),
+            "entity_cache": self.entity_cache.stats(),
+        }
+
     # -- main update --------------------------------------------------------
 
     async def _async_update_data(self) -> dict[str, Any]:
         try:
             data: dict[str, Any] = {}
-            main_thermostat = self.config_entry.data.get("main_thermostat")
+            snapshot = self.refresh_snapshot()
+            self.changed_rooms = frozenset(self._changed_since_poll)
+            self._changed_since_poll.clear()
+            data["rooms_changed"] = len(self.changed_rooms)
 
             hvac_active = False
-            if main_thermostat:
-                thermo = self.hass.states.get(main_thermostat)
-                if thermo:
-                    action = thermo.attributes.get("hvac_action", "idle")
-                    hvac_active = action in ("heating", "cooling")
-                    data["hvac_action"] = action
-                    data["hvac_mode"] = thermo.state
+            thermo = snapshot.thermostat
+            if thermo:
+                action = thermo.hvac_action
+                hvac_active = action in ("heating", "cooling")
+                data["hvac_action"] = action
+                data["hvac_mode"] = thermo.state
 
             was_active = self._is_hvac_active
             self._is_hvac_active = hvac_active
@@ -115,52 +389,14 @@ class SmartVentControllerCoordinator(DataUpdateCoordinator):
             ) from err
 
     def _read_room_into(self, room: dict, data: dict[str, Any]) -> None:
-        """Read one room's temp/vent/occupancy into *data*. Raises on bad input."""
-        room_name = room.get("name", "").lower().replace(" ", "_")
-        temp_sensor = room.get("temp_sensor")
-        climate_entity = room.get("climate_entity")
-
-        current_temp = None
-        if temp_sensor:
-            state = self.hass.states.get(temp_sensor)
-            if state and state.state not in ("unknown", "unavailable", "None", "none"):
-                try:
-                    current_temp = float(state.state)
-                except (ValueError, TypeError):
-                    pass
-
-        if current_temp is None and climate_entity:
-            climate = self.hass.states.get(climate_entity)
-            if climate:
-                temp = climate.attributes.get("current_temperature")
-                if temp is not None:
-                    try:
-                        current_temp = float(temp)
-                    except (ValueError, TypeError):
-                        pass
-
-        data[f"{room_name}_temp"] = current_temp
-
-        vent_entities = room.get("vent_entities", [])
-        positions = []
-        for vent in vent_entities:
-            vent_state = self.hass.states.get(vent)
-            if vent_state:
-                pos = vent_state.attributes.get("current_position", 0)
-                try:
-                    positions.append(float(pos))
-                except (ValueError, TypeError):
-                    pass
-        data[f"{room_name}_vent_avg"] = (
-            sum(positions) / len(positions) if positions else 0
-        )
+        """Copy one room's snapshot readings into *data*. Raises on bad input."""
+        name = room_key(room.get("name", ""))
+        room_snapshot = self.snapshot.rooms[name]
 
-        occ_sensor = room.get("occupancy_sensor")
-        if occ_sensor:
-            occ_state = self.hass.states.get(occ_sensor)
-            data[f"{room_name}_occupied"] = (
-                occ_state.state == "on" if occ_state else False
-            )
+        data[f"{name}_temp"] = room_snapshot.current_temp
+        data[f"{name}_vent_avg"] = room_snapshot.vent_avg
+        if room_snapshot.has_occupancy_sensor:
+            data[f"{name}_occupied"] = room_snapshot.occupied
 
     # -- HVAC cycle tracking ------------------------------------------------
 
@@ -169,32 +405,13 @@ class SmartVentControllerCoordinator(DataUpdateCoordinator):
         self.store.cycle_start_ts = now
         self.store.hvac_last_action = action
 
-        for room in self.rooms:
-            room_key = room.get("name", "").lower().replace(" ", "_")
-            temp_sensor = room.get("temp_sensor")
-            climate_entity = room.get("climate_entity")
-
-            temp = None
-            if temp_sensor:
-                state = self.hass.states.get(temp_sensor)
-                if state and state.state not in ("unknown", "unavailable"):
-                    try:
-                        temp = float(state.state)
-                    except (ValueError, TypeError):
-                        pass
-            if temp is None and climate_entity:
-                climate = self.hass.states.get(climate_entity)
-                if climate:
-                    ct = climate.attributes.get("current_temperature")
-                    if ct is not None:
-                        try:
-                            temp = float(ct)
-                        except (ValueError, TypeError):
-                            pass
-            if temp is not None:
-                self.store.set_cycle_start_temp(room_key, temp)
-
-        await self.store.async_save()
+        for room_snapshot in self.snapshot.rooms.values():
+            if room_snapshot.current_temp is not None:
+                self.store.set_cycle_start_temp(
+                    room_snapshot.key, room_snapshot.current_temp
+                )
+
+        self.store.schedule_save()
         _LOGGER.debug("HVAC cycle started: %s at %.0f", action, now)
 
     async def _handle_cycle_end(self) -> None:
@@ -212,91 +429,73 @@ class SmartVentControllerCoordinator(DataUpdateCoordinator):
 
         self.store.clear_cycle_start_temps()
         self.store.clear_cycle_avg_apertures()
-        await self.store.async_save()
+        self.store.schedule_save()
         _LOGGER.debug("HVAC cycle ended at %.0f", now)
 
     # -- efficiency learning ------------------------------------------------
 
     async def _learn_efficiency(self, minutes: float, hvac_mode: str) -> None:
         """Compute and store per-room efficiency from the cycle that just ended."""
-        for room in self.rooms:
-            room_key = room.get("name", "").lower().replace(" ", "_")
+        now = dt_util.utcnow().timestamp()
+        mode = sample_mode(hvac_mode)
+        observations: list[tuple[str, str, EfficiencySample]] = []
+        for room_snapshot in self.snapshot.rooms.values():
+            key = room_snapshot.key
 
-            start_temp = self.store.get_cycle_start_temp(room_key)
+            start_temp = self.store.get_cycle_start_temp(key)
             if start_temp is None:
                 continue
 
-            current_temp = self._get_room_temp(room)
+            current_temp = room_snapshot.current_temp
             if current_temp is None:
                 continue
 
-            avg_aperture = self.store.get_cycle_avg_aperture(room_key)
+            avg_aperture = self.store.get_cycle_avg_aperture(key)
             if avg_aperture <= 0:
-                vent_entities = room.get("vent_entities", [])
-                positions = []
-                for vent in vent_entities:
-                    vs = self.hass.states.get(vent)
-                    if vs:
-                        try:
-                            positions.append(
-                                float(vs.attributes.get("current_position", 0))
-                            )
-                        except (ValueError, TypeError):
-                            pass
-                avg_aperture = sum(positions) / len(positions) if positions else 0
+                avg_aperture = room_snapshot.vent_avg
 
             rate = compute_efficiency_sample(
                 start_temp, current_temp, minutes, avg_aperture, hvac_mode
             )
+            observations.append((key, mode, EfficiencySample(
+                now, start_temp, current_temp, minutes, avg_aperture, rate,
+                REJECTED if rate is None else ACCEPTED,
+            )))
             if rate is None:
                 continue
 
-            old_rate = self.store.get_effective_rate(room_key, hvac_mode)
+            old_rate = self.store.get_effective_rate(key, hvac_mode)
             if old_rate > 0:
                 blended = old_rate * 0.7 + rate * 0.3
             else:
                 blended = rate
 
             if hvac_mode in ("cool", "cooling"):
-                self.store.set_cooling_rate(room_key, blended)
+                self.store.set_cooling_rate(key, blended)
             else:
-                self.store.set_heating_rate(room_key, blended)
+                self.store.set_heating_rate(key, blended)
 
             _LOGGER.info(
                 "Learned %s rate for %s: %.4f (was %.4f)",
-                hvac_mode, room_key, blended, old_rate,
+                hvac_mode, key, blended, old_rate,
             )
 
-    # -- helpers ------------------------------------------------------------
+        if observations:
+            try:
+                await self.hass.async_add_executor_job(
+                    self.samples.extend, observations
+                )
+            except (OSError, ValueError) as err:
+                _LOGGER.warning("Could not record efficiency samples: %s", err)
 
-    def _get_room_temp(self, room_config: dict) -> float | None:
-        temp_sensor = room_config.get("temp_sensor")
-        climate_entity = room_config.get("climate_entity")
+    # -- helpers ------------------------------------------------------------
 
-        if temp_sensor:
-            state = self.hass.states.get(temp_sensor)
-            if state and state.state not in ("unknown", "unavailable"):
-                try:
-                    return float(state.state)
-                except (ValueError, TypeError):
-                    pass
-        if climate_entity:
-            climate = self.hass.states.get(climate_entity)
-            if climate:
-                ct = climate.attributes.get("current_temperature")
-                if ct is not None:
-                    try:
-                        return float(ct)
-                    except (ValueError, TypeError):
-                        pass
-        return None
-
-    def get_rooms_to_condition_value(self) -> str:
+    def get_rooms_to_condition_value(self, snapshot: HouseSnapshot | None = None) -> str:
         """Compute rooms-to-condition CSV without relying on a sensor entity ID.
 
         This is the canonical source; the RoomsToConditionSensor reads from here.
+        Reads *snapshot* if given, otherwise the current states.
         """
-        rooms = self.config_entry.data.get("rooms", [])
         main_thermostat = self.config_entry.data.get("main_thermostat")
         hysteresis = self.config_entry.options.get("room_hysteresis_f", 1.0)
         require_occupancy = self.config_entry.options.get("require_occupancy", True)
@@ -304,7 +503,9 @@ class SmartVentControllerCoordinator(DataUpdateCoordinator):
         if not main_thermostat:
             return "none"
 
-        thermostat = self.hass.states.get(main_thermostat)
+        if snapshot is None:
+            snapshot = self.refresh_snapshot()
+        thermostat = snapshot.thermostat
         if not thermostat or thermostat.state not in (
             "heat", "cool", "auto", "heat_cool"
         ):
@@ -313,58 +514,31 @@ class SmartVentControllerCoordinator(DataUpdateCoordinator):
         mode = thermostat.state
         result: list[str] = []
 
-        for room in rooms:
-            room_key = room.get("name", "").lower().replace(" ", "_")
-            if self.is_room_overridden(room_key):
+        for room in snapshot.rooms.values():
+            if self.is_room_overridden(room.key):
                 continue
-            current_temp = self._get_room_temp(room)
+            current_temp = room.current_temp
             # Plausibility band: intentionally wider than the 40-100 setpoint
             # clamps so extreme but real readings (e.g. a 38F garage) stay eligible.
             if current_temp is None or current_temp < 32 or current_temp > 110:
                 continue
 
-            target_temp = self._get_room_target(room)
+            target_temp = room.climate_target
             if target_temp is None:
                 continue
 
             delta = target_temp - current_temp
 
-            if require_occupancy:
-                occ_sensor = room.get("occupancy_sensor", "")
-                if occ_sensor:
-                    occ_state = self.hass.states.get(occ_sensor)
-                    if not occ_state or occ_state.state != "on":
-                        continue
+            if require_occupancy and room.has_occupancy_sensor and not room.occupied:
+                continue
 
             if mode in ("heat", "auto", "heat_cool") and delta > hysteresis:
-                result.append(room_key)
+                result.append(room.key)
             elif mode in ("cool", "auto", "heat_cool") and delta < -hysteresis:
-                result.append(room_key)
+                result.append(room.key)
 
         return ",".join(result) if result else "none"
 
-    def _get_room_target(self, room_config: dict) -> float | None:
-        climate_entity = room_config.get("climate_entity")
-        if not climate_entity:
-            return None
-        climate = self.hass.states.get(climate_entity)
-        if not climate:
-            return None
-        temp = climate.attributes.get("temperature")
-        if temp is not None:
-            try:
-                return float(temp)
-            except (ValueError, TypeError):
-                pass
-        lo = climate.attributes.get("target_temp_low")
-        hi = climate.attributes.get("target_temp_high")
-        if lo is not None and hi is not None:
-            try:
-                return (float(lo) + float(hi)) / 2
-            except (ValueError, TypeError):
-                pass
-        return None
-
     # -- override room support ----------------------------------------------
 
     def set_room_override(
@@ -5,6 +5,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
 from .const import DOMAIN
+from .topology import room_key as make_room_key
 
 
 def get_room_device_id(entry: ConfigEntry, room_key: str) -> str:
@@ -32,7 +33,7 @@ async def async_create_room_devices(hass: HomeAssistant, entry: ConfigEntry):
     
     for room in rooms:
         room_name = room.get("name", "")
-        room_key = room_name.lower().replace(" ", "_")
+        room_key = make_room_key(room_name)
         
         # Create or get device for this room
         device_registry.async_get_or_create(
@@ -57,7 +58,7 @@ async def async_remove_room_devices(hass: HomeAssistant, entry: ConfigEntry):
     
     for room in rooms:
         room_name = room.get("name", "")
-        room_key = room_name.lower().replace(" ", "_")
+        room_key = make_room_key(room_name)
         
         device_id = get_room_device_id(entry, room_key)
         device = device_registry.async_get_device(identifiers={device_id})
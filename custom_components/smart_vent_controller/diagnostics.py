@@ -8,7 +8,9 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 
 from .const import DOMAIN
-from .error_handling import validate_entity_state, get_safe_state, get_safe_attribute
+from .snapshot import build_house_snapshot
+from .topology import RoomTopology
+from .state_access import is_available
 
 
 async def async_get_config_entry_diagnostics(
@@ -23,72 +25,49 @@ async def async_get_config_entry_diagnostics(
         "options": config_entry.options or {},
     }
 
+    if coordinator:
+        topology = coordinator.topology
+        snapshot = coordinator.snapshot
+    else:
+        topology = RoomTopology.from_entry_data(config_entry.data)
+        snapshot = build_house_snapshot(hass, topology)
+
     rooms = []
-    for room_config in config_entry.data.get("rooms", []):
-        room_name = room_config.get("name", "")
-        room_key = room_name.lower().replace(" ", "_")
-        climate_entity = room_config.get("climate_entity", "")
-        temp_sensor = room_config.get("temp_sensor", "")
-        occ_sensor = room_config.get("occupancy_sensor", "")
-        vent_entities = room_config.get("vent_entities", [])
+    for room_info in topology:
+        room_name = room_info.name
+        room_key = room_info.key
+        climate_entity = room_info.climate_entity or ""
+        temp_sensor = room_info.temp_sensor or ""
+        occ_sensor = room_info.occupancy_sensor or ""
+        vent_entities = list(room_info.vents)
 
         room_state = {
             "name": room_name,
             "key": room_key,
             "climate_entity": climate_entity,
-            "climate_available": validate_entity_state(hass, climate_entity, "climate"),
+            "climate_available": is_available(hass, climate_entity, "climate"),
             "temp_sensor": temp_sensor,
-            "temp_sensor_available": validate_entity_state(hass, temp_sensor, "sensor") if temp_sensor else False,
+            "temp_sensor_available": is_available(hass, temp_sensor, "sensor"),
             "occupancy_sensor": occ_sensor,
-            "occupancy_sensor_available": validate_entity_state(hass, occ_sensor, "binary_sensor") if occ_sensor else False,
+            "occupancy_sensor_available": is_available(hass, occ_sensor, "binary_sensor"),
             "vent_count": len(vent_entities),
             "vent_entities": vent_entities,
         }
 
-        current_temp = None
-        if temp_sensor and validate_entity_state(hass, temp_sensor, "sensor"):
-            temp_value = get_safe_state(hass, temp_sensor)
-            try:
-                current_temp = float(temp_value) if temp_value else None
-            except (ValueError, TypeError):
-                pass
-        if current_temp is None and climate_entity and validate_entity_state(hass, climate_entity, "climate"):
-            temp = get_safe_attribute(hass, climate_entity, "current_temperature")
-            if temp is not None:
-                try:
-                    current_temp = float(temp)
-                except (ValueError, TypeError):
-                    pass
-
-        target_temp = None
-        if climate_entity and validate_entity_state(hass, climate_entity, "climate"):
-            temp = get_safe_attribute(hass, climate_entity, "temperature")
-            if temp is not None:
-                try:
-                    target_temp = float(temp)
-                except (ValueError, TypeError):
-                    pass
-            else:
-                lo = get_safe_attribute(hass, climate_entity, "target_temp_low")
-                hi = get_safe_attribute(hass, climate_entity, "target_temp_high")
-                if lo is not None and hi is not None:
-                    try:
-                        target_temp = (float(lo) + float(hi)) / 2
-                    except (ValueError, TypeError):
-                        pass
+        room = snapshot.rooms.get(room_key)
+        current_temp = room.current_temp if room else None
+        target_temp = room.climate_target if room else None
 
         delta = (target_temp - current_temp) if (current_temp is not None and target_temp is not None) else None
-        occupied = False
-        if occ_sensor and validate_entity_state(hass, occ_sensor, "binary_sensor"):
-            occupied = get_safe_state(hass, occ_sensor) == "on"
+        occupied = room.occupied if room else False
 
         vent_positions = []
-        for vent_entity in vent_entities:
-            if validate_entity_state(hass, vent_entity, "cover"):
-                position = get_safe_attribute(hass, vent_entity, "current_position", 100)
-                vent_positions.append({"entity": vent_entity, "position": position, "available": True})
+        for vent in room.vents if room else ():
+            if vent.available and vent.entity_id.startswith("cover."):
+                position = vent.position if vent.position is not None else 100
+                vent_positions.append({"entity": vent.entity_id, "position": position, "available": True})
             else:
-                vent_positions.append({"entity": vent_entity, "position": None, "available": False})
+                vent_positions.append({"entity": vent.entity_id, "position": None, "available": False})
 
         efficiency = {}
         if coordinator:
@@ -110,23 +89,24 @@ async def async_get_config_entry_diagnostics(
     main_thermostat = config_entry.data.get("main_thermostat")
     thermostat_state = None
     if main_thermostat:
-        if validate_entity_state(hass, main_thermostat, "climate"):
-            state = hass.states.get(main_thermostat)
-            if state:
-                thermostat_state = {
-                    "entity": main_thermostat,
-                    "state": state.state,
-                    "available": True,
-                    "hvac_action": get_safe_attribute(hass, main_thermostat, "hvac_action"),
-                    "temperature": get_safe_attribute(hass, main_thermostat, "temperature"),
-                    "current_temperature": get_safe_attribute(hass, main_thermostat, "current_temperature"),
-                    "target_temp_low": get_safe_attribute(hass, main_thermostat, "target_temp_low"),
-                    "target_temp_high": get_safe_attribute(hass, main_thermostat, "target_temp_high"),
-                }
+        state = snapshot.thermostat
+        if state is not None and state.available and main_thermostat.startswith("climate."):
+            thermostat_state = {
+                "entity": main_thermostat,
+                "state": state.state,
+                "available": True,
+                "hvac_action": state.attributes.get("hvac_action"),
+                "temperature": state.attributes.get("temperature"),
+                "current_temperature": state.attributes.get("current_temperature"),
+                "target_temp_low": state.attributes.get("target_temp_low"),
+                "target_temp_high": state.attributes.get("target_temp_high"),
+            }
         else:
             thermostat_state = {"entity": main_thermostat, "available": False}
 
-    rooms_to_condition = coordinator.get_rooms_to_condition_value() if coordinator else None
+    rooms_to_condition = (
+        coordinator.get_rooms_to_condition_value(snapshot) if coordinator else None
+    )
 
     automation_status = {
         "auto_vent_control": config_entry.options.get("auto_vent_control", True),
@@ -148,25 +128,20 @@ async def async_get_config_entry_diagnostics(
     }
 
     manual_override = False
-    if coordinator:
-        main = config_entry.data.get("main_thermostat")
-        if main:
-            thermo = hass.states.get(main)
-            if thermo:
-                current = thermo.attributes.get("temperature")
-                last = coordinator.store.last_thermostat_setpoint
-                if current is not None and last > 0:
-                    try:
-                        manual_override = abs(float(current) - last) > 0.5
-                    except (ValueError, TypeError):
-                        pass
+    thermo = snapshot.thermostat
+    if coordinator and thermo:
+        current = thermo.attributes.get("temperature")
+        last = coordinator.store.last_thermostat_setpoint
+        if current is not None and last > 0:
+            try:
+                manual_override = abs(float(current) - last) > 0.5
+            except (ValueError, TypeError):
+                pass
 
     device_registry = dr.async_get(hass)
     devices = []
-    for room_config in config_entry.data.get("rooms", []):
-        room_name = room_config.get("name", "")
-        room_key = room_name.lower().replace(" ", "_")
-        device_id = (DOMAIN, f"{config_entry.entry_id}_{room_key}")
+    for room_info in topology:
+        device_id = (DOMAIN, f"{config_entry.entry_id}_{room_info.key}")
         device = device_registry.async_get_device(identifiers={device_id})
         if device:
             devices.append({
@@ -176,6 +151,15 @@ async def async_get_config_entry_diagnostics(
                 "model": device.model,
             })
 
+    efficiency_samples: dict[str, Any] = {}
+    if coordinator:
+        try:
+            efficiency_samples = await hass.async_add_executor_job(
+                coordinator.samples.summary, list(coordinator.topology.keys)
+            )
+        except (OSError, ValueError) as err:
+            efficiency_samples = {"error": str(err)}
+
     return {
         "config": config,
         "main_thermostat": thermostat_state,
@@ -186,5 +170,19 @@ async def async_get_config_entry_diagnostics(
         "manual_override": manual_override,
         "devices": devices,
         "efficiency_data": coordinator.store.export_efficiency() if coordinator else {},
+        "efficiency_samples": efficiency_samples,
+        "snapshot_taken_at": snapshot.taken_at,
+        "state_index": coordinator.state_index_stats() if coordinator else {},
+        "vent_rate_limiter": coordinator.rate_limiter.stats() if coordinator else {},
+        "vent_actuation": coordinator.actuation.stats() if coordinator else {},
+        "vent_planner": (
+            {
+                **coordinator.planner.stats(),
+                "relief_index": coordinator.relief_index.stats(),
+            }
+            if coordinator
+            else {}
+        ),
+        "store": coordinator.store.save_stats() if coordinator else {},
         "timestamp": dt_util.utcnow().isoformat(),
     }
@@ -9,6 +9,8 @@ from homeassistant.core import HomeAssistant
 from homeassistant.util import dt as dt_util
 from homeassistant.exceptions import HomeAssistantError
 
+from .state_access import get_available_state, is_available
+
 _LOGGER = logging.getLogger(__name__)
 
 T = TypeVar('T')
@@ -133,28 +135,7 @@ def validate_entity_state(hass: HomeAssistant, entity_id: str, domain: Optional[
     Returns:
         True if entity is valid and available, False otherwise
     """
-    if not entity_id:
-        return False
-    
-    # Check domain
-    if domain:
-        entity_domain = entity_id.split('.')[0] if '.' in entity_id else None
-        if entity_domain != domain:
-            return False
-    
-    # Check if entity exists
-    if entity_id not in hass.states.async_entity_ids():
-        return False
-    
-    # Check if entity is available
-    state = hass.states.get(entity_id)
-    if not state:
-        return False
-    
-    if state.state in ["unknown", "unavailable", "None", "none"]:
-        return False
-    
-    return True
+    return is_available(hass, entity_id, domain)
 
 
 def get_safe_state(hass: HomeAssistant, entity_id: str, default: Any = None) -> Any:
@@ -168,10 +149,7 @@ def get_safe_state(hass: HomeAssistant, entity_id: str, default: Any = None) ->
     Returns:
         Entity state or default
     """
-    if not validate_entity_state(hass, entity_id):
-        return default
-    
-    state = hass.states.get(entity_id)
+    state = get_available_state(hass, entity_id)
     return state.state if state else default
 
 
@@ -187,10 +165,7 @@ def get_safe_attribute(hass: HomeAssistant, entity_id: str, attribute: str, defa
     Returns:
         Attribute value or default
     """
-    if not validate_entity_state(hass, entity_id):
-        return default
-    
-    state = hass.states.get(entity_id)
+    state = get_available_state(hass, entity_id)
     if not state:
         return default
     
@@ -15,6 +15,7 @@ from homeassistant.helpers.device_registry import DeviceInfo
 from .const import DOMAIN
 from .coordinator import SmartVentControllerCoordinator
 from .device import get_room_device_id
+from .topology import room_key
 
 
 async def async_setup_entry(
@@ -84,14 +85,10 @@ async def async_setup_entry(
                      0, 30, 1, 0, "vents"),
     ])
 
-    rooms = entry.data.get("rooms", [])
-    for room in rooms:
-        room_name = room.get("name", "")
-        room_key = room_name.lower().replace(" ", "_")
+    for room in coordinator.topology:
         entities.append(
             RoomPriorityNumber(
-                coordinator, entry, room_key, room_name,
-                room.get("priority", 5),
+                coordinator, entry, room.key, room.name, room.priority
             )
         )
 
@@ -160,16 +157,13 @@ class RoomPriorityNumber(NumberEntity, RestoreEntity):
 
     @property
     def native_value(self):
-        rooms = self._entry.data.get("rooms", [])
-        for room in rooms:
-            if room.get("name", "").lower().replace(" ", "_") == self._room_key:
-                return room.get("priority", self._default)
-        return self._default
+        room = self.coordinator.topology.get(self._room_key)
+        return room.priority if room is not None else self._default
 
     async def async_set_native_value(self, value: float) -> None:
         rooms = list(self._entry.data.get("rooms", []))
         for i, room in enumerate(rooms):
-            if room.get("name", "").lower().replace(" ", "_") == self._room_key:
+            if room_key(room.get("name", "")) == self._room_key:
                 rooms[i] = {**room, "priority": int(value)}
                 break
         data = dict(self._entry.data)
@@ -0,0 +1,224 @@
+"""Incremental vent planning on top of the stateless algorithm module.
+
+The automation re-plans on every tracked state change, but usually only one
+room's reading has moved.  ``IncrementalTargetPlanner`` remembers the inputs
+and outputs of the previous run so that only rooms whose own inputs changed
+are recomputed, and a finished plan is reused outright when nothing it
+depends on has changed.  ``ReliefCandidateIndex`` keeps relief rooms ranked
+the same way.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Hashable
+
+from .algorithm import (
+    DEFAULT_SETTINGS,
+    AlgorithmSettings,
+    RoomBatch,
+    calculate_targets_batch,
+    is_relief_candidate,
+    relief_active_mode,
+    relief_score,
+)
+
+
+class IncrementalTargetPlanner:
+    """Per-room target cache with dirty-room recomputation.
+
+    Ideal targets depend on global inputs (mode, setpoint, longest time,
+    strategy, settings) and on each room's own temp/rate/active flag.  When
+    a global input changes every room is recomputed; otherwise only rooms
+    whose own inputs differ from the last run are.
+
+    Everything downstream of the ideal targets (floors, airflow deficit,
+    relief, rounding) couples all rooms, so it is cached as a whole under a
+    caller-provided signature instead.
+    """
+
+    def __init__(self) -> None:
+        self._globals: tuple | None = None
+        self._inputs: dict[str, tuple[float | None, float, bool]] = {}
+        self._targets: dict[str, float] = {}
+        self._plan_signature: Hashable | None = None
+        self._plan: dict[str, int] | None = None
+
+        self.full_passes = 0
+        self.incremental_passes = 0
+        self.rooms_recomputed = 0
+        self.plan_hits = 0
+        self.plan_misses = 0
+
+    def targets(
+        self,
+        batch: RoomBatch,
+        hvac_mode: str,
+        setpoint: float,
+        longest_time: float,
+        strategy: str,
+        settings: AlgorithmSettings = DEFAULT_SETTINGS,
+    ) -> dict[str, float]:
+        """Return ideal targets for *batch*, recomputing only dirty rooms.
+
+        Returns a fresh dict the caller may modify.
+        """
+        current_globals = (hvac_mode, setpoint, longest_time, strategy, settings)
+        keys = batch.keys
+        if current_globals != self._globals or len(keys) != len(self._inputs) or any(
+            key not in self._inputs for key in keys
+        ):
+            self._full_pass(batch, current_globals)
+            return dict(self._targets)
+
+        dirty = [
+            index
+            for index, key in enumerate(keys)
+            if self._inputs[key]
+            != (batch.temps[index], batch.rates[index], batch.active[index])
+        ]
+        if dirty:
+            values = calculate_targets_batch(
+                [batch.temps[i] for i in dirty],
+                [batch.rates[i] for i in dirty],
+                [batch.active[i] for i in dirty],
+                hvac_mode,
+                setpoint,
+                longest_time,
+                strategy,
+                settings,
+            )
+            for index, value in zip(dirty, values):
+                key = keys[index]
+                self._inputs[key] = (
+                    batch.temps[index], batch.rates[index], batch.active[index]
+                )
+                self._targets[key] = value
+            self.rooms_recomputed += len(dirty)
+        self.incremental_passes += 1
+        return dict(self._targets)
+
+    def _full_pass(self, batch: RoomBatch, current_globals: tuple) -> None:
+        hvac_mode, setpoint, longest_time, strategy, settings = current_globals
+        values = calculate_targets_batch(
+            batch.temps, batch.rates, batch.active,
+            hvac_mode, setpoint, longest_time, strategy, settings,
+        )
+        self._globals = current_globals
+        self._inputs = {
+            key: (temp, rate, active)
+            for key, temp, rate, active in zip(
+                batch.keys, batch.temps, batch.rates, batch.active
+            )
+        }
+        self._targets = dict(zip(batch.keys, values))
+        self.full_passes += 1
+        self.rooms_recomputed += len(batch.keys)
+
+    def cached_plan(self, signature: Hashable) -> dict[str, int] | None:
+        """Return a copy of the last plan if it was built from *signature*."""
+        if self._plan is not None and signature == self._plan_signature:
+            self.plan_hits += 1
+            return dict(self._plan)
+        self.plan_misses += 1
+        return None
+
+    def store_plan(self, signature: Hashable, plan: dict[str, int]) -> None:
+        """Remember *plan* as the result for *signature*."""
+        self._plan_signature = signature
+        self._plan = dict(plan)
+
+    def invalidate(self) -> None:
+        """Drop all cached state so the next run is a full pass."""
+        self._globals = None
+        self._inputs = {}
+        self._targets = {}
+        self._plan_signature = None
+        self._plan = None
+
+    def stats(self) -> dict[str, int]:
+        """Counters for diagnostics."""
+        return {
+            "full_passes": self.full_passes,
+            "incremental_passes": self.incremental_passes,
+            "rooms_recomputed": self.rooms_recomputed,
+            "plan_hits": self.plan_hits,
+            "plan_misses": self.plan_misses,
+        }
+
+
+class ReliefCandidateIndex:
+    """Relief candidates kept ranked across runs.
+
+    Rooms are re-scored only when their occupancy, priority or delta (or
+    position in the room list, which breaks ties) changes; each change is an
+    O(log n) search plus a list insert.  :meth:`select` walks the ranking
+    from the top, so picking relief rooms costs O(max_relief + skipped)
+    rather than a score-and-sort of every room, and can be repeated cheaply
+    for alternative selections.  Results match
+    :func:`~.algorithm.select_relief_rooms`.
+    """
+
+    def __init__(self) -> None:
+        self._inputs: dict[str, tuple[float, bool, float, int]] = {}
+        self._entries: dict[str, tuple[float, int, str]] = {}
+        self._ranked: list[tuple[float, int, str]] = []
+        self.rescored = 0
+
+    def update(self, batch: RoomBatch) -> None:
+        """Sync the index with *batch*, re-scoring only rooms that changed."""
+        seen: set[str] = set()
+        for order, key in enumerate(batch.keys):
+            if key in seen:
+                continue
+            seen.add(key)
+            inputs = (
+                batch.deltas[order], batch.occupied[order],
+                batch.priorities[order], order,
+            )
+            if self._inputs.get(key) == inputs:
+                continue
+            self._remove(key)
+            entry = (
+                -relief_score(inputs[0], inputs[1], inputs[2]), order, key
+            )
+            self._inputs[key] = inputs
+            self._entries[key] = entry
+            insort(self._ranked, entry)
+            self.rescored += 1
+
+        for key in [key for key in self._entries if key not in seen]:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        del self._ranked[bisect_left(self._ranked, entry)]
+        del self._inputs[key]
+
+    def stats(self) -> dict[str, int]:
+        """Counters for diagnostics."""
+        return {"rooms": len(self._ranked), "rescored": self.rescored}
+
+    def select(
+        self,
+        selected_keys: list[str],
+        hvac_mode: str,
+        hvac_action: str,
+        max_relief: int = 3,
+    ) -> list[str]:
+        """Return up to *max_relief* relief room keys, best first."""
+        active_mode = relief_active_mode(hvac_mode, hvac_action)
+        selected = set(selected_keys)
+        result: list[str] = []
+        if max_relief <= 0:
+            return result
+        for _, _, key in self._ranked:
+            if key in selected:
+                continue
+            if not is_relief_candidate(self._inputs[key][0], active_mode):
+                continue
+            result.append(key)
+            if len(result) >= max_relief:
+                break
+        return result
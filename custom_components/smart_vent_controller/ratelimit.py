@@ -0,0 +1,223 @@
+"""Adaptive rate limiting of vent commands per radio platform.
+
+Covers on one Zigbee or Z-Wave mesh share its bandwidth, so sending a
+hundred position commands at once mostly buys dropped frames and retries.
+:class:`AdaptiveRateLimiter` keeps a token bucket per platform (the
+integration that provides the entity, e.g. ``zha`` or ``zwave_js``) and
+adapts each bucket's rate AIMD-style: it is halved whenever a command takes
+longer than the target latency (or fails) and grows back by a fixed step
+for every command that is handled in time.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of refusals.
+
+    :meth:`reserve` always takes the tokens, letting the balance go negative,
+    and returns how long the caller must wait before using them.  Callers
+    are therefore served in the order they reserved.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "_updated", "_clock")
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take *tokens* and return the seconds to wait before using them."""
+        self._refill()
+        self.tokens -= tokens
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate, keeping the tokens earned so far."""
+        self._refill()
+        self.rate = rate
+
+
+class AdaptiveRateLimiter:
+    """Per-platform token buckets with additive-increase/multiplicative-decrease."""
+
+    def __init__(
+        self,
+        max_rate: float,
+        *,
+        min_rate: float = 0.5,
+        burst: float | None = None,
+        target_latency: float = 1.5,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        adaptive: bool = True,
+        platform_of: Callable[[str], str] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            max_rate: Commands per second a platform starts at and recovers to
+            min_rate: Floor the rate never drops below
+            burst: Commands a platform may send back to back (default: one
+                second's worth at ``max_rate``)
+            target_latency: Seconds a command may take before it counts as slow
+            increase: Rate added for every command handled in time
+            decrease: Factor the rate is multiplied by after a slow command
+            adaptive: If false, every platform stays at ``max_rate``
+            platform_of: Maps an entity id to its platform (default: its domain)
+        """
+        self._min_rate = min_rate
+        self._burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self._buckets: dict[str, TokenBucket] = {}
+        self.configure(max_rate, target_latency=target_latency, adaptive=adaptive)
+        self._platform_of = platform_of or (lambda entity_id: entity_id.split(".", 1)[0])
+        self._clock = clock
+        self._sleep = sleep
+        self._platforms: dict[str, str] = {}
+        self._stats: dict[str, dict[str, float]] = {}
+
+    def configure(
+        self, max_rate: float, *, target_latency: float, adaptive: bool
+    ) -> None:
+        """Apply new settings, keeping each platform's learned rate.
+
+        A rate above the new ``max_rate`` is lowered to it; without
+        adaptation every platform runs at ``max_rate``.
+        """
+        self.max_rate = max_rate
+        self.min_rate = min(self._min_rate, max_rate)
+        self.burst = self._burst if self._burst is not None else max_rate
+        self.target_latency = target_latency
+        self.adaptive = adaptive
+        for bucket in self._buckets.values():
+            bucket.burst = max(1.0, self.burst)
+            bucket.tokens = min(bucket.tokens, bucket.burst)
+            rate = min(bucket.rate, max_rate) if adaptive else max_rate
+            bucket.set_rate(max(self.min_rate, rate))
+
+    def platform(self, entity_id: str) -> str:
+        """Platform of *entity_id* (resolved once, then remembered)."""
+        platform = self._platforms.get(entity_id)
+        if platform is None:
+            platform = self._platforms[entity_id] = self._platform_of(entity_id)
+        return platform
+
+    def forget_platforms(self) -> None:
+        """Drop remembered platforms, e.g. after the rooms changed."""
+        self._platforms.clear()
+
+    def bucket(self, platform: str) -> TokenBucket:
+        """Token bucket of *platform*, created at ``max_rate`` on first use."""
+        bucket = self._buckets.get(platform)
+        if bucket is None:
+            bucket = self._buckets[platform] = TokenBucket(
+                self.max_rate, self.burst, self._clock
+            )
+            self._stats[platform] = {
+                "commands": 0,
+                "slow": 0,
+                "decreases": 0,
+                "waited": 0.0,
+            }
+        return bucket
+
+    def _by_platform(self, entity_ids: Iterable[str]) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for entity_id in entity_ids:
+            platform = self.platform(entity_id)
+            counts[platform] = counts.get(platform, 0) + 1
+        return counts
+
+    def split(self, entity_ids: Iterable[str]) -> list[list[str]]:
+        """Group *entity_ids* by platform, at most ``burst`` per group.
+
+        A call for more entities than a platform's burst would wait for all
+        of their tokens and then send every command at once; split into
+        these groups, the commands go out paced like individual calls.
+        """
+        size = max(1, int(self.burst))
+        by_platform: dict[str, list[str]] = {}
+        for entity_id in entity_ids:
+            by_platform.setdefault(self.platform(entity_id), []).append(entity_id)
+        return [
+            members[start:start + size]
+            for members in by_platform.values()
+            for start in range(0, len(members), size)
+        ]
+
+    async def acquire(self, entity_ids: Iterable[str]) -> float:
+        """Wait until every platform in *entity_ids* may take its commands.
+
+        One token is taken per entity, so a multi-entity call is paced like
+        the individual radio commands it turns into.  Returns the seconds
+        waited.
+        """
+        delay = 0.0
+        for platform, count in self._by_platform(entity_ids).items():
+            wait = self.bucket(platform).reserve(count)
+            stats = self._stats[platform]
+            stats["commands"] += count
+            stats["waited"] += wait
+            delay = max(delay, wait)
+        if delay > 0:
+            await self._sleep(delay)
+        return delay
+
+    def observe(self, entity_ids: Iterable[str], latency: float, success: bool = True) -> None:
+        """Adapt the rates of the platforms behind a finished command."""
+        if not self.adaptive:
+            return
+        slow = not success or latency > self.target_latency
+        for platform, count in self._by_platform(entity_ids).items():
+            bucket = self.bucket(platform)
+            stats = self._stats[platform]
+            if slow:
+                stats["slow"] += count
+                rate = max(self.min_rate, bucket.rate * self.decrease)
+                if rate < bucket.rate:
+                    stats["decreases"] += 1
+            else:
+                rate = min(self.max_rate, bucket.rate + self.increase * count)
+            bucket.set_rate(rate)
+
+    def stats(self) -> dict[str, Any]:
+        """Configuration and current rate of every platform seen so far."""
+        return {
+            "max_rate": self.max_rate,
+            "min_rate": self.min_rate,
+            "burst": self.burst,
+            "target_latency_ms": round(self.target_latency * 1000),
+            "adaptive": self.adaptive,
+            "platforms": {
+                platform: {
+                    "rate": round(bucket.rate, 2),
+                    "tokens": round(bucket.tokens, 2),
+                    "commands": int(self._stats[platform]["commands"]),
+                    "slow": int(self._stats[platform]["slow"]),
+                    "decreases": int(self._stats[platform]["decreases"]),
+                    "waited_ms": round(self._stats[platform]["waited"] * 1000, 1),
+                }
+                for platform, bucket in self._buckets.items()
+            },
+        }
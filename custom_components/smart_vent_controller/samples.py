@@ -0,0 +1,290 @@
+"""Raw efficiency observations, kept per room and mode in a binary sidecar.
+
+The learned rates in the store are blends; every cycle observation that went
+into them is also recorded here, so rates can be re-fitted and outliers
+inspected later.  Samples are packed :data:`RECORD` structs in one file per
+config entry:
+
+* a 16-byte header (magic, version, record size, ring capacity), then
+* one region per (room, mode): a 64-byte ring header holding the room key
+  and mode, followed by ``capacity`` record slots used as a ring buffer.
+
+Appending writes a single record in place, so its cost does not depend on
+how many samples exist.  Regions of rooms that are no longer configured are
+released by :meth:`EfficiencySampleStore.retain` and reused by new rings;
+released regions at the end of the file are truncated away.  The file is
+opened on first use and read through a read-only ``mmap``; the ring
+positions are recovered from the record timestamps (an all-zero slot is
+empty), so nothing else has to be persisted alongside it.  All methods do
+blocking I/O and are meant to run in the executor.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import mmap
+import os
+import statistics
+import struct
+import threading
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+MAGIC = b"SVES"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI4x")
+RING_HEADER = struct.Struct("<59sB4x")
+# timestamp, start temp, end temp, minutes, aperture %, rate, outcome
+RECORD = struct.Struct("<dfffffB3x")
+
+ACCEPTED = 0
+REJECTED = 1
+
+_MODES = {"heat": 0, "cool": 1}
+_MODE_NAMES = {code: name for name, code in _MODES.items()}
+# Mode byte of a released region.
+_FREE = 0xFF
+_KEY_BYTES = RING_HEADER.size - 5
+
+
+def _ring_key(room_key: str) -> str:
+    """*room_key* as it fits in a ring header.
+
+    A key longer than the header allows keeps a readable prefix and gets a
+    hash of the whole key appended, so distinct keys never share a ring.
+    """
+    raw = room_key.encode()
+    if len(raw) <= _KEY_BYTES:
+        return room_key
+    digest = hashlib.blake2b(raw, digest_size=8).hexdigest()
+    # Cutting the prefix may split a character; only its bytes are dropped.
+    prefix = raw[: _KEY_BYTES - len(digest) - 1].decode(errors="ignore")
+    return f"{prefix}~{digest}"
+
+
+def sample_mode(hvac_mode: str) -> str:
+    """Ring a cycle's samples go to: ``"cool"`` or ``"heat"``."""
+    return "cool" if hvac_mode in ("cool", "cooling") else "heat"
+
+
+class EfficiencySample(NamedTuple):
+    """One HVAC cycle observation for one room."""
+
+    timestamp: float
+    start_temp: float
+    end_temp: float
+    minutes: float
+    aperture: float
+    rate: float | None
+    outcome: int
+
+
+class _Ring:
+    __slots__ = ("offset", "head", "count")
+
+    def __init__(self, offset: int, head: int = 0, count: int = 0) -> None:
+        self.offset = offset
+        self.head = head
+        self.count = count
+
+
+class EfficiencySampleStore:
+    """Per-room, per-mode ring buffers of efficiency samples on disk."""
+
+    def __init__(self, path: str, capacity: int = 256) -> None:
+        self.path = path
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._fd: int | None = None
+        self._map: mmap.mmap | None = None
+        self._size = 0
+        self._rings: dict[tuple[str, str], _Ring] = {}
+        self._free: list[int] = []
+
+    @property
+    def _region_size(self) -> int:
+        return RING_HEADER.size + self.capacity * RECORD.size
+
+    # -- file handling ------------------------------------------------------
+
+    def _open(self) -> None:
+        if self._fd is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(fd).st_size
+        if size >= HEADER.size:
+            magic, version, record_size, capacity = HEADER.unpack(
+                os.pread(fd, HEADER.size, 0)
+            )
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                os.close(fd)
+                raise ValueError(f"{self.path} is not an efficiency sample file")
+            # The file's layout wins over the configured capacity.
+            self.capacity = capacity
+        else:
+            os.ftruncate(fd, 0)
+            os.pwrite(fd, HEADER.pack(MAGIC, VERSION, RECORD.size, self.capacity), 0)
+            size = HEADER.size
+        self._fd = fd
+        self._remap(size)
+        # Only ring headers are read here; a ring's records on first use.
+        offset = HEADER.size
+        while offset + self._region_size <= size:
+            raw_key, mode = RING_HEADER.unpack_from(self._map, offset)
+            if mode == _FREE:
+                self._free.append(offset)
+            else:
+                key = raw_key.rstrip(b"\0").decode(errors="ignore")
+                self._rings[(key, _MODE_NAMES.get(mode, "heat"))] = _Ring(offset, -1)
+            offset += self._region_size
+        if offset < size:
+            # A region cut short by a crash while it was being added.
+            os.ftruncate(fd, offset)
+            self._remap(offset)
+
+    def _remap(self, size: int) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._size = size
+        self._map = mmap.mmap(self._fd, size, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """Release the file (it is reopened on next use)."""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._rings.clear()
+            self._free.clear()
+
+    def _ring(self, room_key: str, mode: str, create: bool) -> _Ring | None:
+        room_key = _ring_key(room_key)
+        ring = self._rings.get((room_key, mode))
+        if ring is None:
+            if not create:
+                return None
+            header = RING_HEADER.pack(room_key.encode(), _MODES[mode])
+            records = bytes(self.capacity * RECORD.size)
+            if self._free:
+                # Clear the old records before the header claims them.
+                offset = self._free.pop(0)
+                os.pwrite(self._fd, records, offset + RING_HEADER.size)
+                os.pwrite(self._fd, header, offset)
+            else:
+                offset = self._size
+                os.pwrite(self._fd, header + records, offset)
+                self._remap(offset + len(header) + len(records))
+            ring = self._rings[(room_key, mode)] = _Ring(offset)
+        elif ring.head < 0:
+            self._scan(ring)
+        return ring
+
+    def _scan(self, ring: _Ring) -> None:
+        """Recover head and count from the ring's timestamps."""
+        start = ring.offset + RING_HEADER.size
+        timestamps = [
+            RECORD.unpack_from(self._map, start + slot * RECORD.size)[0]
+            for slot in range(self.capacity)
+        ]
+        used = [slot for slot, ts in enumerate(timestamps) if ts > 0]
+        ring.count = len(used)
+        if not used:
+            ring.head = 0
+            return
+        newest = max(used, key=timestamps.__getitem__)
+        ring.head = (newest + 1) % self.capacity
+
+    # -- public API ---------------------------------------------------------
+
+    def append(self, room_key: str, mode: str, sample: EfficiencySample) -> None:
+        """Record *sample*, overwriting the oldest one once the ring is full."""
+        self.extend([(room_key, mode, sample)])
+
+    def extend(self, samples: list[tuple[str, str, EfficiencySample]]) -> None:
+        """Record several ``(room_key, mode, sample)`` observations."""
+        with self._lock:
+            self._open()
+            for room_key, mode, sample in samples:
+                ring = self._ring(room_key, mode, create=True)
+                rate = math.nan if sample.rate is None else sample.rate
+                record = RECORD.pack(
+                    sample.timestamp, sample.start_temp, sample.end_temp,
+                    sample.minutes, sample.aperture, rate, sample.outcome,
+                )
+                os.pwrite(
+                    self._fd,
+                    record,
+                    ring.offset + RING_HEADER.size + ring.head * RECORD.size,
+                )
+                ring.head = (ring.head + 1) % self.capacity
+                ring.count = min(ring.count + 1, self.capacity)
+
+    def samples(self, room_key: str, mode: str) -> list[EfficiencySample]:
+        """The ring's samples, oldest first."""
+        with self._lock:
+            if self._fd is None and not os.path.exists(self.path):
+                return []
+            self._open()
+            ring = self._ring(room_key, mode, create=False)
+            if ring is None or not ring.count:
+                return []
+            start = ring.offset + RING_HEADER.size
+            first = (ring.head - ring.count) % self.capacity
+            result = []
+            for index in range(ring.count):
+                slot = (first + index) % self.capacity
+                values = RECORD.unpack_from(self._map, start + slot * RECORD.size)
+                rate = None if math.isnan(values[5]) else values[5]
+                result.append(EfficiencySample(*values[:5], rate, values[6]))
+            return result
+
+    def retain(self, room_keys: list[str]) -> int:
+        """Release the rings of rooms not in *room_keys*; return how many."""
+        with self._lock:
+            if self._fd is None and not os.path.exists(self.path):
+                return 0
+            self._open()
+            keep = {_ring_key(key) for key in room_keys}
+            dropped = [ring_id for ring_id in self._rings if ring_id[0] not in keep]
+            for ring_id in dropped:
+                offset = self._rings.pop(ring_id).offset
+                os.pwrite(self._fd, RING_HEADER.pack(b"", _FREE), offset)
+                self._free.append(offset)
+            self._free.sort()
+            end = self._size
+            while self._free and self._free[-1] + self._region_size == end:
+                end = self._free.pop()
+            if end < self._size:
+                os.ftruncate(self._fd, end)
+                self._remap(end)
+            return len(dropped)
+
+    def rings(self) -> list[tuple[str, str]]:
+        """Every (room key, mode) with a ring in the file."""
+        with self._lock:
+            if self._fd is None and not os.path.exists(self.path):
+                return []
+            self._open()
+            return list(self._rings)
+
+    def summary(self, room_keys: Iterable[str] = ()) -> dict[str, Any]:
+        """Sample counts and median accepted rate per room and mode.
+
+        Rooms in *room_keys* are reported under their own key rather than the
+        shortened one their ring header holds.
+        """
+        names = {_ring_key(key): key for key in room_keys}
+        result: dict[str, Any] = {}
+        for ring_key, mode in self.rings():
+            samples = self.samples(ring_key, mode)
+            rates = [s.rate for s in samples if s.outcome == ACCEPTED and s.rate is not None]
+            result.setdefault(names.get(ring_key, ring_key), {})[mode] = {
+                "samples": len(samples),
+                "accepted": len(rates),
+                "median_rate": round(statistics.median(rates), 4) if rates else None,
+            }
+        return result
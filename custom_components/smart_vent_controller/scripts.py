@@ -7,6 +7,7 @@ Thermostat control reads/writes cycle state via the coordinator's store.
 from __future__ import annotations
 
 import logging
+from functools import partial
 from typing import TYPE_CHECKING
 from homeassistant.util import dt as dt_util
 
@@ -21,13 +22,14 @@ from .const import (
     DEFAULT_TEMP_ERROR_OVERRIDE_F,
     DEFAULT_CONVENTIONAL_VENT_COUNT,
     DEFAULT_CONTROL_STRATEGY,
+    DEFAULT_PLAN_SOLVER,
+    DEFAULT_PLAN_SOLVER_BUDGET_MS,
+    DEFAULT_VENT_COMMAND_CONCURRENCY,
+    VENT_COMMAND_TIMEOUT_SEC,
 )
 from .error_handling import (
     safe_float,
     safe_int,
-    validate_entity_state,
-    get_safe_state,
-    get_safe_attribute,
     safe_service_call,
     validate_temperature,
     validate_vent_position,
@@ -35,16 +37,21 @@ from .error_handling import (
     EntityUnavailableError,
     ServiceCallError,
 )
+from .actuation import ABANDONED, IN_FLIGHT, RETRY
 from .cache import ServiceCallBatcher
+from .snapshot import HouseSnapshot, ThermostatSnapshot, build_house_snapshot
+from .topology import RoomTopology
+from .state_access import parse_float
+from .planner import IncrementalTargetPlanner, ReliefCandidateIndex
 from .algorithm import (
     AlgorithmSettings,
-    round_to_granularity,
-    calculate_all_vent_targets,
+    RoomBatch,
+    round_plan_to_granularity,
     calculate_longest_time_to_target,
     adjust_for_minimum_airflow,
     compute_simple_targets,
-    select_relief_rooms,
     should_pre_adjust,
+    solve_vent_plan,
 )
 
 if TYPE_CHECKING:
@@ -53,6 +60,24 @@ if TYPE_CHECKING:
 _LOGGER = logging.getLogger(__name__)
 
 
+def _resolve_topology(entry, coordinator) -> RoomTopology:
+    """The coordinator's compiled rooms, else a one-off compile of *entry*."""
+    if coordinator is not None:
+        return coordinator.topology
+    return RoomTopology.from_entry_data(entry.data)
+
+
+def _resolve_snapshot(
+    hass: HomeAssistant, entry, coordinator, snapshot: HouseSnapshot | None
+) -> HouseSnapshot:
+    """Use *snapshot* if given, else take a fresh one (shared via the coordinator)."""
+    if snapshot is not None:
+        return snapshot
+    if coordinator is not None:
+        return coordinator.refresh_snapshot()
+    return build_house_snapshot(hass, RoomTopology.from_entry_data(entry.data))
+
+
 class VentControlScript:
     """Controls vent positions using learned efficiency or simple targeting."""
 
@@ -60,8 +85,13 @@ class VentControlScript:
         self.hass = hass
         self.entry = entry
         self.error_recovery = ErrorRecovery(hass, entry)
+        self._planner = IncrementalTargetPlanner()
+        self._relief_index = ReliefCandidateIndex()
+        self.last_dispatch: dict | None = None
 
-    async def async_run(self, rooms_csv: str = "") -> None:
+    async def async_run(
+        self, rooms_csv: str = "", snapshot: HouseSnapshot | None = None
+    ) -> None:
         try:
             if not self.entry.options.get("auto_vent_control", True):
                 return
@@ -77,8 +107,16 @@ class VentControlScript:
                 DOMAIN, {}
             ).get(self.entry.entry_id)
 
-            main_thermostat = self.entry.data.get("main_thermostat")
-            if not validate_entity_state(self.hass, main_thermostat, "climate"):
+            if coordinator is not None:
+                # Share cached plans with the entry's other vent scripts.
+                self._planner = coordinator.planner
+                self._relief_index = coordinator.relief_index
+
+            topology = _resolve_topology(self.entry, coordinator)
+            main_thermostat = topology.main_thermostat
+            snapshot = _resolve_snapshot(self.hass, self.entry, coordinator, snapshot)
+            thermo_state = snapshot.thermostat
+            if thermo_state is None or not thermo_state.available:
                 _LOGGER.error("Thermostat %s unavailable", main_thermostat)
                 self.error_recovery.record_error(
                     "vent_control",
@@ -86,15 +124,13 @@ class VentControlScript:
                 )
                 return
 
-            thermo_state = self.hass.states.get(main_thermostat)
-            mode = thermo_state.state if thermo_state else "off"
-            action = get_safe_attribute(self.hass, main_thermostat, "hvac_action", "idle")
+            mode = thermo_state.state
+            action = thermo_state.hvac_action
 
-            selected_list = self._parse_rooms_csv(rooms_csv)
-            rooms_data = self._collect_rooms_data(coordinator)
-            all_vents = self._collect_all_vents()
+            selected_list = topology.parse_csv(rooms_csv)
+            rooms_data = self._collect_rooms_data(topology, snapshot)
 
-            if not all_vents:
+            if not topology.vents:
                 _LOGGER.warning("No vent entities configured.")
                 return
 
@@ -141,6 +177,13 @@ class VentControlScript:
                 self.entry.options.get("initial_efficiency", DEFAULT_INITIAL_EFFICIENCY),
                 DEFAULT_INITIAL_EFFICIENCY, 1, 100,
             )
+            plan_solver = self.entry.options.get("plan_solver", DEFAULT_PLAN_SOLVER)
+            solver_budget_ms = safe_int(
+                self.entry.options.get(
+                    "plan_solver_budget_ms", DEFAULT_PLAN_SOLVER_BUDGET_MS
+                ),
+                DEFAULT_PLAN_SOLVER_BUDGET_MS, 10, 5000,
+            )
 
             if debug:
                 _LOGGER.info(
@@ -150,28 +193,30 @@ class VentControlScript:
 
             # Build per-room algorithm inputs
             hvac_mode = action if action in ("heating", "cooling") else mode
-            setpoint = self._resolve_setpoint(main_thermostat, hvac_mode)
+            setpoint = self._resolve_setpoint(thermo_state, hvac_mode)
 
             use_learned = strategy in ("learned", "hybrid") and coordinator is not None
-            algo_rooms: list[dict] = []
+            default_rate = initial_eff / 100.0 * 0.05
+            algo_rooms = RoomBatch()
             for rd in rooms_data:
                 rate = 0.0
                 if use_learned and coordinator:
                     rate = coordinator.store.get_effective_rate(rd["key"], hvac_mode)
                 if rate <= 0:
-                    rate = initial_eff / 100.0 * 0.05
-
-                algo_rooms.append({
-                    "key": rd["key"],
-                    "temp": rd.get("current_temp"),
-                    "rate": rate,
-                    "active": True,
-                    "delta": rd.get("delta", 0),
-                    "occupied": rd.get("occupied", False),
-                    "priority": rd.get("priority", 5),
-                })
+                    rate = default_rate
+
+                algo_rooms.append(
+                    rd["key"],
+                    rd.get("current_temp"),
+                    rate,
+                    True,
+                    rd.get("delta", 0),
+                    rd.get("occupied", False),
+                    rd.get("priority", 5),
+                )
 
             # Compute targets
+            floors: dict[str, float] = {}
             if strategy == "simple" or setpoint is None:
                 targets = compute_simple_targets(
                     rooms_data, selected_list, mode, action, min_open
@@ -186,69 +231,90 @@ class VentControlScript:
                 if longest_time <= 0:
                     longest_time = 30.0
 
-                targets = calculate_all_vent_targets(
-                    algo_rooms, hvac_mode, setpoint, longest_time,
-                    strategy=strategy,
+                targets = self._planner.targets(
+                    algo_rooms, hvac_mode, setpoint, longest_time, strategy
                 )
                 for key in selected_list:
-                    targets[key] = max(targets.get(key, 0), 80.0)
+                    floors[key] = 80.0
 
             # Enforce minimum open for non-selected rooms
             for rd in rooms_data:
                 key = rd["key"]
                 if key not in selected_list:
-                    targets[key] = max(targets.get(key, 0), float(min_open))
-
-            # Minimum airflow adjustment
-            targets = adjust_for_minimum_airflow(
-                targets, algo_rooms, hvac_mode, conv_vents
+                    floors[key] = float(min_open)
+
+            # Reuse the previous plan when nothing it depends on has changed
+            plan_signature = (
+                plan_solver, solver_budget_ms, granularity, conv_vents,
+                closed_thr, relief_pct, max_relief, mode, action,
+                tuple(selected_list), tuple(targets.items()),
+                tuple(floors.items()), tuple(algo_rooms.temps),
+                tuple(algo_rooms.deltas), tuple(algo_rooms.occupied),
+                tuple(algo_rooms.priorities),
             )
-
-            # Relief vents: open non-selected rooms to relieve back-pressure
-            # when too many vents are at or below the closed threshold.
-            closed_count = sum(
-                1 for pct in targets.values() if pct <= closed_thr
-            )
-            if closed_count > 0:
-                relief_rooms = select_relief_rooms(
-                    algo_rooms, selected_list, mode, action, max_relief
-                )
-                for rr in relief_rooms:
-                    rr_key = rr["key"]
-                    if targets.get(rr_key, 0) < relief_pct:
-                        targets[rr_key] = float(relief_pct)
-                        if debug:
-                            _LOGGER.info(
-                                "Relief vent: opening %s to %d%%", rr_key, relief_pct,
-                            )
-
-            # Round to granularity
-            final_targets: dict[str, int] = {}
-            for key, pct in targets.items():
-                final_targets[key] = round_to_granularity(pct, granularity)
+            final_targets = self._planner.cached_plan(plan_signature)
+            if final_targets is None:
+                if plan_solver == "joint":
+                    final_targets = await self._async_solve_joint_plan(
+                        targets, floors, algo_rooms, selected_list, mode, action,
+                        hvac_mode, granularity, conv_vents, closed_thr,
+                        relief_pct, max_relief, solver_budget_ms / 1000.0, debug,
+                    )
+                else:
+                    final_targets = self._sequential_plan(
+                        targets, floors, algo_rooms, selected_list, mode, action,
+                        hvac_mode, granularity, conv_vents, closed_thr,
+                        relief_pct, max_relief, debug,
+                    )
+                self._planner.store_plan(plan_signature, final_targets)
+            elif debug:
+                _LOGGER.info("Vent plan unchanged; reusing previous targets")
 
             # Apply to vents with throttling
+            concurrency = safe_int(
+                self.entry.options.get(
+                    "vent_command_concurrency", DEFAULT_VENT_COMMAND_CONCURRENCY
+                ),
+                DEFAULT_VENT_COMMAND_CONCURRENCY, 1, 32,
+            )
             now_ts = dt_util.utcnow().timestamp()
-            async with ServiceCallBatcher(self.hass, batch_size=10) as batcher:
+            tracker = coordinator.actuation if coordinator else None
+            # Vents sharing a target are moved with one multi-entity call.
+            # With a tracker, the limiter adapts to confirmation latency.
+            async with ServiceCallBatcher(
+                self.hass,
+                batch_size=None,
+                max_concurrency=concurrency,
+                call_timeout=VENT_COMMAND_TIMEOUT_SEC,
+                coalesce=True,
+                rate_limiter=coordinator.rate_limiter if coordinator else None,
+                observe_latency=tracker is None,
+                on_dispatch=tracker.dispatched if tracker else None,
+            ) as batcher:
                 for rd in rooms_data:
                     key = rd["key"]
                     target_pos = final_targets.get(key, min_open)
-                    for vent_entity in rd.get("vent_entities", []):
-                        if not validate_entity_state(self.hass, vent_entity, "cover"):
+                    for vent in rd["vents"]:
+                        if not vent.available or not vent.entity_id.startswith("cover."):
                             continue
                         if not validate_vent_position(target_pos):
                             continue
+                        vent_entity = vent.entity_id
+                        retry = False
+                        if tracker is not None:
+                            # Still moving to this target, or given up on:
+                            # don't send it again.
+                            tracker.observe(vent_entity, vent.position)
+                            decision = tracker.check(vent_entity, target_pos)
+                            if decision in (IN_FLIGHT, ABANDONED):
+                                continue
+                            retry = decision == RETRY
+                        current_pos = safe_int(vent.position, target_pos, 0, 100)
 
-                        current_pos = safe_int(
-                            get_safe_attribute(
-                                self.hass, vent_entity, "current_position", target_pos
-                            ),
-                            target_pos, 0, 100,
-                        )
                         move = abs(current_pos - target_pos)
 
                         temp_error = abs(rd.get("delta", 0))
-                        force = temp_error >= temp_error_override
+                        force = retry or temp_error >= temp_error_override
 
                         if not force and move < min_adj_pct:
                             continue
@@ -260,19 +326,39 @@ class VentControlScript:
                                 if elapsed_min < min_adj_interval:
                                     continue
 
+                        if tracker is not None:
+                            tracker.sent(vent_entity, target_pos)
                         await batcher.add_call(
                             "cover",
                             "set_cover_position",
                             {"entity_id": vent_entity, "position": target_pos},
                         )
-                        if coordinator:
-                            coordinator.store.set_vent_last_adjusted(vent_entity, now_ts)
 
                         if debug:
                             _LOGGER.info(
                                 "Vent %s: %d%% -> %d%%", vent_entity, current_pos, target_pos
                             )
 
+            if tracker is not None:
+                tracker.failed(e for o in batcher.failures for e in o.entity_ids)
+            if coordinator:
+                for vent_entity in batcher.succeeded_entities():
+                    coordinator.store.set_vent_last_adjusted(vent_entity, now_ts)
+                if batcher.outcomes:
+                    coordinator.store.schedule_save()
+
+            self.last_dispatch = batcher.stats()
+            if debug and batcher.outcomes:
+                _LOGGER.info("Vent commands: %s", self.last_dispatch)
+            if batcher.failures:
+                self.error_recovery.record_error(
+                    "vent_control",
+                    ServiceCallError(
+                        f"{len(batcher.failures)} vent command(s) failed"
+                    ),
+                )
+                return
+
             self.error_recovery.reset_errors("vent_control")
 
         except Exception as exc:
@@ -282,83 +368,143 @@ class VentControlScript:
 
     # -- helpers ------------------------------------------------------------
 
-    def _parse_rooms_csv(self, csv: str) -> list[str]:
-        if not csv or csv.strip() in ("", "none"):
-            return []
-        rooms = self.entry.data.get("rooms", [])
-        valid = {r.get("name", "").lower().replace(" ", "_") for r in rooms}
-        return [p.strip() for p in csv.split(",") if p.strip() in valid]
+    def _sequential_plan(
+        self,
+        targets: dict[str, float],
+        floors: dict[str, float],
+        algo_rooms: RoomBatch,
+        selected_list: list[str],
+        mode: str,
+        action: str,
+        hvac_mode: str,
+        granularity: int,
+        conv_vents: int,
+        closed_thr: int,
+        relief_pct: int,
+        max_relief: int,
+        debug: bool,
+    ) -> dict[str, int]:
+        """Apply floors, minimum airflow, relief and rounding one after another."""
+        for key, floor in floors.items():
+            targets[key] = max(targets.get(key, 0), floor)
+
+        # Minimum airflow adjustment
+        targets = adjust_for_minimum_airflow(
+            targets, algo_rooms, hvac_mode, conv_vents
+        )
+
+        # Relief vents: open non-selected rooms to relieve back-pressure
+        # when too many vents are at or below the closed threshold.
+        closed_count = sum(
+            1 for pct in targets.values() if pct <= closed_thr
+        )
+        if closed_count > 0:
+            self._relief_index.update(algo_rooms)
+            relief_keys = self._relief_index.select(
+                selected_list, mode, action, max_relief
+            )
+            for rr_key in relief_keys:
+                if targets.get(rr_key, 0) < relief_pct:
+                    targets[rr_key] = float(relief_pct)
+                    if debug:
+                        _LOGGER.info(
+                            "Relief vent: opening %s to %d%%", rr_key, relief_pct,
+                        )
+
+        # Round to granularity across the whole plan so the rounded
+        # plan keeps the airflow the continuous plan provided.
+        return round_plan_to_granularity(targets, granularity)
+
+    async def _async_solve_joint_plan(
+        self,
+        targets: dict[str, float],
+        floors: dict[str, float],
+        algo_rooms: RoomBatch,
+        selected_list: list[str],
+        mode: str,
+        action: str,
+        hvac_mode: str,
+        granularity: int,
+        conv_vents: int,
+        closed_thr: int,
+        relief_pct: int,
+        max_relief: int,
+        time_budget: float,
+        debug: bool,
+    ) -> dict[str, int]:
+        """Fold relief rooms into the floors and solve the plan off the loop."""
+        # Count closed vents as the sequential plan does: after the floors
+        # and the minimum-airflow boost.
+        boosted = dict(targets)
+        for key, floor in floors.items():
+            boosted[key] = max(boosted.get(key, 0), floor)
+        adjust_for_minimum_airflow(boosted, algo_rooms, hvac_mode, conv_vents)
+        closed_count = sum(1 for pct in boosted.values() if pct <= closed_thr)
+        if closed_count > 0:
+            self._relief_index.update(algo_rooms)
+            relief_keys = self._relief_index.select(
+                selected_list, mode, action, max_relief
+            )
+            for rr_key in relief_keys:
+                floors[rr_key] = max(floors.get(rr_key, 0.0), float(relief_pct))
+                if debug:
+                    _LOGGER.info(
+                        "Relief vent: opening %s to %d%%", rr_key, relief_pct,
+                    )
+
+        return await self.hass.async_add_executor_job(
+            partial(
+                solve_vent_plan,
+                targets,
+                floors,
+                algo_rooms,
+                hvac_mode,
+                granularity,
+                conventional_vent_count=conv_vents,
+                time_budget=time_budget,
+            )
+        )
 
-    def _collect_rooms_data(self, coordinator) -> list[dict]:
-        rooms_config = self.entry.data.get("rooms", [])
+    def _collect_rooms_data(
+        self, topology: RoomTopology, snapshot: HouseSnapshot
+    ) -> list[dict]:
         result: list[dict] = []
-        for rc in rooms_config:
-            key = rc.get("name", "").lower().replace(" ", "_")
-            climate = rc.get("climate_entity")
-            temp_sensor = rc.get("temp_sensor", "")
-            occ_sensor = rc.get("occupancy_sensor", "")
-            vents = rc.get("vent_entities", [])
-            priority = rc.get("priority", 5)
-
-            current = None
-            if temp_sensor and validate_entity_state(self.hass, temp_sensor, "sensor"):
-                v = get_safe_state(self.hass, temp_sensor)
-                if v:
-                    current = safe_float(v, min_val=32.0, max_val=110.0) or None
-            if current is None and climate and validate_entity_state(self.hass, climate, "climate"):
-                t = get_safe_attribute(self.hass, climate, "current_temperature")
-                if t is not None:
-                    current = safe_float(t, min_val=32.0, max_val=110.0) or None
+        for info in topology.rooms:
+            key = info.key
+            room = snapshot.rooms.get(key)
+            if room is None:
+                continue
+
+            current = parse_float(room.current_temp, min_val=32.0, max_val=110.0)
 
             # Target setpoint: prefer integration store, then external climate
             target = None
-            if coordinator:
-                stored = coordinator.store.get_room_setpoint(key)
-                if stored is not None:
-                    target = safe_float(stored, min_val=40.0, max_val=100.0) or None
-            if target is None and climate and validate_entity_state(self.hass, climate, "climate"):
-                t = get_safe_attribute(self.hass, climate, "temperature")
-                if t is not None:
-                    target = safe_float(t, min_val=40.0, max_val=100.0) or None
-                else:
-                    lo = get_safe_attribute(self.hass, climate, "target_temp_low")
-                    hi = get_safe_attribute(self.hass, climate, "target_temp_high")
-                    if lo is not None and hi is not None:
-                        lo_f = safe_float(lo, min_val=40.0, max_val=100.0)
-                        hi_f = safe_float(hi, min_val=40.0, max_val=100.0)
-                        if lo_f and hi_f:
-                            target = (lo_f + hi_f) / 2
+            if room.setpoint is not None:
+                target = safe_float(room.setpoint, min_val=40.0, max_val=100.0) or None
+            if target is None:
+                target = parse_float(room.climate_target, min_val=40.0, max_val=100.0)
 
             delta = (target - current) if target and current else 0.0
-            occupied = False
-            if occ_sensor and validate_entity_state(self.hass, occ_sensor, "binary_sensor"):
-                occupied = get_safe_state(self.hass, occ_sensor) == "on"
 
             result.append({
                 "key": key,
-                "name": rc.get("name", ""),
-                "climate_entity": climate,
-                "temp_sensor": temp_sensor,
-                "occ_sensor": occ_sensor,
-                "vent_entities": vents,
-                "priority": priority,
+                "name": info.name,
+                "climate_entity": info.climate_entity,
+                "temp_sensor": info.temp_sensor or "",
+                "occ_sensor": info.occupancy_sensor or "",
+                "vent_entities": info.vents,
+                "vents": room.vents,
+                "priority": info.priority,
                 "current_temp": current,
                 "target_temp": target,
                 "delta": delta,
-                "occupied": occupied,
+                "occupied": room.occupied,
             })
         return result
 
-    def _collect_all_vents(self) -> list[str]:
-        vents: set[str] = set()
-        for rc in self.entry.data.get("rooms", []):
-            vents.update(rc.get("vent_entities", []))
-        return list(vents)
-
-    def _resolve_setpoint(self, thermostat_id: str, hvac_mode: str) -> float | None:
-        state = self.hass.states.get(thermostat_id)
-        if not state:
-            return None
+    def _resolve_setpoint(
+        self, state: ThermostatSnapshot, hvac_mode: str
+    ) -> float | None:
         if hvac_mode in ("cool", "cooling"):
             hi = state.attributes.get("target_temp_high")
             if hi is not None:
@@ -393,7 +539,9 @@ class ThermostatControlScript:
         self.entry = entry
         self.error_recovery = ErrorRecovery(hass, entry)
 
-    async def async_run(self, rooms_csv: str = "") -> None:
+    async def async_run(
+        self, rooms_csv: str = "", snapshot: HouseSnapshot | None = None
+    ) -> None:
         try:
             if not self.entry.options.get("auto_thermostat_control", True):
                 return
@@ -404,20 +552,23 @@ class ThermostatControlScript:
             coordinator: SmartVentControllerCoordinator | None = self.hass.data.get(
                 DOMAIN, {}
             ).get(self.entry.entry_id)
+            topology = _resolve_topology(self.entry, coordinator)
+            snapshot = _resolve_snapshot(self.hass, self.entry, coordinator, snapshot)
+            thermo = snapshot.thermostat
 
-            if await self._check_manual_override(coordinator):
+            if self._check_manual_override(thermo, coordinator):
                 if self.entry.options.get("debug_mode", False):
                     _LOGGER.info("Manual override detected. Skipping.")
                 return
 
-            if self._check_cycle_protection(coordinator):
+            if self._check_cycle_protection(thermo, coordinator):
                 if self.entry.options.get("debug_mode", False):
                     _LOGGER.info("BLOCKED by cycle protection")
                 return
 
-            selected_list = self._parse_rooms_csv(rooms_csv)
-            main_thermostat = self.entry.data.get("main_thermostat")
-            if not validate_entity_state(self.hass, main_thermostat, "climate"):
+            selected_list = topology.parse_csv(rooms_csv)
+            main_thermostat = topology.main_thermostat
+            if thermo is None or not thermo.available:
                 _LOGGER.error("Thermostat %s unavailable", main_thermostat)
                 self.error_recovery.record_error(
                     "thermostat_control",
@@ -425,9 +576,8 @@ class ThermostatControlScript:
                 )
                 return
 
-            thermo = self.hass.states.get(main_thermostat)
-            mode = thermo.state if thermo else "off"
-            action = get_safe_attribute(self.hass, main_thermostat, "hvac_action", "idle")
+            mode = thermo.state
+            action = thermo.hvac_action
             debug = self.entry.options.get("debug_mode", False)
 
             if not selected_list:
@@ -443,14 +593,14 @@ class ThermostatControlScript:
                 )
                 if ok and coordinator:
                     coordinator.store.last_thermostat_setpoint = float(default_temp)
-                    await coordinator.store.async_save()
+                    coordinator.store.schedule_save()
                 elif not ok:
                     self.error_recovery.record_error(
                         "thermostat_control", ServiceCallError("set default temp")
                     )
                 return
 
-            room_targets = self._gather_room_targets(selected_list)
+            room_targets = self._gather_room_targets(selected_list, snapshot)
             if not room_targets:
                 _LOGGER.warning("No valid room targets found.")
                 return
@@ -513,7 +663,7 @@ class ThermostatControlScript:
 
             if ok and new_setpoint is not None and coordinator:
                 coordinator.store.last_thermostat_setpoint = new_setpoint
-                await coordinator.store.async_save()
+                coordinator.store.schedule_save()
             elif not ok:
                 self.error_recovery.record_error(
                     "thermostat_control", ServiceCallError("set temperature failed")
@@ -528,16 +678,9 @@ class ThermostatControlScript:
 
     # -- helpers ------------------------------------------------------------
 
-    def _parse_rooms_csv(self, csv: str) -> list[str]:
-        if not csv or csv.strip() in ("", "none"):
-            return []
-        rooms = self.entry.data.get("rooms", [])
-        valid = {r.get("name", "").lower().replace(" ", "_") for r in rooms}
-        return [p.strip() for p in csv.split(",") if p.strip() in valid]
-
-    async def _check_manual_override(self, coordinator) -> bool:
-        main = self.entry.data.get("main_thermostat")
-        thermo = self.hass.states.get(main)
+    def _check_manual_override(
+        self, thermo: ThermostatSnapshot | None, coordinator
+    ) -> bool:
         if not thermo:
             return False
         current = thermo.attributes.get("temperature")
@@ -551,12 +694,12 @@ class ThermostatControlScript:
         except (ValueError, TypeError):
             return False
 
-    def _check_cycle_protection(self, coordinator) -> bool:
-        main = self.entry.data.get("main_thermostat")
-        thermo = self.hass.states.get(main)
+    def _check_cycle_protection(
+        self, thermo: ThermostatSnapshot | None, coordinator
+    ) -> bool:
         if not thermo:
             return False
-        action = thermo.attributes.get("hvac_action", "idle")
+        action = thermo.hvac_action
         min_runtime = self.entry.options.get("hvac_min_runtime_min", 10) * 60
         min_off = self.entry.options.get("hvac_min_off_time_min", 5) * 60
 
@@ -574,36 +717,22 @@ class ThermostatControlScript:
                 return True
         return False
 
-    def _gather_room_targets(self, selected_keys: list[str]) -> list[float]:
-        coordinator = self.hass.data.get(DOMAIN, {}).get(self.entry.entry_id)
+    def _gather_room_targets(
+        self, selected_keys: list[str], snapshot: HouseSnapshot
+    ) -> list[float]:
         targets: list[float] = []
-        for rc in self.entry.data.get("rooms", []):
-            key = rc.get("name", "").lower().replace(" ", "_")
-            if key not in selected_keys:
+        for key in selected_keys:
+            room = snapshot.rooms.get(key)
+            if room is None:
                 continue
             # Prefer integration-managed setpoint from store
-            if coordinator:
-                stored = coordinator.store.get_room_setpoint(key)
-                if stored is not None:
-                    v = safe_float(stored, min_val=40.0, max_val=100.0)
-                    if v:
-                        targets.append(v)
-                        continue
-            # Fall back to external climate entity
-            climate = rc.get("climate_entity")
-            if not climate or not validate_entity_state(self.hass, climate, "climate"):
-                continue
-            t = get_safe_attribute(self.hass, climate, "temperature")
-            if t is not None:
-                v = safe_float(t, min_val=40.0, max_val=100.0)
+            if room.setpoint is not None:
+                v = safe_float(room.setpoint, min_val=40.0, max_val=100.0)
                 if v:
                     targets.append(v)
-            else:
-                lo = get_safe_attribute(self.hass, climate, "target_temp_low")
-                hi = get_safe_attribute(self.hass, climate, "target_temp_high")
-                if lo is not None and hi is not None:
-                    lf = safe_float(lo, min_val=40.0, max_val=100.0)
-                    hf = safe_float(hi, min_val=40.0, max_val=100.0)
-                    if lf and hf:
-                        targets.append((lf + hf) / 2)
+                    continue
+            # Fall back to external climate entity
+            v = parse_float(room.climate_target, min_val=40.0, max_val=100.0)
+            if v:
+                targets.append(v)
         return targets
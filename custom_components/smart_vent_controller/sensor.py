@@ -19,15 +19,13 @@ async def async_setup_entry(
 ) -> None:
     """Set up Smart Vent Controller sensors."""
     coordinator: SmartVentControllerCoordinator = hass.data[DOMAIN][entry.entry_id]
-    rooms = entry.data.get("rooms", [])
-
     entities: list[SensorEntity] = []
 
-    for room in rooms:
-        room_name = room.get("name", "")
-        room_key = room_name.lower().replace(" ", "_")
-        climate_entity = room.get("climate_entity")
-        temp_sensor = room.get("temp_sensor", "")
+    for room in coordinator.topology:
+        room_key = room.key
+        room_name = room.name
+        climate_entity = room.climate_entity
+        temp_sensor = room.temp_sensor or ""
 
         entities.append(
             RoomTemperatureSensor(
@@ -89,20 +87,8 @@ class RoomTemperatureSensor(SensorEntity):
 
     @property
     def native_value(self):
-        if self._temp_sensor:
-            state = self.coordinator.hass.states.get(self._temp_sensor)
-            if state and state.state not in ("unknown", "unavailable", "None", "none"):
-                try:
-                    return float(state.state)
-                except (ValueError, TypeError):
-                    pass
-        if self._climate_entity:
-            climate = self.coordinator.hass.states.get(self._climate_entity)
-            if climate:
-                temp = climate.attributes.get("current_temperature")
-                if temp is not None:
-                    return float(temp)
-        return None
+        room = self.coordinator.snapshot.rooms.get(self._room_key)
+        return room.current_temp if room else None
 
 
 class RoomTargetSensor(SensorEntity):
@@ -137,17 +123,8 @@ class RoomTargetSensor(SensorEntity):
         stored = self.coordinator.store.get_room_setpoint(self._room_key)
         if stored is not None:
             return float(stored)
-        if self._climate_entity:
-            climate = self.coordinator.hass.states.get(self._climate_entity)
-            if climate:
-                temp = climate.attributes.get("temperature")
-                if temp is not None:
-                    return float(temp)
-                lo = climate.attributes.get("target_temp_low")
-                hi = climate.attributes.get("target_temp_high")
-                if lo is not None and hi is not None:
-                    return (float(lo) + float(hi)) / 2
-        return None
+        room = self.coordinator.snapshot.rooms.get(self._room_key)
+        return room.climate_target if room else None
 
 
 class RoomDeltaSensor(SensorEntity):
@@ -181,36 +158,12 @@ class RoomDeltaSensor(SensorEntity):
     @property
     def native_value(self):
         # Prefer integration-managed setpoint from store
-        target = None
+        room = self.coordinator.snapshot.rooms.get(self._room_key)
+        if room is None:
+            return None
         stored = self.coordinator.store.get_room_setpoint(self._room_key)
-        if stored is not None:
-            target = float(stored)
-        elif self._climate_entity:
-            climate = self.coordinator.hass.states.get(self._climate_entity)
-            if climate:
-                temp = climate.attributes.get("temperature")
-                if temp is not None:
-                    target = float(temp)
-                else:
-                    lo = climate.attributes.get("target_temp_low")
-                    hi = climate.attributes.get("target_temp_high")
-                    if lo is not None and hi is not None:
-                        target = (float(lo) + float(hi)) / 2
-
-        current = None
-        if self._temp_sensor:
-            state = self.coordinator.hass.states.get(self._temp_sensor)
-            if state and state.state not in ("unknown", "unavailable", "None", "none"):
-                try:
-                    current = float(state.state)
-                except (ValueError, TypeError):
-                    pass
-        if current is None and self._climate_entity:
-            climate = self.coordinator.hass.states.get(self._climate_entity)
-            if climate:
-                temp = climate.attributes.get("current_temperature")
-                if temp is not None:
-                    current = float(temp)
+        target = float(stored) if stored is not None else room.climate_target
+        current = room.current_temp
 
         if target is not None and current is not None:
             return target - current
@@ -280,7 +233,9 @@ class RoomsToConditionSensor(SensorEntity):
 
     @property
     def native_value(self):
-        return self.coordinator.get_rooms_to_condition_value()
+        return self.coordinator.get_rooms_to_condition_value(
+            self.coordinator.snapshot
+        )
 
 
 class HVACCycleProtectionSensor(SensorEntity):
@@ -299,7 +254,7 @@ class HVACCycleProtectionSensor(SensorEntity):
         main = self._entry.data.get("main_thermostat")
         if not main:
             return "allowed"
-        thermo = self.coordinator.hass.states.get(main)
+        thermo = self.coordinator.get_state(main)
         if not thermo:
             return "allowed"
 
@@ -368,11 +323,15 @@ class SmartVentControllerStatsSensor(SensorEntity):
 
     @property
     def native_value(self):
-        return self.coordinator.get_rooms_to_condition_value()
+        return self.coordinator.get_rooms_to_condition_value(
+            self.coordinator.snapshot
+        )
 
     @property
     def extra_state_attributes(self):
-        csv = self.coordinator.get_rooms_to_condition_value()
+        csv = self.coordinator.get_rooms_to_condition_value(
+            self.coordinator.snapshot
+        )
         count = 0
         if csv and csv != "none":
             parts = [r for r in csv.split(",") if r and r != "none"]
@@ -404,16 +363,15 @@ class SystemHealthSensor(SensorEntity):
         main = self._entry.data.get("main_thermostat")
         if not main:
             return "error"
-        thermo = self.coordinator.hass.states.get(main)
+        thermo = self.coordinator.get_state(main)
         if not thermo or thermo.state == "unavailable":
             return "error"
 
         # Check for unavailable vents
-        rooms = self._entry.data.get("rooms", [])
         unavailable_vents = []
-        for room in rooms:
-            for vent in room.get("vent_entities", []):
-                state = self.coordinator.hass.states.get(vent)
+        for room in self.coordinator.topology:
+            for vent in room.vents:
+                state = self.coordinator.get_state(vent)
                 if state is None or state.state == "unavailable":
                     unavailable_vents.append(vent)
 
@@ -425,16 +383,15 @@ class SystemHealthSensor(SensorEntity):
     def extra_state_attributes(self):
         attrs = {}
         main = self._entry.data.get("main_thermostat")
-        thermo = self.coordinator.hass.states.get(main) if main else None
+        thermo = self.coordinator.get_state(main) if main else None
         attrs["thermostat_available"] = thermo is not None and thermo.state != "unavailable"
 
-        rooms = self._entry.data.get("rooms", [])
         unavailable = []
         total_vents = 0
-        for room in rooms:
-            for vent in room.get("vent_entities", []):
+        for room in self.coordinator.topology:
+            for vent in room.vents:
                 total_vents += 1
-                state = self.coordinator.hass.states.get(vent)
+                state = self.coordinator.get_state(vent)
                 if state is None or state.state == "unavailable":
                     unavailable.append(vent)
 
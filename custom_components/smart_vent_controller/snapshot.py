@@ -0,0 +1,229 @@
+"""Immutable per-refresh view of the rooms and the main thermostat.
+
+The coordinator builds one :class:`HouseSnapshot` per refresh (and before
+each automation run).  Everything that needs a room's temperature, target,
+occupancy or vent positions reads it from the snapshot, so the vent plan,
+the thermostat script, the entities and diagnostics all act on the same
+readings and each entity is looked up once per refresh.
+
+:func:`update_house_snapshot` assembles the next snapshot from the
+coordinator's event-invalidated caches, re-reading only rooms whose entities
+reported a state change.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .cache import EntityStateCache, RoomDataCache
+from .topology import RoomInfo, RoomTopology
+from .state_access import (
+    UNAVAILABLE_STATES,
+    get_available_state,
+    parse_float,
+    read_room_temperature,
+    read_target_temperature,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class VentReading:
+    """One vent cover as seen at snapshot time."""
+
+    entity_id: str
+    available: bool
+    position: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class RoomSnapshot:
+    """One room's readings at snapshot time."""
+
+    key: str
+    name: str
+    current_temp: float | None
+    climate_target: float | None
+    setpoint: float | None
+    has_occupancy_sensor: bool
+    occupied: bool
+    vents: tuple[VentReading, ...]
+
+    @property
+    def target_temp(self) -> float | None:
+        """Integration-managed setpoint, else the climate entity's target."""
+        return self.setpoint if self.setpoint is not None else self.climate_target
+
+    @property
+    def delta(self) -> float | None:
+        """Target minus current temperature, if both are known."""
+        target = self.target_temp
+        if target is None or self.current_temp is None:
+            return None
+        return target - self.current_temp
+
+    @property
+    def vent_avg(self) -> float:
+        """Mean reported position of the room's vents (0 if none report)."""
+        positions = [v.position for v in self.vents if v.position is not None]
+        return sum(positions) / len(positions) if positions else 0
+
+
+@dataclass(frozen=True, slots=True)
+class ThermostatSnapshot:
+    """The main thermostat's state at snapshot time."""
+
+    entity_id: str
+    state: str
+    attributes: Mapping[str, Any]
+
+    @property
+    def available(self) -> bool:
+        return self.state not in UNAVAILABLE_STATES
+
+    @property
+    def hvac_action(self) -> str:
+        return self.attributes.get("hvac_action", "idle")
+
+
+@dataclass(frozen=True, slots=True)
+class HouseSnapshot:
+    """All rooms (in configuration order) plus the main thermostat."""
+
+    taken_at: float
+    thermostat: ThermostatSnapshot | None
+    rooms: Mapping[str, RoomSnapshot]
+
+
+def build_room_snapshot(
+    hass: HomeAssistant, room: RoomInfo, setpoint: float | None = None
+) -> RoomSnapshot:
+    """Read one configured room from the state machine."""
+    occ_sensor = room.occupancy_sensor
+
+    occupied = False
+    if occ_sensor:
+        occ_state = get_available_state(hass, occ_sensor, "binary_sensor")
+        occupied = occ_state is not None and occ_state.state == "on"
+
+    vents = []
+    for vent in room.vents:
+        state = hass.states.get(vent)
+        if state is None:
+            vents.append(VentReading(vent, False, None))
+            continue
+        vents.append(
+            VentReading(
+                vent,
+                state.state not in UNAVAILABLE_STATES,
+                parse_float(state.attributes.get("current_position")),
+            )
+        )
+
+    return RoomSnapshot(
+        key=room.key,
+        name=room.name,
+        # An implausible sensor reading falls back to the climate entity.
+        current_temp=read_room_temperature(
+            hass, room.temp_sensor, room.climate_entity, min_val=32.0, max_val=110.0
+        ),
+        climate_target=read_target_temperature(hass, room.climate_entity),
+        setpoint=setpoint,
+        has_occupancy_sensor=bool(occ_sensor),
+        occupied=occupied,
+        vents=tuple(vents),
+    )
+
+
+def _read_thermostat(
+    hass: HomeAssistant, main_thermostat: str | None
+) -> ThermostatSnapshot | None:
+    if not main_thermostat:
+        return None
+    state = hass.states.get(main_thermostat)
+    if state is None:
+        return None
+    return ThermostatSnapshot(main_thermostat, state.state, state.attributes)
+
+
+def build_house_snapshot(
+    hass: HomeAssistant,
+    topology: RoomTopology,
+    setpoint_for: Callable[[str], float | None] | None = None,
+) -> HouseSnapshot:
+    """Read the thermostat and every configured room.
+
+    *setpoint_for* maps a room key to its integration-managed setpoint.  A
+    room that fails to read is logged and left out rather than failing the
+    whole snapshot.
+    """
+    thermostat = _read_thermostat(hass, topology.main_thermostat)
+
+    room_snapshots: dict[str, RoomSnapshot] = {}
+    for room in topology.rooms:
+        try:
+            setpoint = setpoint_for(room.key) if setpoint_for else None
+            room_snapshots[room.key] = build_room_snapshot(hass, room, setpoint)
+        except Exception as err:  # noqa: BLE001 - isolate one room
+            _LOGGER.warning("Skipping room %s in snapshot: %s", room.name, err)
+
+    return HouseSnapshot(
+        taken_at=dt_util.utcnow().timestamp(),
+        thermostat=thermostat,
+        rooms=MappingProxyType(room_snapshots),
+    )
+
+
+def update_house_snapshot(
+    hass: HomeAssistant,
+    topology: RoomTopology,
+    room_cache: RoomDataCache,
+    entity_cache: EntityStateCache,
+    setpoint_for: Callable[[str], float | None] | None = None,
+) -> HouseSnapshot:
+    """Assemble a snapshot from the caches, reading only what they miss.
+
+    *room_cache* holds each room's last :class:`RoomSnapshot` until one of
+    its entities changes; missed rooms are read from the state machine and
+    cached.  Cached rooms get their setpoint refreshed from *setpoint_for*,
+    since the store changes without a state event.  The thermostat is read
+    through *entity_cache*.
+    """
+    thermostat = None
+    if topology.main_thermostat:
+        state = entity_cache.get(hass, topology.main_thermostat)
+        if state is not None:
+            thermostat = ThermostatSnapshot(
+                topology.main_thermostat, state.state, state.attributes
+            )
+
+    room_snapshots: dict[str, RoomSnapshot] = {}
+    for room in topology.rooms:
+        key = room.key
+        setpoint = setpoint_for(key) if setpoint_for else None
+        cached = room_cache.get_room_data(key)
+        if cached is not None:
+            if cached.setpoint != setpoint:
+                cached = replace(cached, setpoint=setpoint)
+                room_cache.set_room_data(key, cached)
+            room_snapshots[key] = cached
+            continue
+        try:
+            room_snapshots[key] = build_room_snapshot(hass, room, setpoint)
+        except Exception as err:  # noqa: BLE001 - isolate one room
+            _LOGGER.warning("Skipping room %s in snapshot: %s", room.name, err)
+            continue
+        room_cache.set_room_data(key, room_snapshots[key])
+
+    return HouseSnapshot(
+        taken_at=dt_util.utcnow().timestamp(),
+        thermostat=thermostat,
+        rooms=MappingProxyType(room_snapshots),
+    )
@@ -0,0 +1,146 @@
+"""Typed, single-lookup reads from the Home Assistant state machine.
+
+Every reader does at most one ``hass.states.get`` per entity: the state
+object is fetched once, checked for availability, and parsed.  Readers
+return ``None`` when the entity is missing, unavailable, or its value does
+not parse, so callers never need a separate validation call.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, State
+
+UNAVAILABLE_STATES = frozenset({"unknown", "unavailable", "None", "none"})
+
+
+def get_available_state(
+    hass: HomeAssistant, entity_id: str | None, domain: str | None = None
+) -> State | None:
+    """Return the entity's state object if it exists and is available.
+
+    If *domain* is given the entity id must belong to it.
+    """
+    if not entity_id:
+        return None
+    if domain is not None and entity_id.partition(".")[0] != domain:
+        return None
+    state = hass.states.get(entity_id)
+    if state is None or state.state in UNAVAILABLE_STATES:
+        return None
+    return state
+
+
+def is_available(
+    hass: HomeAssistant, entity_id: str | None, domain: str | None = None
+) -> bool:
+    """True if the entity exists and is available."""
+    return get_available_state(hass, entity_id, domain) is not None
+
+
+def parse_float(
+    value: Any, min_val: float | None = None, max_val: float | None = None
+) -> float | None:
+    """Parse *value* as a float within [min_val, max_val], else ``None``."""
+    if value is None:
+        return None
+    try:
+        result = float(value)
+    except (ValueError, TypeError):
+        return None
+    if min_val is not None and result < min_val:
+        return None
+    if max_val is not None and result > max_val:
+        return None
+    return result
+
+
+def read_float(
+    hass: HomeAssistant,
+    entity_id: str | None,
+    domain: str | None = None,
+    min_val: float | None = None,
+    max_val: float | None = None,
+) -> float | None:
+    """Numeric state of an entity (e.g. a temperature sensor)."""
+    state = get_available_state(hass, entity_id, domain)
+    if state is None:
+        return None
+    return parse_float(state.state, min_val, max_val)
+
+
+def read_float_attribute(
+    hass: HomeAssistant,
+    entity_id: str | None,
+    attribute: str,
+    domain: str | None = None,
+    min_val: float | None = None,
+    max_val: float | None = None,
+) -> float | None:
+    """Numeric attribute of an available entity."""
+    state = get_available_state(hass, entity_id, domain)
+    if state is None:
+        return None
+    return parse_float(state.attributes.get(attribute), min_val, max_val)
+
+
+def read_position(
+    hass: HomeAssistant, entity_id: str | None, default: int | None = None
+) -> int | None:
+    """Current position (0..100) of an available cover.
+
+    Returns ``None`` if the cover is unavailable and *default* if it is
+    available but reports no valid position.
+    """
+    state = get_available_state(hass, entity_id, "cover")
+    if state is None:
+        return None
+    position = state.attributes.get("current_position")
+    try:
+        result = int(position)
+    except (ValueError, TypeError):
+        return default
+    if not 0 <= result <= 100:
+        return default
+    return result
+
+
+def read_room_temperature(
+    hass: HomeAssistant,
+    temp_sensor: str | None,
+    climate_entity: str | None,
+    min_val: float | None = None,
+    max_val: float | None = None,
+) -> float | None:
+    """Room temperature from its sensor, else its climate entity."""
+    temp = read_float(hass, temp_sensor, "sensor", min_val, max_val)
+    if temp is None:
+        temp = read_float_attribute(
+            hass, climate_entity, "current_temperature", "climate", min_val, max_val
+        )
+    return temp
+
+
+def read_target_temperature(
+    hass: HomeAssistant,
+    climate_entity: str | None,
+    min_val: float | None = None,
+    max_val: float | None = None,
+) -> float | None:
+    """Setpoint of a climate entity.
+
+    Uses ``temperature`` when present, otherwise the midpoint of
+    ``target_temp_low``/``target_temp_high``.
+    """
+    state = get_available_state(hass, climate_entity, "climate")
+    if state is None:
+        return None
+    attributes = state.attributes
+    temp = attributes.get("temperature")
+    if temp is not None:
+        return parse_float(temp, min_val, max_val)
+    low = parse_float(attributes.get("target_temp_low"), min_val, max_val)
+    high = parse_float(attributes.get("target_temp_high"), min_val, max_val)
+    if low is None or high is None:
+        return None
+    return (low + high) / 2
@@ -1,91 +1,497 @@
 """Persistent state storage for Smart Vent Controller.
 
-Replaces the fragile input_number / input_boolean helper approach with a
-single JSON file managed via ``homeassistant.helpers.storage.Store``.
+Replaces the fragile input_number / input_boolean helper approach with JSON
+files managed via ``homeassistant.helpers.storage.Store``.
+
+The data is split by how often it changes.  Learned rates, room setpoints
+and overrides live in the durable file, ``smart_vent_controller.<entry>``,
+and are written once the data has been quiet for ``STORE_SAVE_DELAY_SEC``
+(at the latest ``STORE_SAVE_MAX_DELAY_SEC`` after the first change).  Cycle
+state and per-vent adjustment times (:data:`RUNTIME_KEYS`) change on every
+run; they are kept in memory and checkpointed to
+``smart_vent_controller.<entry>.runtime`` every
+``STORE_RUNTIME_CHECKPOINT_SEC``.  Either file is written only if one of its
+own keys changed.  Callers change data through the accessors and then call
+:meth:`SmartVentStore.schedule_save`; :meth:`SmartVentStore.async_flush`
+writes pending changes immediately.
+
+With ``journal`` set, changes to the durable file are instead appended to
+``smart_vent_controller.<entry>.journal`` as they are scheduled, one small
+fsynced record each, so a learned rate survives a power cut right after it
+is learned.  The journal is replayed on load and compacted into the durable
+file once it grows past ``STORE_JOURNAL_COMPACT_BYTES``.
 """
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import os
+import time
+from collections.abc import Callable, Iterable
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN, STORAGE_VERSION
+from .const import (
+    DOMAIN,
+    STORAGE_VERSION,
+    STORE_JOURNAL_COMPACT_BYTES,
+    STORE_RUNTIME_CHECKPOINT_SEC,
+    STORE_SAVE_DELAY_SEC,
+    STORE_SAVE_MAX_DELAY_SEC,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Keys that change on (nearly) every run and live in the runtime file.
+RUNTIME_KEYS = frozenset({
+    "cycle_start_ts",
+    "cycle_end_ts",
+    "last_thermostat_setpoint",
+    "hvac_last_action",
+    "cycle_start_temps",
+    "cycle_avg_apertures",
+    "vent_last_adjusted",
+})
+
+# Sections keyed by room key and by vent entity id, reconciled against the
+# configured rooms by SmartVentStore.collect_garbage.
+ROOM_KEYED = (
+    "heating_rates",
+    "cooling_rates",
+    "room_setpoints",
+    "room_overrides",
+    "cycle_start_temps",
+    "cycle_avg_apertures",
+)
+VENT_KEYED = ("vent_last_adjusted",)
+
+
+def _apply(data: dict[str, Any], op: list[Any]) -> None:
+    """Apply one journal record to *data*."""
+    kind, key = op[0], op[1]
+    if kind == "s":
+        data[key] = op[2]
+    elif kind == "i":
+        data.setdefault(key, {})[op[2]] = op[3]
+    elif kind == "d":
+        data.get(key, {}).pop(op[2], None)
+
+
+def _append_journal(path: str, lines: list[str]) -> int:
+    payload = "".join(lines).encode()
+    with open(path, "ab") as journal:
+        journal.write(payload)
+        journal.flush()
+        os.fsync(journal.fileno())
+    return len(payload)
+
+
+def _read_journal(path: str) -> list[str]:
+    try:
+        with open(path, encoding="utf-8") as journal:
+            return journal.readlines()
+    except FileNotFoundError:
+        return []
+
+
+def _truncate_journal(path: str, size: int) -> None:
+    with open(path, "r+b") as journal:
+        journal.truncate(size)
+        journal.flush()
+        os.fsync(journal.fileno())
+
+
+def _remove_journal(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class _StoreFile:
+    """One backing file with its own coalesced write cadence.
+
+    In journal mode every change is appended to ``<file>.journal`` as one
+    JSON record and fsynced, instead of rewriting the whole file; the journal
+    is replayed on load and folded into the file once it passes
+    ``compact_bytes``.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        key: str,
+        save_delay: float,
+        max_save_delay: float,
+        clock: Callable[[], float],
+        journal: bool = False,
+        compact_bytes: int = STORE_JOURNAL_COMPACT_BYTES,
+    ) -> None:
+        self.hass = hass
+        self.store = Store(hass, STORAGE_VERSION, key)
+        self.data: dict[str, Any] = {}
+        self.save_delay = save_delay
+        self.max_save_delay = max_save_delay
+        self._clock = clock
+        # Changed since the last schedule_save / since the last write.
+        self.changed = False
+        self._dirty_since: float | None = None
+        self.save_requests = 0
+        self.writes = 0
+
+        self.journal = journal
+        self.journal_file = f"{self.store.path}.journal"
+        self.compact_bytes = compact_bytes
+        self.journal_bytes = 0
+        self.journal_appends = 0
+        self.compactions = 0
+        self._records: list[str] = []
+        self._needs_compaction = False
+        self._writer: asyncio.Task | None = None
+
+    async def async_load(self) -> dict[str, Any]:
+        stored = await self.store.async_load()
+        self.data = stored if stored and isinstance(stored, dict) else {}
+        lines = await self.hass.async_add_executor_job(_read_journal, self.journal_file)
+        replayed = 0
+        good_bytes = 0
+        for line in lines:
+            try:
+                if not line.endswith("\n"):
+                    raise ValueError("unterminated record")
+                _apply(self.data, json.loads(line))
+            except (ValueError, IndexError, TypeError, AttributeError):
+                # A record torn by power loss ends the usable journal.  Cut
+                # it off, or the next append would be glued onto it.
+                _LOGGER.warning(
+                    "Ignoring %d unreadable journal record(s) in %s",
+                    len(lines) - replayed, self.journal_file,
+                )
+                await self.hass.async_add_executor_job(
+                    _truncate_journal, self.journal_file, good_bytes
+                )
+                break
+            replayed += 1
+            good_bytes += len(line.encode())
+        self.journal_bytes = good_bytes
+        if lines and not self.journal:
+            # Journal mode was switched off: fold the journal into the file.
+            self.rewrite()
+        return self.data
+
+    def record(self, op: list[Any]) -> None:
+        """Note one change (and queue its journal record in journal mode)."""
+        self.changed = True
+        if self.journal:
+            self._records.append(json.dumps(op, separators=(",", ":")) + "\n")
+
+    def rewrite(self) -> None:
+        """Note a change that has no journal record; the file is rewritten."""
+        self.changed = True
+        self._needs_compaction = True
+
+    @property
+    def dirty(self) -> bool:
+        return (
+            self.changed
+            or self._dirty_since is not None
+            or bool(self._records)
+            or (self._writer is not None and not self._writer.done())
+        )
+
+    @callback
+    def schedule(self) -> None:
+        self.changed = False
+        self.save_requests += 1
+        if self.journal or self._needs_compaction and self.journal_bytes:
+            if self._writer is None or self._writer.done():
+                self._writer = self.hass.async_create_task(self._async_write_journal())
+            return
+        now = self._clock()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        delay = min(self.save_delay, self._dirty_since + self.max_save_delay - now)
+        self.store.async_delay_save(self._data_to_write, max(0.0, delay))
+
+    @callback
+    def _data_to_write(self) -> dict[str, Any]:
+        self._dirty_since = None
+        self._needs_compaction = False
+        self.writes += 1
+        return self.data
+
+    async def _async_write_journal(self) -> None:
+        try:
+            while self._records or self._needs_compaction:
+                if self._needs_compaction or self.journal_bytes >= self.compact_bytes:
+                    await self._async_compact()
+                    continue
+                records, self._records = self._records, []
+                self.journal_bytes += await self.hass.async_add_executor_job(
+                    _append_journal, self.journal_file, records
+                )
+                self.journal_appends += 1
+        except OSError as err:
+            # The data is still in memory; write it whole next time.
+            _LOGGER.warning("Could not write %s: %s", self.journal_file, err)
+            self._records = []
+            self._needs_compaction = True
+
+    async def _async_compact(self) -> None:
+        # Queued records are already part of the data being written.
+        self._records = []
+        self._needs_compaction = False
+        self._dirty_since = None
+        self.writes += 1
+        await self.store.async_save(self.data)
+        if self.journal_bytes:
+            await self.hass.async_add_executor_job(_remove_journal, self.journal_file)
+        self.journal_bytes = 0
+        self.compactions += 1
+
+    async def async_flush(self) -> None:
+        if self.changed:
+            self.schedule()
+        if self._writer is not None:
+            await self._writer
+        if self._dirty_since is not None:
+            await self.async_save()
+
+    async def async_save(self) -> None:
+        self.changed = False
+        if self._writer is not None:
+            await self._writer
+        await self._async_compact()
+
+    def stats(self) -> dict[str, Any]:
+        stats = {
+            "dirty": self.dirty,
+            "save_requests": self.save_requests,
+            "writes": self.writes,
+        }
+        if self.journal:
+            stats["journal"] = {
+                "bytes": self.journal_bytes,
+                "appends": self.journal_appends,
+                "compactions": self.compactions,
+            }
+        return stats
+
 
 class SmartVentStore:
     """Persistent store for cycle timestamps, learned rates, and runtime data."""
 
-    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
-        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
-        self._data: dict[str, Any] = {}
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        save_delay: float = STORE_SAVE_DELAY_SEC,
+        max_save_delay: float = STORE_SAVE_MAX_DELAY_SEC,
+        runtime_checkpoint: float = STORE_RUNTIME_CHECKPOINT_SEC,
+        clock: Callable[[], float] = time.monotonic,
+        journal: bool = False,
+    ) -> None:
+        self._durable = _StoreFile(
+            hass,
+            f"{DOMAIN}.{entry_id}",
+            save_delay,
+            max_save_delay,
+            clock,
+            journal=journal,
+        )
+        self.gc_stats = {"runs": 0, "removed": 0, "bytes_reclaimed": 0}
+        self._runtime = _StoreFile(
+            hass,
+            f"{DOMAIN}.{entry_id}.runtime",
+            runtime_checkpoint,
+            runtime_checkpoint,
+            clock,
+        )
 
     # -- lifecycle ----------------------------------------------------------
 
     async def async_load(self) -> None:
-        stored = await self._store.async_load()
-        if stored and isinstance(stored, dict):
-            self._data = stored
-        else:
-            self._data = {}
+        durable = await self._durable.async_load()
+        runtime = await self._runtime.async_load()
+        # Before the split everything lived in the durable file.
+        moved = [key for key in RUNTIME_KEYS if key in durable]
+        if moved:
+            for key in moved:
+                value = durable.pop(key)
+                runtime.setdefault(key, value)
+            self._durable.rewrite()
+            self._runtime.rewrite()
+            _LOGGER.debug("Moved %d runtime keys to the runtime store", len(moved))
+        self.schedule_save()
+
+    @property
+    def journal(self) -> bool:
+        """True when changes to learned data are journaled."""
+        return self._durable.journal
+
+    @property
+    def dirty(self) -> bool:
+        """True while changes are waiting to be written."""
+        return self._durable.dirty or self._runtime.dirty
+
+    @callback
+    def schedule_save(self) -> None:
+        """Schedule coalesced writes of the files whose data changed."""
+        for store_file in (self._durable, self._runtime):
+            if store_file.changed:
+                store_file.schedule()
+
+    async def async_flush(self) -> None:
+        """Write pending changes now (no-op if nothing changed)."""
+        for store_file in (self._durable, self._runtime):
+            if store_file.dirty:
+                await store_file.async_save()
 
     async def async_save(self) -> None:
-        await self._store.async_save(self._data)
+        """Write both files immediately, replacing any scheduled write."""
+        await self._durable.async_save()
+        await self._runtime.async_save()
+
+    def save_stats(self) -> dict[str, Any]:
+        """Write coalescing counters per backing file, for diagnostics."""
+        return {
+            "durable": self._durable.stats(),
+            "runtime": self._runtime.stats(),
+            "garbage_collection": dict(self.gc_stats),
+        }
+
+    # -- garbage collection -------------------------------------------------
+
+    def collect_garbage(
+        self,
+        room_keys: Iterable[str],
+        vent_ids: Iterable[str],
+        now_ts: float,
+        max_age: float | None = None,
+    ) -> dict[str, int]:
+        """Drop entries that no longer mean anything.
+
+        Removes entries of rooms and vents that are not configured any more
+        (skipped when no rooms are configured, so a broken entry cannot wipe
+        learned data), expired room overrides and, with *max_age* (seconds),
+        vent adjustment times older than that.  Callers schedule the save.
+
+        Returns the number of entries removed and the bytes reclaimed
+        (compact JSON size).
+        """
+        rooms = set(room_keys)
+        vents = set(vent_ids)
+        stale: list[tuple[str, str]] = []
+        if rooms:
+            for key in ROOM_KEYED:
+                stale.extend((key, item) for item in self._get(key, {}) if item not in rooms)
+            for key in VENT_KEYED:
+                stale.extend((key, item) for item in self._get(key, {}) if item not in vents)
+        for item, info in self._get("room_overrides", {}).items():
+            until = info.get("until") if isinstance(info, dict) else None
+            if until is None or float(until) < now_ts:
+                stale.append(("room_overrides", item))
+        if max_age:
+            cutoff = now_ts - max_age
+            stale.extend(
+                ("vent_last_adjusted", item)
+                for item, ts in self._get("vent_last_adjusted", {}).items()
+                if float(ts) < cutoff
+            )
+        stale = list(dict.fromkeys(stale))
+
+        self.gc_stats["runs"] += 1
+        if not stale:
+            return {"removed": 0, "bytes_reclaimed": 0}
+        before = self._serialized_size()
+        for key, item in stale:
+            self._pop_item(key, item)
+        reclaimed = before - self._serialized_size()
+        self.gc_stats["removed"] += len(stale)
+        self.gc_stats["bytes_reclaimed"] += reclaimed
+        return {"removed": len(stale), "bytes_reclaimed": reclaimed}
+
+    def _serialized_size(self) -> int:
+        return sum(
+            len(json.dumps(store_file.data, separators=(",", ":")))
+            for store_file in (self._durable, self._runtime)
+        )
+
+    def _file(self, key: str) -> _StoreFile:
+        return self._runtime if key in RUNTIME_KEYS else self._durable
+
+    def _get(self, key: str, default: Any = None) -> Any:
+        return self._file(key).data.get(key, default)
+
+    def _put(self, key: str, value: Any) -> None:
+        store_file = self._file(key)
+        store_file.data[key] = value
+        store_file.record(["s", key, value])
+
+    def _set_item(self, key: str, item: str, value: Any) -> None:
+        store_file = self._file(key)
+        store_file.data.setdefault(key, {})[item] = value
+        store_file.record(["i", key, item, value])
+
+    def _pop_item(self, key: str, item: str) -> None:
+        store_file = self._file(key)
+        store_file.data.setdefault(key, {}).pop(item, None)
+        store_file.record(["d", key, item])
 
     # -- cycle timestamps ---------------------------------------------------
 
     @property
     def cycle_start_ts(self) -> float:
-        return float(self._data.get("cycle_start_ts", 0))
+        return float(self._get("cycle_start_ts", 0))
 
     @cycle_start_ts.setter
     def cycle_start_ts(self, value: float) -> None:
-        self._data["cycle_start_ts"] = value
+        self._put("cycle_start_ts", value)
 
     @property
     def cycle_end_ts(self) -> float:
-        return float(self._data.get("cycle_end_ts", 0))
+        return float(self._get("cycle_end_ts", 0))
 
     @cycle_end_ts.setter
     def cycle_end_ts(self, value: float) -> None:
-        self._data["cycle_end_ts"] = value
+        self._put("cycle_end_ts", value)
 
     @property
     def last_thermostat_setpoint(self) -> float:
-        return float(self._data.get("last_thermostat_setpoint", 0))
+        return float(self._get("last_thermostat_setpoint", 0))
 
     @last_thermostat_setpoint.setter
     def last_thermostat_setpoint(self, value: float) -> None:
-        self._data["last_thermostat_setpoint"] = value
+        self._put("last_thermostat_setpoint", value)
 
     @property
     def hvac_last_action(self) -> str:
-        return self._data.get("hvac_last_action", "idle")
+        return self._get("hvac_last_action", "idle")
 
     @hvac_last_action.setter
     def hvac_last_action(self, value: str) -> None:
-        self._data["hvac_last_action"] = value
+        self._put("hvac_last_action", value)
 
     # -- per-room learned efficiency rates ----------------------------------
 
     def get_heating_rate(self, room_key: str) -> float:
         return float(
-            self._data.get("heating_rates", {}).get(room_key, 0)
+            self._get("heating_rates", {}).get(room_key, 0)
         )
 
     def set_heating_rate(self, room_key: str, rate: float) -> None:
-        self._data.setdefault("heating_rates", {})[room_key] = rate
+        self._set_item("heating_rates", room_key, rate)
 
     def get_cooling_rate(self, room_key: str) -> float:
         return float(
-            self._data.get("cooling_rates", {}).get(room_key, 0)
+            self._get("cooling_rates", {}).get(room_key, 0)
         )
 
     def set_cooling_rate(self, room_key: str, rate: float) -> None:
-        self._data.setdefault("cooling_rates", {})[room_key] = rate
+        self._set_item("cooling_rates", room_key, rate)
 
     def get_effective_rate(self, room_key: str, hvac_mode: str) -> float:
         if hvac_mode in ("cool", "cooling"):
@@ -95,66 +501,66 @@ class SmartVentStore:
     # -- per-room cycle start temperatures ----------------------------------
 
     def get_cycle_start_temp(self, room_key: str) -> float | None:
-        return self._data.get("cycle_start_temps", {}).get(room_key)
+        return self._get("cycle_start_temps", {}).get(room_key)
 
     def set_cycle_start_temp(self, room_key: str, temp: float) -> None:
-        self._data.setdefault("cycle_start_temps", {})[room_key] = temp
+        self._set_item("cycle_start_temps", room_key, temp)
 
     def clear_cycle_start_temps(self) -> None:
-        self._data["cycle_start_temps"] = {}
+        self._put("cycle_start_temps", {})
 
     # -- per-room cycle start apertures -------------------------------------
 
     def get_cycle_avg_aperture(self, room_key: str) -> float:
         return float(
-            self._data.get("cycle_avg_apertures", {}).get(room_key, 0)
+            self._get("cycle_avg_apertures", {}).get(room_key, 0)
         )
 
     def set_cycle_avg_aperture(self, room_key: str, aperture: float) -> None:
-        self._data.setdefault("cycle_avg_apertures", {})[room_key] = aperture
+        self._set_item("cycle_avg_apertures", room_key, aperture)
 
     def clear_cycle_avg_apertures(self) -> None:
-        self._data["cycle_avg_apertures"] = {}
+        self._put("cycle_avg_apertures", {})
 
     # -- per-vent last adjustment tracking ----------------------------------
 
     def get_vent_last_adjusted(self, vent_entity: str) -> float:
         return float(
-            self._data.get("vent_last_adjusted", {}).get(vent_entity, 0)
+            self._get("vent_last_adjusted", {}).get(vent_entity, 0)
         )
 
     def set_vent_last_adjusted(self, vent_entity: str, timestamp: float) -> None:
-        self._data.setdefault("vent_last_adjusted", {})[vent_entity] = timestamp
+        self._set_item("vent_last_adjusted", vent_entity, timestamp)
 
     # -- max running minutes (rolling) --------------------------------------
 
     @property
     def max_running_minutes(self) -> float:
-        return float(self._data.get("max_running_minutes", 60.0))
+        return float(self._get("max_running_minutes", 60.0))
 
     @max_running_minutes.setter
     def max_running_minutes(self, value: float) -> None:
-        self._data["max_running_minutes"] = value
+        self._put("max_running_minutes", value)
 
     # -- per-room target setpoints ------------------------------------------
 
     def get_room_setpoint(self, room_key: str) -> float | None:
-        val = self._data.get("room_setpoints", {}).get(room_key)
+        val = self._get("room_setpoints", {}).get(room_key)
         return float(val) if val is not None else None
 
     def set_room_setpoint(self, room_key: str, temp: float) -> None:
-        self._data.setdefault("room_setpoints", {})[room_key] = temp
+        self._set_item("room_setpoints", room_key, temp)
 
     # -- per-room conditioning overrides ------------------------------------
 
     def set_room_override(self, room_key: str, until_ts: float) -> None:
-        self._data.setdefault("room_overrides", {})[room_key] = {"until": until_ts}
+        self._set_item("room_overrides", room_key, {"until": until_ts})
 
     def clear_room_override(self, room_key: str) -> None:
-        self._data.setdefault("room_overrides", {}).pop(room_key, None)
+        self._pop_item("room_overrides", room_key)
 
     def get_room_override_until(self, room_key: str) -> float | None:
-        info = self._data.get("room_overrides", {}).get(room_key)
+        info = self._get("room_overrides", {}).get(room_key)
         if not info:
             return None
         until = info.get("until")
@@ -164,15 +570,15 @@ class SmartVentStore:
 
     def export_efficiency(self) -> dict[str, Any]:
         return {
-            "heating_rates": dict(self._data.get("heating_rates", {})),
-            "cooling_rates": dict(self._data.get("cooling_rates", {})),
+            "heating_rates": dict(self._get("heating_rates", {})),
+            "cooling_rates": dict(self._get("cooling_rates", {})),
             "max_running_minutes": self.max_running_minutes,
         }
 
     def import_efficiency(self, payload: dict[str, Any]) -> None:
         if "heating_rates" in payload:
-            self._data["heating_rates"] = dict(payload["heating_rates"])
+            self._put("heating_rates", dict(payload["heating_rates"]))
         if "cooling_rates" in payload:
-            self._data["cooling_rates"] = dict(payload["cooling_rates"])
+            self._put("cooling_rates", dict(payload["cooling_rates"]))
         if "max_running_minutes" in payload:
-            self._data["max_running_minutes"] = float(payload["max_running_minutes"])
+            self._put("max_running_minutes", float(payload["max_running_minutes"]))
@@ -0,0 +1,141 @@
+"""Compiled, read-only view of the configured rooms.
+
+``entry.data["rooms"]`` is a list of plain dicts keyed by display name.
+:class:`RoomTopology` compiles it once into interned room keys, dense integer
+room IDs, frozen vent tuples and an entity-to-room reverse index, so per-run
+code and state-change handlers do not re-derive keys or scan the room list.
+The coordinator recompiles it only when the rooms list is replaced.
+"""
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+
+def room_key(name: str) -> str:
+    """Key used for a room throughout the integration."""
+    return name.lower().replace(" ", "_")
+
+
+@dataclass(frozen=True, slots=True)
+class RoomInfo:
+    """One configured room."""
+
+    id: int
+    key: str
+    name: str
+    temp_sensor: str | None
+    climate_entity: str | None
+    occupancy_sensor: str | None
+    vents: tuple[str, ...]
+    priority: int
+
+    @property
+    def entities(self) -> tuple[str, ...]:
+        """Every entity the room reads, sensors first."""
+        sensors = (self.temp_sensor, self.climate_entity, self.occupancy_sensor)
+        return tuple(e for e in sensors if e) + self.vents
+
+
+class RoomTopology:
+    """Rooms indexed by dense integer ID (configuration order)."""
+
+    __slots__ = (
+        "source",
+        "main_thermostat",
+        "rooms",
+        "keys",
+        "ids",
+        "vents",
+        "entity_rooms",
+    )
+
+    def __init__(
+        self, rooms: Sequence[Mapping[str, Any]], main_thermostat: str | None = None
+    ) -> None:
+        self.source = rooms
+        self.main_thermostat = main_thermostat
+
+        compiled: list[RoomInfo] = []
+        ids: dict[str, int] = {}
+        entity_rooms: dict[str, list[int]] = {}
+        vents: dict[str, None] = {}
+        for config in rooms:
+            name = config.get("name", "")
+            key = sys.intern(room_key(name))
+            if key in ids:
+                # Same key twice: the first room wins, as lookups always did.
+                continue
+            room = RoomInfo(
+                id=len(compiled),
+                key=key,
+                name=name,
+                temp_sensor=config.get("temp_sensor") or None,
+                climate_entity=config.get("climate_entity") or None,
+                occupancy_sensor=config.get("occupancy_sensor") or None,
+                vents=tuple(config.get("vent_entities", [])),
+                priority=config.get("priority", 5),
+            )
+            ids[key] = room.id
+            compiled.append(room)
+            for entity_id in room.entities:
+                room_ids = entity_rooms.setdefault(entity_id, [])
+                if room.id not in room_ids:
+                    room_ids.append(room.id)
+            vents.update(dict.fromkeys(room.vents))
+
+        self.rooms: tuple[RoomInfo, ...] = tuple(compiled)
+        self.keys: tuple[str, ...] = tuple(room.key for room in compiled)
+        self.ids: Mapping[str, int] = MappingProxyType(ids)
+        self.vents: tuple[str, ...] = tuple(vents)
+        self.entity_rooms: Mapping[str, tuple[int, ...]] = MappingProxyType(
+            {entity_id: tuple(ids) for entity_id, ids in entity_rooms.items()}
+        )
+
+    @classmethod
+    def from_entry_data(cls, data: Mapping[str, Any]) -> RoomTopology:
+        """Compile the topology of a config entry's ``data``."""
+        return cls(data.get("rooms", []), data.get("main_thermostat"))
+
+    def is_current(self, data: Mapping[str, Any]) -> bool:
+        """True if *data* still holds the rooms list this was compiled from."""
+        return (
+            data.get("rooms", []) is self.source
+            and data.get("main_thermostat") == self.main_thermostat
+        )
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def __iter__(self) -> Iterator[RoomInfo]:
+        return iter(self.rooms)
+
+    def get(self, key: str) -> RoomInfo | None:
+        """Room with *key*, or ``None``."""
+        room_id = self.ids.get(key)
+        return None if room_id is None else self.rooms[room_id]
+
+    def find(self, name_or_key: str) -> RoomInfo | None:
+        """Room matching a display name or key (as services accept either)."""
+        return self.get(room_key(name_or_key))
+
+    def tracked_entities(self) -> list[str]:
+        """Room entities plus the main thermostat, without duplicates."""
+        entity_ids = list(self.entity_rooms)
+        if self.main_thermostat and self.main_thermostat not in self.entity_rooms:
+            entity_ids.append(self.main_thermostat)
+        return entity_ids
+
+    def parse_csv(self, csv: str) -> list[str]:
+        """Known room keys in a rooms-to-condition CSV, in CSV order."""
+        if not csv or csv.strip() in ("", "none"):
+            return []
+        ids = self.ids
+        return [
+            self.keys[ids[part]]
+            for part in (p.strip() for p in csv.split(","))
+            if part in ids
+        ]
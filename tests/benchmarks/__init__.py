@@ -0,0 +1 @@
+"""Performance benchmarks (latency, allocations, scaling)."""
@@ -0,0 +1,130 @@
+"""Synthetic houses and a small timing harness for the benchmarks.
+
+Each measurement records the best per-call latency over several repeats and
+the peak memory allocated by one call.  Absolute numbers depend on the
+machine, so the suite gates on two things:
+
+* scaling: the growth of latency between house sizes, which catches a
+  linear pass turning quadratic regardless of hardware;
+* an optional saved baseline: set ``SVC_BENCH_SAVE=path.json`` to record a
+  run and ``SVC_BENCH_BASELINE=path.json`` to fail when a later run on the
+  same machine is slower than ``SVC_BENCH_THRESHOLD`` (default 1.5) times
+  the recorded latency.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from custom_components.smart_vent_controller.algorithm import RoomBatch
+
+HOUSE_SIZES = (5, 50, 500, 5000)
+
+# Upper bound on the fitted exponent t ~ n**k between the two largest
+# houses.  Every benchmarked function is linear or n log n; the margin
+# absorbs timer noise on shared CI runners.
+MAX_SCALING_EXPONENT = 1.5
+
+
+@dataclass
+class Measurement:
+    """Result of benchmarking one function on one house size."""
+
+    name: str
+    rooms: int
+    seconds_per_call: float
+    peak_bytes: int
+
+
+def make_house(rooms: int, seed: int = 0) -> RoomBatch:
+    """Build a deterministic synthetic house with *rooms* rooms."""
+    rng = random.Random(seed * 100_003 + rooms)
+    batch = RoomBatch()
+    for index in range(rooms):
+        temp = round(rng.uniform(62.0, 78.0), 1)
+        batch.append(
+            f"room_{index}",
+            temp,
+            rate=round(rng.uniform(0.01, 0.5), 3),
+            active=rng.random() > 0.1,
+            delta=round(72.0 - temp, 1),
+            occupied=rng.random() > 0.6,
+            priority=rng.randint(0, 10),
+        )
+    return batch
+
+
+def measure(
+    name: str,
+    rooms: int,
+    func: Callable[[], object],
+    repeats: int = 5,
+    min_time: float = 0.02,
+) -> Measurement:
+    """Time *func* and record its peak allocation for one call."""
+    func()  # warm-up
+
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or calls >= 1_000_000:
+            break
+        calls *= 2
+
+    best = elapsed / calls
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, (time.perf_counter() - start) / calls)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = Measurement(name, rooms, best, peak)
+    _record(result)
+    return result
+
+
+def scaling_exponent(small: Measurement, large: Measurement) -> float:
+    """Fitted k in ``t ~ n**k`` between two measurements of one function."""
+    return math.log(large.seconds_per_call / small.seconds_per_call) / math.log(
+        large.rooms / small.rooms
+    )
+
+
+def _record(result: Measurement) -> None:
+    key = f"{result.name}[{result.rooms}]"
+
+    save_path = os.environ.get("SVC_BENCH_SAVE")
+    if save_path:
+        path = Path(save_path)
+        data = json.loads(path.read_text()) if path.exists() else {}
+        data[key] = asdict(result)
+        path.write_text(json.dumps(data, indent=2, sort_keys=True))
+
+    baseline_path = os.environ.get("SVC_BENCH_BASELINE")
+    if baseline_path:
+        baseline = json.loads(Path(baseline_path).read_text()).get(key)
+        if baseline is None:
+            return
+        threshold = float(os.environ.get("SVC_BENCH_THRESHOLD", "1.5"))
+        limit = baseline["seconds_per_call"] * threshold
+        assert result.seconds_per_call <= limit, (
+            f"{key}: {result.seconds_per_call * 1e6:.1f} us/call exceeds "
+            f"{threshold}x baseline {baseline['seconds_per_call'] * 1e6:.1f} us/call"
+        )
@@ -0,0 +1,211 @@
+"""End-to-end load harness on the test ``hass`` instance.
+
+``LoadHarness`` fills the real (test) state machine with a synthetic house —
+a main thermostat plus, per room, a temperature sensor, a climate entity, an
+occupancy sensor and any number of vent covers — and registers a stand-in
+``cover.set_cover_position`` service that moves the cover state like a real
+vent would (or, with ``confirm=False``, accepts the command and never
+moves).  :meth:`LoadHarness.async_measure` then runs one coordinator
+refresh and one ``VentControlScript.async_run`` and reports latency,
+``hass.states`` access counts and service-call throughput.  The script
+runs on the refresh's snapshot, as the automation does.
+"""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant, ServiceCall, StateMachine
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smart_vent_controller.const import DOMAIN
+from custom_components.smart_vent_controller.coordinator import (
+    SmartVentControllerCoordinator,
+)
+from custom_components.smart_vent_controller.scripts import VentControlScript
+from custom_components.smart_vent_controller.topology import room_key
+
+MAIN_THERMOSTAT = "climate.main"
+SETPOINT = 72.0
+
+# Options that keep every vent where it is, isolating the read/plan path.
+READ_ONLY_OPTIONS = {
+    "min_adjustment_pct": 100,
+    "temp_error_override_f": 10.0,
+}
+
+
+@dataclass
+class LoadReport:
+    """Measurements for one refresh + vent-control run."""
+
+    rooms: int
+    entities: int
+    update_seconds: float
+    run_seconds: float
+    update_state_gets: int
+    run_state_gets: int
+    entity_id_scans: int
+    service_calls: int
+
+    @property
+    def calls_per_second(self) -> float:
+        return self.service_calls / self.run_seconds if self.run_seconds else 0.0
+
+    def line(self, label: str) -> str:
+        return (
+            f"{label:<24} {self.rooms:>4} rooms {self.entities:>5} entities "
+            f"refresh {self.update_seconds * 1e3:>8.1f} ms "
+            f"({self.update_state_gets} gets)  "
+            f"run {self.run_seconds * 1e3:>8.1f} ms "
+            f"({self.run_state_gets} gets, {self.entity_id_scans} id scans, "
+            f"{self.service_calls} calls, {self.calls_per_second:.0f} calls/s)"
+        )
+
+
+class LoadHarness:
+    """A synthetic house hosted on the test ``hass`` instance."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        rooms: int,
+        vents_per_room: int,
+        options: dict | None = None,
+        seed: int = 0,
+        confirm: bool = True,
+    ) -> None:
+        self.hass = hass
+        self.confirm = confirm
+        self.rng = random.Random(seed)
+        self.room_count = rooms
+        self.rooms_config = [
+            {
+                "name": f"Room {index}",
+                "temp_sensor": f"sensor.room_{index}_temperature",
+                "climate_entity": f"climate.room_{index}",
+                "occupancy_sensor": f"binary_sensor.room_{index}_occupancy",
+                "vent_entities": [
+                    f"cover.room_{index}_vent_{vent}" for vent in range(vents_per_room)
+                ],
+                "priority": index % 10,
+            }
+            for index in range(rooms)
+        ]
+        self.options = {
+            "control_strategy": "hybrid",
+            "min_adjustment_interval_min": 0,
+            "require_occupancy": False,
+            "vent_rate_limit": 50,
+            **(options or {}),
+        }
+        self.service_calls = 0
+        self.entry: MockConfigEntry | None = None
+        self.coordinator: SmartVentControllerCoordinator | None = None
+        self.script: VentControlScript | None = None
+
+    @property
+    def entities(self) -> int:
+        """Number of entities the house adds to the state machine."""
+        return 1 + sum(3 + len(room["vent_entities"]) for room in self.rooms_config)
+
+    async def async_setup(self) -> None:
+        """Populate states, register the cover service and build the entry."""
+        hass = self.hass
+        hass.states.async_set(
+            MAIN_THERMOSTAT,
+            "heat",
+            {"hvac_action": "heating", "temperature": SETPOINT},
+        )
+        for room in self.rooms_config:
+            temp = self._random_temp()
+            hass.states.async_set(room["temp_sensor"], str(temp))
+            hass.states.async_set(
+                room["climate_entity"],
+                "heat",
+                {"temperature": SETPOINT, "current_temperature": temp},
+            )
+            hass.states.async_set(
+                room["occupancy_sensor"], "on" if self.rng.random() > 0.5 else "off"
+            )
+            for vent in room["vent_entities"]:
+                hass.states.async_set(vent, "closed", {"current_position": 0})
+
+        hass.services.async_register("cover", "set_cover_position", self._set_position)
+
+        self.entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={"main_thermostat": MAIN_THERMOSTAT, "rooms": self.rooms_config},
+            options=self.options,
+        )
+        self.entry.add_to_hass(hass)
+        self.coordinator = SmartVentControllerCoordinator(hass, self.entry)
+        await self.coordinator.async_initialize()
+        hass.data.setdefault(DOMAIN, {})[self.entry.entry_id] = self.coordinator
+        self.script = VentControlScript(hass, self.entry)
+
+    async def _set_position(self, call: ServiceCall) -> None:
+        entity_ids = call.data["entity_id"]
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        position = int(call.data["position"])
+        self.service_calls += 1
+        if not self.confirm:
+            return
+        for entity_id in entity_ids:
+            self.hass.states.async_set(
+                entity_id,
+                "open" if position > 0 else "closed",
+                {"current_position": position},
+            )
+
+    def _random_temp(self) -> float:
+        return round(self.rng.uniform(64.0, 76.0), 1)
+
+    def sensor_storm(self, updates: int) -> None:
+        """Write *updates* new readings to randomly chosen room sensors."""
+        for _ in range(updates):
+            room = self.rng.choice(self.rooms_config)
+            self.hass.states.async_set(room["temp_sensor"], str(self._random_temp()))
+
+    def selected_rooms_csv(self) -> str:
+        """Every fourth room, standing in for the rooms-to-condition sensor."""
+        return ",".join(room_key(room["name"]) for room in self.rooms_config[::4])
+
+    async def async_measure(self) -> LoadReport:
+        """Run one refresh and one vent-control pass and report the cost."""
+        original_get = StateMachine.get
+        original_ids = StateMachine.async_entity_ids
+        calls_before = self.service_calls
+
+        with patch.object(
+            StateMachine, "get", autospec=True, side_effect=original_get
+        ) as get_mock, patch.object(
+            StateMachine, "async_entity_ids", autospec=True, side_effect=original_ids
+        ) as ids_mock:
+            start = time.perf_counter()
+            self.coordinator.data = await self.coordinator._async_update_data()
+            update_seconds = time.perf_counter() - start
+            update_gets = get_mock.call_count
+
+            start = time.perf_counter()
+            await self.script.async_run(
+                self.selected_rooms_csv(), self.coordinator.snapshot
+            )
+            await self.hass.async_block_till_done()
+            run_seconds = time.perf_counter() - start
+            run_gets = get_mock.call_count - update_gets
+            id_scans = ids_mock.call_count
+
+        return LoadReport(
+            rooms=self.room_count,
+            entities=self.entities,
+            update_seconds=update_seconds,
+            run_seconds=run_seconds,
+            update_state_gets=update_gets,
+            run_state_gets=run_gets,
+            entity_id_scans=id_scans,
+            service_calls=self.service_calls - calls_before,
+        )
@@ -0,0 +1,97 @@
+"""Latency, allocation and scaling benchmarks for the algorithm module.
+
+Run only these with ``pytest tests/benchmarks -m benchmark -s`` to see the
+per-size table; see ``helpers`` for baseline comparison.
+"""
+import pytest
+
+from custom_components.smart_vent_controller.algorithm import (
+    AlgorithmSettings,
+    adjust_for_minimum_airflow,
+    calculate_all_vent_targets,
+    calculate_longest_time_to_target,
+    round_plan_to_granularity,
+    round_to_granularity,
+    select_relief_rooms,
+)
+
+from .helpers import (
+    HOUSE_SIZES,
+    MAX_SCALING_EXPONENT,
+    make_house,
+    measure,
+    scaling_exponent,
+)
+
+pytestmark = pytest.mark.benchmark
+
+# Every vent closed and a minimum that forces nearly all of them open:
+# the deficit is as large as it gets and every room takes part.
+_WORST_CASE_SETTINGS = AlgorithmSettings(min_combined_vent_flow=90.0)
+
+
+def _targets_case(batch):
+    return lambda: calculate_all_vent_targets(batch, "heating", 72.0, 30.0, "hybrid")
+
+
+def _longest_time_case(batch):
+    return lambda: calculate_longest_time_to_target(batch, "heating", 72.0)
+
+
+def _airflow_case(batch):
+    closed = dict.fromkeys(batch.keys, 0.0)
+    # The plan is adjusted in place; every call starts from all-closed.
+    return lambda: adjust_for_minimum_airflow(
+        dict(closed), batch, "heating", 0, _WORST_CASE_SETTINGS
+    )
+
+
+def _relief_case(batch):
+    selected = batch.keys[: max(1, len(batch) // 10)]
+    return lambda: select_relief_rooms(batch, selected, "heat", "heating", 3)
+
+
+def _round_case(batch):
+    values = [rate * 200.0 for rate in batch.rates]
+    return lambda: [round_to_granularity(value, 10) for value in values]
+
+
+def _round_plan_case(batch):
+    plan = {key: rate * 200.0 for key, rate in zip(batch.keys, batch.rates)}
+    return lambda: round_plan_to_granularity(plan, 10)
+
+
+CASES = {
+    "calculate_all_vent_targets": _targets_case,
+    "calculate_longest_time_to_target": _longest_time_case,
+    "adjust_for_minimum_airflow_worst_case": _airflow_case,
+    "select_relief_rooms": _relief_case,
+    "round_to_granularity": _round_case,
+    "round_plan_to_granularity": _round_plan_case,
+}
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_scaling(name):
+    results = [
+        measure(name, rooms, CASES[name](make_house(rooms))) for rooms in HOUSE_SIZES
+    ]
+    for result in results:
+        print(
+            f"{name:<40} {result.rooms:>5} rooms "
+            f"{result.seconds_per_call * 1e6:>10.1f} us/call "
+            f"{result.peak_bytes / 1024:>9.1f} KiB peak"
+        )
+
+    time_exponent = scaling_exponent(results[-2], results[-1])
+    assert time_exponent <= MAX_SCALING_EXPONENT, (
+        f"{name} latency grows as n**{time_exponent:.2f} "
+        f"between {results[-2].rooms} and {results[-1].rooms} rooms"
+    )
+
+    small, large = results[-2], results[-1]
+    growth = large.peak_bytes / max(small.peak_bytes, 1)
+    assert growth <= (large.rooms / small.rooms) ** MAX_SCALING_EXPONENT, (
+        f"{name} peak allocation grows {growth:.1f}x "
+        f"between {small.rooms} and {large.rooms} rooms"
+    )
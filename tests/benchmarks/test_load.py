@@ -0,0 +1,141 @@
+"""End-to-end load benchmarks for the coordinator and vent control script.
+
+Run with ``pytest tests/benchmarks/test_load.py -s`` to see the reports; the
+wall-clock checks are marked ``benchmark`` and run only with ``-m benchmark``.
+"""
+import math
+import statistics
+
+import pytest
+
+from custom_components.smart_vent_controller.topology import room_key
+
+from .helpers import MAX_SCALING_EXPONENT
+from .load import READ_ONLY_OPTIONS, LoadHarness
+
+# hass.states.get calls allowed per entity in the house.  The refresh reads
+# each room entity about once; the script works on the refresh's snapshot,
+# so the run's reads come from the cover service and state-change listeners
+# as vents move.
+MAX_REFRESH_GETS_PER_ENTITY = 2
+MAX_RUN_GETS_PER_ENTITY = 8
+
+
+async def _measure(hass, rooms, vents_per_room, options=None, label=""):
+    harness = LoadHarness(hass, rooms, vents_per_room, options)
+    await harness.async_setup()
+    report = await harness.async_measure()
+    print(report.line(label or f"{rooms}x{vents_per_room}"))
+    return harness, report
+
+
+@pytest.mark.parametrize(("rooms", "vents_per_room"), [(20, 4), (200, 10)])
+async def test_state_reads_are_linear(hass, rooms, vents_per_room):
+    _, report = await _measure(hass, rooms, vents_per_room, READ_ONLY_OPTIONS)
+
+    assert report.service_calls == 0
+    assert report.update_state_gets <= MAX_REFRESH_GETS_PER_ENTITY * report.entities
+    assert report.run_state_gets <= MAX_RUN_GETS_PER_ENTITY * report.entities
+
+
+@pytest.mark.benchmark
+async def test_run_latency_scales_linearly(hass):
+    _, small = await _measure(hass, 20, 4, READ_ONLY_OPTIONS, "small house")
+    _, large = await _measure(hass, 200, 10, READ_ONLY_OPTIONS, "large house")
+
+    # The large house reuses the small one's entity ids, so the state
+    # machine holds exactly large.entities entities for the second run.
+    exponent = math.log(large.run_seconds / small.run_seconds) / math.log(
+        large.entities / small.entities
+    )
+    assert exponent <= MAX_SCALING_EXPONENT
+
+
+async def test_service_call_throughput(hass):
+    harness, report = await _measure(hass, 25, 4, label="all vents moving")
+
+    covers = sum(len(room["vent_entities"]) for room in harness.rooms_config)
+    assert report.service_calls >= 1
+    moved = [
+        hass.states.get(vent).attributes["current_position"]
+        for room in harness.rooms_config
+        for vent in room["vent_entities"]
+    ]
+    assert len(moved) == covers
+    assert all(position > 0 for position in moved)
+    # Vents sharing a target position are moved by one multi-entity call.
+    assert report.service_calls < covers
+    # The stand-in covers are unregistered, so they share the "cover" bucket.
+    limiter = harness.coordinator.rate_limiter.stats()
+    assert limiter["platforms"]["cover"]["commands"] == covers
+    actuation = harness.coordinator.actuation.stats()
+    assert actuation["confirmed"] == covers
+    assert actuation["in_flight"] == 0
+    store = harness.coordinator.store
+    assert all(
+        store.get_vent_last_adjusted(vent) > 0
+        for room in harness.rooms_config
+        for vent in room["vent_entities"]
+    )
+
+
+@pytest.mark.benchmark
+async def test_vent_commands_are_paced_to_the_rate_limit(hass):
+    harness, report = await _measure(hass, 25, 4, label="paced vents")
+
+    covers = sum(len(room["vent_entities"]) for room in harness.rooms_config)
+    limiter = harness.coordinator.rate_limiter.stats()
+    assert report.run_seconds >= (covers - limiter["burst"]) / limiter["max_rate"]
+
+
+async def test_quiet_poll_rereads_nothing(hass):
+    harness, _ = await _measure(hass, 200, 10, READ_ONLY_OPTIONS)
+    coordinator = harness.coordinator
+
+    await coordinator._async_update_data()
+    reread = coordinator.rooms_reread
+    report = await harness.async_measure()
+    print(report.line("quiet poll"))
+
+    assert coordinator.rooms_reread == reread
+    assert coordinator.changed_rooms == frozenset()
+    assert report.update_state_gets == 0
+
+
+async def test_sensor_update_storm(hass):
+    harness, first = await _measure(hass, 40, 5, label="before storm")
+
+    run_times = []
+    for round_index in range(5):
+        harness.sensor_storm(200)
+        await hass.async_block_till_done()
+        report = await harness.async_measure()
+        print(report.line(f"storm round {round_index}"))
+        run_times.append(report.update_seconds + report.run_seconds)
+
+        assert report.update_state_gets <= MAX_REFRESH_GETS_PER_ENTITY * report.entities
+        assert report.run_state_gets <= MAX_RUN_GETS_PER_ENTITY * report.entities
+
+    for room in harness.rooms_config:
+        key = room_key(room["name"])
+        assert harness.coordinator.data[f"{key}_temp"] == float(
+            hass.states.get(room["temp_sensor"]).state
+        )
+    print(
+        f"storm refresh+run: median {statistics.median(run_times) * 1e3:.1f} ms, "
+        f"max {max(run_times) * 1e3:.1f} ms"
+    )
+
+
+async def test_unconfirmed_moves_are_not_resent(hass):
+    harness = LoadHarness(hass, 10, 2, confirm=False)
+    await harness.async_setup()
+    first = await harness.async_measure()
+    second = await harness.async_measure()
+    print(second.line("moves still in flight"))
+
+    assert first.service_calls >= 1
+    assert second.service_calls == 0
+    actuation = harness.coordinator.actuation.stats()
+    assert actuation["in_flight"] == 20
+    assert actuation["duplicates_suppressed"] == 20
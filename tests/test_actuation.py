@@ -0,0 +1,148 @@
+"""Tests for vent command confirmation tracking."""
+from custom_components.smart_vent_controller.actuation import (
+    ABANDONED,
+    IN_FLIGHT,
+    RETRY,
+    SEND,
+    ActuationTracker,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _tracker(clock, **kwargs):
+    results = []
+    tracker = ActuationTracker(
+        timeout=10.0,
+        max_retries=2,
+        backoff=2.0,
+        on_result=lambda *result: results.append(result),
+        clock=clock,
+        **kwargs,
+    )
+    return tracker, results
+
+
+def test_confirmation_records_latency():
+    clock = FakeClock()
+    tracker, results = _tracker(clock)
+
+    assert tracker.check("cover.a", 40) == SEND
+    tracker.sent("cover.a", 40)
+    clock.now += 1.5
+    assert not tracker.observe("cover.a", 10)
+    assert tracker.observe("cover.a", 39)
+
+    assert "cover.a" not in tracker.pending
+    assert results == [("cover.a", 1.5, True)]
+    histogram = tracker.latency_histogram("cover.a")
+    assert histogram["le_2s"] == 1
+    assert sum(histogram.values()) == 1
+    assert tracker.stats()["vents"]["cover.a"]["latency_avg_ms"] == 1500.0
+
+
+def test_same_target_is_suppressed_while_in_flight():
+    clock = FakeClock()
+    tracker, _ = _tracker(clock)
+    tracker.sent("cover.a", 40)
+
+    clock.now += 5
+    assert tracker.check("cover.a", 40) == IN_FLIGHT
+    # A new target supersedes the pending command.
+    assert tracker.check("cover.a", 70) == SEND
+    assert tracker.stats()["duplicates_suppressed"] == 1
+
+
+def test_overdue_commands_are_retried_with_backoff_then_given_up():
+    clock = FakeClock()
+    tracker, results = _tracker(clock)
+    tracker.sent("cover.a", 40)
+
+    clock.now += 10
+    assert tracker.check("cover.a", 40) == RETRY
+    tracker.sent("cover.a", 40)
+    clock.now += 15
+    assert tracker.check("cover.a", 40) == IN_FLIGHT
+    clock.now += 5
+    assert tracker.check("cover.a", 40) == RETRY
+    tracker.sent("cover.a", 40)
+    clock.now += 40
+
+    assert tracker.check("cover.a", 40) == ABANDONED
+    assert "cover.a" not in tracker.pending
+    assert results == [("cover.a", 40.0, False)]
+    stats = tracker.stats()
+    assert stats["retries"] == 2
+    assert stats["given_up"] == 1
+
+
+def test_given_up_target_is_not_sent_again_until_something_changes():
+    clock = FakeClock()
+    tracker, results = _tracker(clock)
+    tracker.observe("cover.a", 0)
+    tracker.sent("cover.a", 40)
+    sends = 1
+    for _ in range(20):
+        clock.now += 100
+        tracker.observe("cover.a", 0)
+        if tracker.check("cover.a", 40) in (SEND, RETRY):
+            tracker.sent("cover.a", 40)
+            sends += 1
+
+    assert sends == 3
+    assert len(results) == 1
+    assert tracker.stats()["abandoned"] == 1
+
+    # The vent reports a new position: the target may be tried again.
+    tracker.observe("cover.a", 25)
+    assert tracker.check("cover.a", 40) == SEND
+
+
+def test_new_target_releases_a_given_up_vent():
+    clock = FakeClock()
+    tracker, _ = _tracker(clock)
+    tracker.sent("cover.a", 40)
+    for _ in range(3):
+        clock.now += 100
+        if tracker.check("cover.a", 40) == RETRY:
+            tracker.sent("cover.a", 40)
+
+    assert tracker.check("cover.a", 40) == ABANDONED
+    assert tracker.check("cover.a", 60) == SEND
+    assert tracker.check("cover.a", 40) == SEND
+
+
+def test_dispatch_restarts_the_clock_and_failures_clear_pending():
+    clock = FakeClock()
+    tracker, results = _tracker(clock)
+    tracker.sent("cover.a", 40)
+    tracker.sent("cover.b", 40)
+
+    clock.now += 3
+    tracker.dispatched(["cover.a"])
+    tracker.failed(["cover.b"])
+    clock.now += 1
+    tracker.observe("cover.a", 40)
+
+    assert results == [("cover.a", 1.0, True)]
+    assert tracker.pending == {}
+
+
+def test_forget_drops_removed_vents():
+    clock = FakeClock()
+    tracker, _ = _tracker(clock)
+    for entity_id in ("cover.a", "cover.b"):
+        tracker.sent(entity_id, 40)
+        tracker.observe(entity_id, 40)
+    tracker.sent("cover.b", 60)
+
+    tracker.forget(["cover.a"])
+
+    assert tracker.pending == {}
+    assert list(tracker.stats()["vents"]) == ["cover.a"]
@@ -1,9 +1,15 @@
 """Tests for the algorithm module (pure functions, no HA dependency)."""
+import math
+
 import pytest
 
 from custom_components.smart_vent_controller.algorithm import (
+    _MAX_EXP_ARG,
     AlgorithmSettings,
+    ExponentialTable,
+    RoomBatch,
     round_to_granularity,
+    round_plan_to_granularity,
     has_reached_setpoint,
     should_pre_adjust,
     compute_efficiency_sample,
@@ -11,9 +17,14 @@ from custom_components.smart_vent_controller.algorithm import (
     calculate_linear_target,
     calculate_longest_time_to_target,
     calculate_all_vent_targets,
+    calculate_targets_batch,
     adjust_for_minimum_airflow,
+    adjust_for_minimum_airflow_iterative,
     compute_simple_targets,
+    exponential_table,
     is_night_time,
+    select_relief_rooms,
+    solve_vent_plan,
 )
 
 
@@ -38,6 +49,40 @@ class TestRoundToGranularity:
         assert round_to_granularity(47.3, -1) == 47
 
 
+class TestRoundPlanToGranularity:
+    def test_on_grid_values_unchanged(self):
+        plan = {"a": 20.0, "b": 60.0, "c": 100.0, "d": 0.0}
+        assert round_plan_to_granularity(plan, 5) == {"a": 20, "b": 60, "c": 100, "d": 0}
+
+    def test_preserves_total_flow(self):
+        # Per-room rounding would take every room down to 30 and lose 36%.
+        plan = {str(i): 32.4 for i in range(20)}
+        rounded = round_plan_to_granularity(plan, 5)
+        naive = sum(round_to_granularity(v, 5) for v in plan.values())
+        assert naive < sum(plan.values())
+        assert sum(rounded.values()) >= sum(plan.values())
+        assert sum(rounded.values()) - sum(plan.values()) < 5
+
+    def test_each_room_within_one_step(self):
+        plan = {"a": 12.5, "b": 47.9, "c": 63.1, "d": 99.0, "e": 3.3}
+        rounded = round_plan_to_granularity(plan, 10)
+        for key, value in plan.items():
+            assert abs(rounded[key] - value) < 10
+            assert rounded[key] % 10 == 0
+
+    def test_largest_remainders_rounded_up(self):
+        plan = {"a": 41.0, "b": 44.0, "c": 43.0}
+        rounded = round_plan_to_granularity(plan, 5)
+        assert rounded == {"a": 40, "b": 45, "c": 45}
+
+    def test_top_step_is_100(self):
+        assert round_plan_to_granularity({"a": 97.0}, 15) == {"a": 100}
+
+    def test_granularity_zero_uses_whole_percent(self):
+        rounded = round_plan_to_granularity({"a": 10.5, "b": 10.5}, 0)
+        assert sum(rounded.values()) == 21
+
+
 # ---------------------------------------------------------------------------
 # has_reached_setpoint
 # ---------------------------------------------------------------------------
@@ -144,6 +189,90 @@ class TestVentTargetCalculations:
         assert pct_far > pct_close
 
 
+# ---------------------------------------------------------------------------
+# ExponentialTable
+# ---------------------------------------------------------------------------
+
+def _exact_exp_pct(ratio, settings):
+    exponent = ratio * settings.exp_const
+    if exponent > _MAX_EXP_ARG:
+        return 100.0
+    return max(0.0, min(100.0, settings.base_const * math.exp(exponent) * 100.0))
+
+
+class TestExponentialTable:
+    @pytest.mark.parametrize("max_error", [0.5, 0.05, 0.01, 0.001])
+    @pytest.mark.parametrize("settings", [
+        AlgorithmSettings(),
+        AlgorithmSettings(base_const=0.02, exp_const=4.0),
+        AlgorithmSettings(base_const=0.5, exp_const=0.7),
+    ])
+    def test_max_deviation_within_bound(self, settings, max_error):
+        table = ExponentialTable(settings, max_error)
+        # Interpolation errs most between knots, so check every interval's
+        # midpoint plus an even grid running past the saturation limit.
+        samples = 4_000
+        upper = table.ratio_limit * 1.5
+        ratios = [upper * i / samples for i in range(samples + 1)]
+        ratios += [(i + 0.5) * table.step for i in range(len(table))]
+        worst = max(abs(table(r) - _exact_exp_pct(r, settings)) for r in ratios)
+        assert worst <= max_error + 1e-9
+
+    def test_table_size_follows_error_bound(self):
+        assert len(ExponentialTable(max_error=0.001)) > len(ExponentialTable(max_error=0.1))
+
+    def test_saturates_past_limit(self):
+        table = ExponentialTable()
+        assert table(table.ratio_limit) == 100.0
+        assert table(1e6) == 100.0
+
+    def test_rejects_bad_parameters(self):
+        with pytest.raises(ValueError):
+            ExponentialTable(max_error=0.0)
+        with pytest.raises(ValueError):
+            ExponentialTable(AlgorithmSettings(exp_const=0.0))
+
+    def test_cached_per_settings(self):
+        assert exponential_table() is exponential_table()
+        other = AlgorithmSettings(exp_const=3.0)
+        assert exponential_table(other) is not exponential_table()
+        assert exponential_table(other).settings == other
+
+    def test_scalar_target_with_table(self):
+        table = exponential_table(max_error=0.01)
+        for temp in (60.0, 66.0, 70.0, 71.5):
+            for rate in (0.02, 0.05, 0.1, 0.5):
+                exact = calculate_vent_target(temp, 72.0, rate, 30.0, "heating")
+                approx = calculate_vent_target(temp, 72.0, rate, 30.0, "heating", table=table)
+                assert abs(exact - approx) <= 0.01 + 1e-9
+
+    def test_batch_with_table(self):
+        table = exponential_table(max_error=0.01)
+        temps = [60.0 + i * 0.25 for i in range(60)]
+        rates = [0.01 + (i % 7) * 0.03 for i in range(60)]
+        active = [True] * 60
+        for strategy in ("learned", "hybrid", "simple"):
+            exact = calculate_targets_batch(temps, rates, active, "heating", 72.0, 30.0, strategy)
+            approx = calculate_targets_batch(
+                temps, rates, active, "heating", 72.0, 30.0, strategy, table=table
+            )
+            assert all(abs(a - b) <= 0.01 + 1e-9 for a, b in zip(exact, approx))
+
+    def test_scalar_rejects_mismatched_table(self):
+        with pytest.raises(ValueError):
+            calculate_vent_target(
+                68.0, 72.0, 0.1, 30.0, "heating",
+                AlgorithmSettings(exp_const=3.0), table=exponential_table(),
+            )
+
+    def test_batch_rejects_mismatched_table(self):
+        with pytest.raises(ValueError):
+            calculate_targets_batch(
+                [68.0], [0.1], [True], "heating", 72.0, 30.0, "learned",
+                AlgorithmSettings(exp_const=3.0), table=exponential_table(),
+            )
+
+
 # ---------------------------------------------------------------------------
 # calculate_longest_time_to_target
 # ---------------------------------------------------------------------------
@@ -198,6 +327,57 @@ class TestAllVentTargets:
         assert targets["x"] == 0.0
 
 
+# ---------------------------------------------------------------------------
+# calculate_targets_batch
+# ---------------------------------------------------------------------------
+
+class TestTargetsBatch:
+    TEMPS = [60.0, 65.5, 68.0, 71.9, 72.0, 74.0, 80.0, None, 69.0, 70.0]
+    RATES = [0.05, 0.1, 0.0, 0.2, 0.1, 0.15, 0.01, 0.1, 1e-6, 0.3]
+    ACTIVE = [True, True, True, True, True, True, True, True, True, False]
+
+    @pytest.mark.parametrize("strategy", ["simple", "learned", "hybrid"])
+    @pytest.mark.parametrize("mode", ["heating", "cooling"])
+    def test_matches_scalar_functions(self, strategy, mode):
+        batch = calculate_targets_batch(
+            self.TEMPS, self.RATES, self.ACTIVE, mode, 72.0, 30.0, strategy
+        )
+        for temp, rate, active, got in zip(self.TEMPS, self.RATES, self.ACTIVE, batch):
+            if not active:
+                expected = 0.0
+            elif temp is None:
+                expected = 100.0
+            else:
+                lin = calculate_linear_target(temp, 72.0, rate, 30.0, mode)
+                exp = calculate_vent_target(temp, 72.0, rate, 30.0, mode)
+                expected = {"learned": exp, "hybrid": (exp + lin) / 2.0}.get(strategy, lin)
+            assert got == expected
+
+    def test_matches_dict_api(self):
+        rooms = [
+            {"key": str(i), "temp": t, "rate": r, "active": a}
+            for i, (t, r, a) in enumerate(zip(self.TEMPS, self.RATES, self.ACTIVE))
+        ]
+        targets = calculate_all_vent_targets(rooms, "heating", 72.0, 30.0, "hybrid")
+        batch = calculate_targets_batch(
+            self.TEMPS, self.RATES, self.ACTIVE, "heating", 72.0, 30.0, "hybrid"
+        )
+        assert list(targets.values()) == batch
+
+    def test_huge_ratio_saturates_instead_of_overflowing(self):
+        assert calculate_targets_batch(
+            [40.0], [1e-9], [True], "heating", 72.0, 1.0, "learned"
+        ) == [100.0]
+
+    # The exponent crosses _MAX_EXP_ARG between rates 0.10 and 0.11.
+    @pytest.mark.parametrize("rate", [1e-9, 0.10, 0.11, 1.0])
+    def test_large_ratios_match_scalar(self, rate):
+        batch = calculate_targets_batch(
+            [40.0], [rate], [True], "heating", 72.0, 1.0, "learned"
+        )
+        assert batch == [calculate_vent_target(40.0, 72.0, rate, 1.0, "heating")]
+
+
 # ---------------------------------------------------------------------------
 # adjust_for_minimum_airflow
 # ---------------------------------------------------------------------------
@@ -231,6 +411,228 @@ class TestMinimumAirflow:
         )
         assert result["a"] >= 10.0
 
+    def test_meets_minimum_exactly(self):
+        targets = {"a": 5.0, "b": 5.0, "c": 10.0}
+        rooms = [
+            {"key": "a", "temp": 66.0, "active": True},
+            {"key": "b", "temp": 68.0, "active": True},
+            {"key": "c", "temp": 70.0, "active": True},
+        ]
+        result = adjust_for_minimum_airflow(targets, rooms, "heating")
+        assert sum(result.values()) / 3 == pytest.approx(30.0)
+        # Coldest room gets the largest boost in heating
+        assert result["a"] - 5.0 > result["b"] - 5.0 > result["c"] - 10.0
+
+    def test_saturates_at_100(self):
+        targets = {"a": 98.0, "b": 0.0}
+        rooms = [
+            {"key": "a", "temp": 60.0, "active": True},
+            {"key": "b", "temp": 70.0, "active": True},
+        ]
+        settings = AlgorithmSettings(min_combined_vent_flow=80.0)
+        result = adjust_for_minimum_airflow(targets, rooms, "heating", settings=settings)
+        assert result["a"] == 100.0
+        assert result["b"] == pytest.approx(60.0)
+
+    def test_unreachable_minimum_opens_everything(self):
+        targets = {"a": 0.0, "b": 0.0}
+        rooms = [
+            {"key": "a", "temp": 60.0, "active": True},
+            {"key": "b", "temp": 70.0, "active": True},
+        ]
+        settings = AlgorithmSettings(min_combined_vent_flow=100.0)
+        result = adjust_for_minimum_airflow(
+            targets, rooms, "heating", conventional_vent_count=2, settings=settings
+        )
+        assert result == {"a": 100.0, "b": 100.0}
+
+    def test_order_independent(self):
+        rooms = [
+            {"key": k, "temp": t, "active": True}
+            for k, t in (("a", 74.0), ("b", 76.0), ("c", 79.0), ("d", 75.0))
+        ]
+        forward = adjust_for_minimum_airflow(
+            {r["key"]: 5.0 for r in rooms}, rooms, "cooling"
+        )
+        backward = adjust_for_minimum_airflow(
+            {r["key"]: 5.0 for r in rooms}, list(reversed(rooms)), "cooling"
+        )
+        assert forward == pytest.approx(backward)
+
+    def test_close_to_iterative_solver(self):
+        rooms = [
+            {"key": str(i), "temp": 64.0 + i * 0.7, "active": True}
+            for i in range(12)
+        ]
+        closed = adjust_for_minimum_airflow(
+            {r["key"]: 10.0 for r in rooms}, rooms, "heating"
+        )
+        iterative = adjust_for_minimum_airflow_iterative(
+            {r["key"]: 10.0 for r in rooms}, rooms, "heating"
+        )
+        increment = AlgorithmSettings().increment_pct
+        for key in closed:
+            assert closed[key] == pytest.approx(iterative[key], abs=increment)
+
+    def test_missing_temp_treated_as_70(self):
+        targets = {"a": 0.0, "b": 0.0}
+        rooms = [
+            {"key": "a", "temp": None, "active": True},
+            {"key": "b", "temp": 66.0, "active": True},
+        ]
+        result = adjust_for_minimum_airflow(targets, rooms, "heating")
+        assert result["b"] > result["a"] > 0.0
+
+
+# ---------------------------------------------------------------------------
+# solve_vent_plan
+# ---------------------------------------------------------------------------
+
+def _plan_rooms(temps):
+    return [{"key": k, "temp": t, "active": True} for k, t in temps.items()]
+
+
+class TestSolveVentPlan:
+    def test_unconstrained_rounds_to_nearest(self):
+        ideal = {"a": 47.0, "b": 83.0}
+        plan = solve_vent_plan(ideal, {}, _plan_rooms({"a": 68.0, "b": 70.0}), "heating", 5)
+        assert plan == {"a": 45, "b": 85}
+
+    def test_floors_are_rounded_up_to_grid(self):
+        ideal = {"a": 0.0, "b": 90.0}
+        plan = solve_vent_plan(
+            ideal, {"a": 22.0}, _plan_rooms({"a": 68.0, "b": 70.0}), "heating", 5
+        )
+        assert plan["a"] == 25
+
+    def test_rounding_cannot_break_minimum_airflow(self):
+        # Three rooms at 29.4% round down to 25% individually; the joint plan
+        # must still average at least the 30% minimum.
+        ideal = {"a": 29.4, "b": 29.4, "c": 29.4}
+        rooms = _plan_rooms({"a": 66.0, "b": 68.0, "c": 70.0})
+        plan = solve_vent_plan(ideal, {}, rooms, "heating", 5)
+        assert sum(plan.values()) / 3 >= 30.0
+        assert all(pos % 5 == 0 for pos in plan.values())
+        # The coldest room absorbs the extra flow in heating
+        assert plan["a"] >= plan["c"]
+
+    def test_all_constraints_satisfied(self):
+        ideal = {"a": 3.0, "b": 0.0, "c": 12.0, "d": 100.0}
+        floors = {"a": 20.0, "b": 60.0, "c": 20.0}
+        rooms = _plan_rooms({"a": 71.0, "b": 73.0, "c": 69.0, "d": 65.0})
+        settings = AlgorithmSettings(min_combined_vent_flow=55.0)
+        plan = solve_vent_plan(ideal, floors, rooms, "heating", 10, settings=settings)
+        for key, floor in floors.items():
+            assert plan[key] >= floor
+        assert sum(plan.values()) / 4 >= 55.0
+        assert all(pos % 10 == 0 for pos in plan.values())
+
+    def test_conventional_vents_count_toward_flow(self):
+        ideal = {"a": 10.0}
+        plan = solve_vent_plan(
+            ideal, {}, _plan_rooms({"a": 68.0}), "heating", 5, conventional_vent_count=5
+        )
+        assert plan == {"a": 10}
+
+    def test_exhausted_budget_still_feasible(self):
+        ideal = {str(i): 0.0 for i in range(50)}
+        rooms = _plan_rooms({str(i): 60.0 + i * 0.2 for i in range(50)})
+        plan = solve_vent_plan(ideal, {}, rooms, "heating", 1, time_budget=0.0)
+        assert sum(plan.values()) / 50 >= 30.0
+
+
+# ---------------------------------------------------------------------------
+# RoomBatch
+# ---------------------------------------------------------------------------
+
+_BATCH_ROOMS = [
+    {"key": "a", "temp": 66.0, "rate": 0.1, "active": True, "delta": 6.0,
+     "occupied": False, "priority": 5},
+    {"key": "b", "temp": 72.5, "rate": 0.2, "active": True, "delta": -0.5,
+     "occupied": True, "priority": 3},
+    {"key": "c", "temp": None, "rate": 0.0, "active": True, "delta": 0.0,
+     "occupied": False, "priority": 8},
+    {"key": "d", "temp": 70.0, "rate": 0.05, "active": False, "delta": -1.0,
+     "occupied": False, "priority": 5},
+]
+
+
+class TestRoomBatch:
+    def test_from_dicts_round_trip(self):
+        batch = RoomBatch.from_dicts(_BATCH_ROOMS)
+        assert len(batch) == 4
+        assert [batch.row(i) for i in range(4)] == _BATCH_ROOMS
+
+    def test_from_dicts_defaults(self):
+        batch = RoomBatch.from_dicts([{"key": "x"}])
+        assert batch.row(0) == {
+            "key": "x", "temp": None, "rate": 0.0, "active": True,
+            "delta": 0, "occupied": False, "priority": 5,
+        }
+
+    def test_slots_only(self):
+        with pytest.raises(AttributeError):
+            RoomBatch().extra = 1
+
+    def test_functions_accept_batch_and_dicts_alike(self):
+        batch = RoomBatch.from_dicts(_BATCH_ROOMS)
+        assert calculate_longest_time_to_target(batch, "heating", 72.0) == \
+            calculate_longest_time_to_target(_BATCH_ROOMS, "heating", 72.0)
+        assert calculate_all_vent_targets(batch, "heating", 72.0, 30.0, "hybrid") == \
+            calculate_all_vent_targets(_BATCH_ROOMS, "heating", 72.0, 30.0, "hybrid")
+        assert adjust_for_minimum_airflow({"a": 0.0, "b": 0.0, "c": 0.0}, batch, "heating") == \
+            adjust_for_minimum_airflow({"a": 0.0, "b": 0.0, "c": 0.0}, _BATCH_ROOMS, "heating")
+        assert select_relief_rooms(batch, ["a"], "heat", "heating") == \
+            select_relief_rooms(_BATCH_ROOMS, ["a"], "heat", "heating")
+
+
+# ---------------------------------------------------------------------------
+# select_relief_rooms
+# ---------------------------------------------------------------------------
+
+def _sorted_relief(rooms, selected, hvac_mode, hvac_action, max_relief=3):
+    """Reference: score every candidate and sort, as the original did."""
+    active = hvac_action if hvac_action in ("heating", "cooling") else hvac_mode
+    scored = []
+    for room in rooms:
+        if room["key"] in selected:
+            continue
+        delta = room.get("delta", 0.0)
+        if active in ("heat", "heating") and delta > 0:
+            continue
+        if active in ("cool", "cooling") and delta < 0:
+            continue
+        score = (10000 if room.get("occupied") else 0) \
+            + room.get("priority", 5) * 100.0 - abs(delta)
+        scored.append((score, room))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [room for _, room in scored[:max_relief]]
+
+
+class TestSelectReliefRooms:
+    def test_matches_full_sort(self):
+        rooms = [
+            {"key": f"r{i}", "delta": ((i * 7) % 11 - 5) / 2.0,
+             "occupied": i % 4 == 0, "priority": i % 10}
+            for i in range(60)
+        ]
+        for mode, action in (("heat", "heating"), ("cool", "cooling"), ("heat", "idle")):
+            for k in (0, 1, 3, 10, 100):
+                assert select_relief_rooms(rooms, ["r0", "r5"], mode, action, k) == \
+                    _sorted_relief(rooms, {"r0", "r5"}, mode, action, k)
+
+    def test_ties_keep_input_order(self):
+        rooms = [{"key": k, "delta": 0.0} for k in ("c", "a", "b")]
+        picked = select_relief_rooms(rooms, [], "heat", "heating", 2)
+        assert [r["key"] for r in picked] == ["c", "a"]
+
+    def test_skips_rooms_still_needing_conditioning(self):
+        rooms = [
+            {"key": "cold", "delta": 2.0, "priority": 10},
+            {"key": "ok", "delta": 0.0},
+        ]
+        assert [r["key"] for r in select_relief_rooms(rooms, [], "heat", "heating")] == ["ok"]
+
 
 # ---------------------------------------------------------------------------
 # compute_simple_targets
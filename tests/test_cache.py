@@ -0,0 +1,329 @@
+"""Tests for the event-invalidated state caches."""
+import asyncio
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smart_vent_controller.cache import (
+    EntityStateCache,
+    RoomDataCache,
+    ServiceCallBatcher,
+    TimedCache,
+)
+from custom_components.smart_vent_controller.const import DOMAIN
+from custom_components.smart_vent_controller.coordinator import (
+    SmartVentControllerCoordinator,
+)
+from custom_components.smart_vent_controller.ratelimit import AdaptiveRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTimedCache:
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = TimedCache(ttl_seconds=5, clock=clock)
+        cache.set("a", 1)
+        clock.now += 4.9
+        assert cache.get("a") == 1
+        clock.now += 0.2
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_expired_entries_are_evicted_without_being_read(self):
+        clock = FakeClock()
+        cache = TimedCache(ttl_seconds=5, clock=clock)
+        for i in range(100):
+            cache.set(f"cover.vent_{i}", i)
+        clock.now += 6
+        cache.set("cover.new", 0)
+        assert len(cache) == 1
+        assert cache.stats()["expirations"] == 100
+
+    def test_overwrite_restarts_ttl(self):
+        clock = FakeClock()
+        cache = TimedCache(ttl_seconds=5, clock=clock)
+        cache.set("a", 1)
+        clock.now += 3
+        cache.set("a", 2)
+        clock.now += 3
+        assert cache.get("a") == 2
+        assert cache.stats()["expirations"] == 0
+
+    def test_lru_capacity(self):
+        cache = TimedCache(ttl_seconds=None, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_heap_stays_bounded_under_rewrites(self):
+        clock = FakeClock()
+        cache = TimedCache(ttl_seconds=60, clock=clock)
+        for i in range(10_000):
+            cache.set(f"cover.vent_{i % 10}", i)
+        assert len(cache) == 10
+        assert len(cache._expiry) <= 2 * len(cache) + 17
+
+    def test_no_ttl_keeps_entries_until_invalidated(self):
+        cache = TimedCache(ttl_seconds=None)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        cache.invalidate("a")
+        assert cache.get("a") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+
+async def test_entity_cache_reads_through_once(hass):
+    hass.states.async_set("sensor.a", "1")
+    cache = EntityStateCache(ttl_seconds=None)
+
+    assert cache.get(hass, "sensor.a").state == "1"
+    hass.states.async_set("sensor.a", "2")
+    assert cache.get(hass, "sensor.a").state == "1"
+    cache.invalidate("sensor.a")
+    assert cache.get(hass, "sensor.a").state == "2"
+
+    # Missing entities are cached as well.
+    assert cache.get(hass, "sensor.missing") is None
+    assert cache.get(hass, "sensor.missing") is None
+    assert cache.stats() == {
+        "size": 2, "hits": 2, "misses": 3,
+        "expirations": 0, "evictions": 0, "invalidations": 1,
+    }
+
+
+def test_room_cache_counts_hits_and_misses():
+    cache = RoomDataCache(ttl_seconds=None)
+    assert cache.get_room_data("den") is None
+    cache.set_room_data("den", {"temp": 70.0})
+    assert cache.get_room_data("den") == {"temp": 70.0}
+    cache.invalidate_room("den")
+    assert cache.get_room_data("den") is None
+    assert cache.stats() == {
+        "size": 0, "hits": 1, "misses": 2,
+        "expirations": 0, "evictions": 0, "invalidations": 1,
+    }
+
+
+async def _coordinator(hass):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "main_thermostat": "climate.main",
+            "rooms": [
+                {"name": "Den", "temp_sensor": "sensor.den", "vent_entities": ["cover.den"]}
+            ],
+        },
+        options={},
+    )
+    entry.add_to_hass(hass)
+    coordinator = SmartVentControllerCoordinator(hass, entry)
+    await coordinator.async_initialize()
+    return coordinator
+
+
+async def test_tracked_state_reads_are_cache_hits_until_changed(hass):
+    hass.states.async_set("climate.main", "heat", {"hvac_action": "heating"})
+    coordinator = await _coordinator(hass)
+
+    for _ in range(5):
+        assert coordinator.get_state("climate.main").state == "heat"
+    assert coordinator.entity_cache.stats()["misses"] == 1
+    assert coordinator.entity_cache.stats()["hits"] == 4
+
+    hass.states.async_set("climate.main", "cool", {"hvac_action": "cooling"})
+    await hass.async_block_till_done()
+    assert coordinator.get_state("climate.main").state == "cool"
+    assert coordinator.entity_cache.stats()["misses"] == 2
+
+    # Untracked entities bypass the cache.
+    hass.states.async_set("sensor.other", "1")
+    assert coordinator.get_state("sensor.other").state == "1"
+    assert coordinator.entity_cache.stats()["misses"] == 2
+    coordinator.async_stop_tracking()
+
+
+async def test_unchanged_rooms_are_served_from_the_room_cache(hass):
+    hass.states.async_set("climate.main", "heat")
+    hass.states.async_set("sensor.den", "68.0")
+    coordinator = await _coordinator(hass)
+
+    await coordinator._async_update_data()
+    await coordinator._async_update_data()
+    stats = coordinator.state_index_stats()["room_cache"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+    hass.states.async_set("cover.den", "open", {"current_position": 50})
+    await hass.async_block_till_done()
+    data = await coordinator._async_update_data()
+    assert data["den_vent_avg"] == 50.0
+    assert coordinator.state_index_stats()["room_cache"]["misses"] == 2
+    coordinator.async_stop_tracking()
+
+
+def _register_slow_service(hass, fail=()):
+    """Register test.move, which records peak concurrency and can fail."""
+    seen = {"in_flight": 0, "peak": 0, "calls": []}
+
+    async def handle(call):
+        seen["in_flight"] += 1
+        seen["peak"] = max(seen["peak"], seen["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+            if call.data["entity_id"] in fail:
+                raise RuntimeError("vent offline")
+            seen["calls"].append(call.data["entity_id"])
+        finally:
+            seen["in_flight"] -= 1
+
+    hass.services.async_register("test", "move", handle)
+    return seen
+
+
+async def test_batcher_bounds_concurrency(hass):
+    seen = _register_slow_service(hass)
+
+    async with ServiceCallBatcher(hass, batch_size=None, max_concurrency=4) as batcher:
+        for i in range(12):
+            await batcher.add_call("test", "move", {"entity_id": f"cover.v{i}"})
+
+    assert seen["peak"] == 4
+    assert len(seen["calls"]) == 12
+    assert [o.service_data["entity_id"] for o in batcher.outcomes] == [
+        f"cover.v{i}" for i in range(12)
+    ]
+    assert all(o.success and o.latency > 0 for o in batcher.outcomes)
+    assert batcher.stats()["calls"] == 12
+
+
+async def test_batcher_sequential_mode(hass):
+    seen = _register_slow_service(hass)
+
+    async with ServiceCallBatcher(hass, batch_size=3) as batcher:
+        for i in range(5):
+            await batcher.add_call("test", "move", {"entity_id": f"cover.v{i}"})
+
+    assert seen["peak"] == 1
+    assert seen["calls"] == [f"cover.v{i}" for i in range(5)]
+
+
+async def test_batcher_failure_does_not_abort_batch(hass):
+    seen = _register_slow_service(hass, fail={"cover.v1"})
+
+    async with ServiceCallBatcher(hass, batch_size=None, max_concurrency=2) as batcher:
+        for i in range(4):
+            await batcher.add_call("test", "move", {"entity_id": f"cover.v{i}"})
+
+    assert sorted(seen["calls"]) == ["cover.v0", "cover.v2", "cover.v3"]
+    assert len(batcher.failures) == 1
+    failure = batcher.failures[0]
+    assert failure.service_data["entity_id"] == "cover.v1"
+    assert isinstance(failure.error, RuntimeError)
+    assert batcher.stats()["failures"] == 1
+
+
+async def test_hung_call_times_out_as_a_failure(hass):
+    async def handle(call):
+        if call.data["entity_id"] == "cover.hung":
+            await asyncio.sleep(10)
+
+    hass.services.async_register("test", "move", handle)
+
+    async with ServiceCallBatcher(
+        hass, batch_size=None, max_concurrency=2, call_timeout=0.05
+    ) as batcher:
+        for entity_id in ("cover.hung", "cover.ok"):
+            await batcher.add_call("test", "move", {"entity_id": entity_id})
+
+    assert batcher.succeeded_entities() == ["cover.ok"]
+    assert isinstance(batcher.failures[0].error, TimeoutError)
+    assert batcher.stats()["timeouts"] == 1
+
+
+async def test_handler_error_fails_the_outcome_without_a_limiter(hass):
+    async def handle(call):
+        raise RuntimeError("vent offline")
+
+    hass.services.async_register("test", "move", handle)
+
+    async with ServiceCallBatcher(hass, batch_size=None) as batcher:
+        await batcher.add_call("test", "move", {"entity_id": "cover.a"})
+
+    assert batcher.succeeded_entities() == []
+    assert isinstance(batcher.failures[0].error, RuntimeError)
+
+
+async def test_batcher_coalesces_identical_service_data(hass):
+    seen = []
+
+    async def handle(call):
+        seen.append((list(call.data["entity_id"]), call.data["position"]))
+
+    hass.services.async_register("test", "move", handle)
+
+    async with ServiceCallBatcher(hass, batch_size=None, coalesce=True) as batcher:
+        await batcher.add_call("test", "move", {"entity_id": "cover.a", "position": 20})
+        await batcher.add_call("test", "move", {"entity_id": "cover.b", "position": 60})
+        await batcher.add_call("test", "move", {"entity_id": "cover.c", "position": 20})
+        await batcher.add_call("test", "move", {"entity_id": "cover.a", "position": 20})
+
+    assert seen == [(["cover.a", "cover.c"], 20), (["cover.b"], 60)]
+    assert batcher.succeeded_entities() == ["cover.a", "cover.c", "cover.b"]
+    assert batcher.stats()["requested"] == 4
+    assert batcher.stats()["calls"] == 2
+
+
+async def test_coalesced_failure_marks_every_entity(hass):
+    async def handle(call):
+        if call.data["position"] == 20:
+            raise RuntimeError("bus error")
+
+    hass.services.async_register("test", "move", handle)
+
+    async with ServiceCallBatcher(hass, batch_size=None, coalesce=True) as batcher:
+        for entity_id, position in (("cover.a", 20), ("cover.b", 60), ("cover.c", 20)):
+            await batcher.add_call(
+                "test", "move", {"entity_id": entity_id, "position": position}
+            )
+
+    assert batcher.succeeded_entities() == ["cover.b"]
+    assert batcher.failures[0].entity_ids == ["cover.a", "cover.c"]
+
+
+async def test_rate_limited_coalesced_calls_are_split_into_bursts(hass):
+    seen = []
+
+    async def handle(call):
+        seen.append(list(call.data["entity_id"]))
+
+    hass.services.async_register("test", "move", handle)
+
+    async def no_sleep(seconds):
+        return None
+
+    limiter = AdaptiveRateLimiter(
+        10.0, burst=2, platform_of=lambda entity_id: entity_id[-1], sleep=no_sleep
+    )
+    async with ServiceCallBatcher(
+        hass, batch_size=None, coalesce=True, rate_limiter=limiter
+    ) as batcher:
+        for entity_id in ("cover.a1", "cover.b2", "cover.c1", "cover.d1"):
+            await batcher.add_call(
+                "test", "move", {"entity_id": entity_id, "position": 20}
+            )
+
+    assert sorted(seen) == [["cover.a1", "cover.c1"], ["cover.b2"], ["cover.d1"]]
+    assert batcher.stats()["calls"] == 3
+    assert limiter.stats()["platforms"]["1"]["commands"] == 3
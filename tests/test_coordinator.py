@@ -1,14 +1,23 @@
 """Coordinator behavioral tests."""
 import pytest
 from datetime import timedelta
+from unittest.mock import patch
 
 from freezegun import freeze_time
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.exceptions import ConfigEntryNotReady
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.smart_vent_controller.const import DOMAIN
 from custom_components.smart_vent_controller.coordinator import (
     SmartVentControllerCoordinator,
 )
+from custom_components.smart_vent_controller.samples import (
+    ACCEPTED,
+    REJECTED,
+    EfficiencySample,
+    EfficiencySampleStore,
+)
 
 
 def _make_entry(rooms):
@@ -162,3 +171,248 @@ async def test_efficiency_export_import_roundtrip_via_services(hass, tmp_path):
     )
 
     assert coordinator.store.get_heating_rate("office") == pytest.approx(0.0123)
+
+
+async def test_topology_recompiles_when_rooms_change(hass):
+    rooms = [{"name": "Den", "temp_sensor": "sensor.den", "vent_entities": []}]
+    entry = _make_entry(rooms)
+    entry.add_to_hass(hass)
+    coordinator = SmartVentControllerCoordinator(hass, entry)
+    await coordinator.async_initialize()
+    topology = coordinator.topology
+    assert coordinator.topology is topology
+
+    hass.config_entries.async_update_entry(
+        entry,
+        data={
+            "main_thermostat": "climate.main",
+            "rooms": rooms + [
+                {"name": "Office", "temp_sensor": "sensor.office", "vent_entities": []}
+            ],
+        },
+    )
+    assert coordinator.topology is not topology
+    assert coordinator.topology.keys == ("den", "office")
+
+    # The new room's entities are tracked.
+    await coordinator._async_update_data()
+    hass.states.async_set("sensor.office", "71.0")
+    await hass.async_block_till_done()
+    data = await coordinator._async_update_data()
+    assert data["office_temp"] == 71.0
+    assert coordinator.changed_rooms == {"office"}
+    coordinator.async_stop_tracking()
+
+
+async def test_entry_update_drops_cached_plans(hass):
+    entry = _make_entry([{"name": "Den", "vent_entities": ["cover.den"]}])
+    entry.add_to_hass(hass)
+    coordinator = SmartVentControllerCoordinator(hass, entry)
+    await coordinator.async_initialize()
+    coordinator.planner.store_plan("signature", {"den": 40})
+
+    coordinator.async_entry_updated()
+
+    assert coordinator.planner.cached_plan("signature") is None
+    assert coordinator.planner.stats()["plan_misses"] == 1
+
+
+async def test_entry_update_applies_vent_rate_limit_options(hass):
+    entry = _make_entry([{"name": "Den", "vent_entities": ["cover.den"]}])
+    entry.add_to_hass(hass)
+    coordinator = SmartVentControllerCoordinator(hass, entry)
+    await coordinator.async_initialize()
+    limiter = coordinator.rate_limiter
+    assert limiter.max_rate == 10
+
+    hass.config_entries.async_update_entry(
+        entry,
+        options={
+            "vent_rate_limit": 4,
+            "vent_rate_adaptive": False,
+            "vent_rate_target_latency_ms": 1000,
+        },
+    )
+    coordinator.async_entry_updated()
+
+    assert coordinator.rate_limiter is limiter
+    stats = limiter.stats()
+    assert stats["max_rate"] == 4
+    assert stats["adaptive"] is False
+    assert stats["target_latency_ms"] == 1000
+    coordinator.async_stop_tracking()
+
+
+async def test_removed_room_data_is_collected_on_entry_update_not_on_read(hass):
+    rooms = [
+        {"name": "Den", "vent_entities": ["cover.den"]},
+        {"name": "Office", "vent_entities": ["cover.office"]},
+    ]
+    entry = _make_entry(rooms)
+    entry.add_to_hass(hass)
+    coordinator = SmartVentControllerCoordinator(hass, entry)
+    await coordinator.async_initialize()
+    coordinator.store.set_heating_rate("office", 0.2)
+
+    hass.config_entries.async_update_entry(
+        entry, data={"main_thermostat": "climate.main", "rooms": rooms[:1]}
+    )
+    assert coordinator.topology.keys == ("den",)
+    assert coordinator.store.get_heating_rate("office") == 0.2
+
+    coordinator.async_entry_updated()
+
+    assert coordinator.store.get_heating_rate("office") == 0
+
+
+async def test_cycle_end_records_raw_efficiency_samples(hass, tmp_path):
+    hass.config.config_dir = str(tmp_path)
+    rooms = [
+        {"name": "Den", "temp_sensor": "sensor.den", "vent_entities": []},
+        {"name": "Office", "temp_sensor": "sensor.office", "vent_entities": []},
+    ]
+    entry = _make_entry(rooms)
+    entry.add_to_hass(hass)
+    coordinator = SmartVentControllerCoordinator(hass, entry)
+    await coordinator.async_initialize()
+    hass.states.async_set("sensor.den", "70.0")
+    hass.states.async_set("sensor.office", "68.1")
+    coordinator.refresh_snapshot(full=True)
+    for key in ("den", "office"):
+        coordinator.store.set_cycle_start_temp(key, 68.0)
+        coordinator.store.set_cycle_avg_aperture(key, 50.0)
+
+    await coordinator._learn_efficiency(30.0, "heating")
+
+    den = await hass.async_add_executor_job(coordinator.samples.samples, "den", "heat")
+    assert len(den) == 1
+    assert den[0].outcome == ACCEPTED
+    assert den[0].rate == pytest.approx(coordinator.store.get_heating_rate("den"))
+    office = await hass.async_add_executor_job(
+        coordinator.samples.samples, "office", "heat"
+    )
+    # Too small a change to learn from, but still kept as an observation.
+    assert office[0].outcome == REJECTED
+    assert office[0].rate is None
+    assert coordinator.store.get_heating_rate("office") == 0
+    assert (tmp_path / ".storage" / f"{DOMAIN}.{entry.entry_id}.samples").exists()
+    await hass.async_add_executor_job(coordinator.samples.close)
+    coordinator.async_stop_tracking()
+
+
+async def test_entry_update_releases_sample_rings_of_removed_rooms(hass, tmp_path):
+    hass.config.config_dir = str(tmp_path)
+    rooms = [
+        {"name": "Den", "vent_entities": []},
+        {"name": "Office", "vent_entities": []},
+    ]
+    entry = _make_entry(rooms)
+    entry.add_to_hass(hass)
+    coordinator = SmartVentControllerCoordinator(hass, entry)
+    await coordinator.async_initialize()
+    sample = EfficiencySample(1.0, 68.0, 70.0, 30.0, 50.0, 0.05, ACCEPTED)
+    await hass.async_add_executor_job(
+        coordinator.samples.extend,
+        [("den", "heat", sample), ("office", "heat", sample)],
+    )
+
+    hass.config_entries.async_update_entry(
+        entry, data={"main_thermostat": "climate.main", "rooms": rooms[:1]}
+    )
+    coordinator.async_entry_updated()
+    await hass.async_block_till_done()
+
+    rings = await hass.async_add_executor_job(coordinator.samples.rings)
+    assert rings == [("den", "heat")]
+    await hass.async_add_executor_job(coordinator.samples.close)
+    coordinator.async_stop_tracking()
+
+
+async def test_sample_file_is_not_opened_until_rooms_change(hass, tmp_path):
+    hass.config.config_dir = str(tmp_path)
+    rooms = [
+        {"name": "Den", "vent_entities": []},
+        {"name": "Office", "vent_entities": []},
+    ]
+    entry = _make_entry(rooms)
+    entry.add_to_hass(hass)
+    coordinator = SmartVentControllerCoordinator(hass, entry)
+    sample = EfficiencySample(1.0, 68.0, 70.0, 30.0, 50.0, 0.05, ACCEPTED)
+    await hass.async_add_executor_job(
+        coordinator.samples.extend, [("office", "heat", sample)]
+    )
+    await hass.async_add_executor_job(coordinator.samples.close)
+
+    await coordinator.async_initialize()
+    hass.config_entries.async_update_entry(entry, options={"vent_rate_limit": 4})
+    coordinator.async_entry_updated()
+    await hass.async_block_till_done()
+
+    assert coordinator.samples._fd is None
+
+    hass.config_entries.async_update_entry(
+        entry, data={"main_thermostat": "climate.main", "rooms": rooms[:1]}
+    )
+    coordinator.async_entry_updated()
+    await hass.async_block_till_done()
+
+    assert coordinator.samples._fd is not None
+    assert await hass.async_add_executor_job(coordinator.samples.rings) == []
+    await hass.async_add_executor_job(coordinator.samples.close)
+
+
+async def test_failed_setup_releases_tracking_and_samples(hass, tmp_path):
+    hass.config.config_dir = str(tmp_path)
+    entry = _make_entry(
+        [{"name": "Den", "temp_sensor": "sensor.den", "vent_entities": []}]
+    )
+    entry.add_to_hass(hass)
+    coordinators = []
+
+    async def first_refresh(self):
+        coordinators.append(self)
+        assert self._unsub_state_events is not None
+        raise ConfigEntryNotReady
+
+    with patch.object(
+        SmartVentControllerCoordinator, "async_config_entry_first_refresh", first_refresh
+    ), patch.object(EfficiencySampleStore, "close", autospec=True) as close:
+        assert not await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+    (coordinator,) = coordinators
+    assert coordinator._unsub_state_events is None
+    close.assert_called_once_with(coordinator.samples)
+
+
+async def test_store_journal_change_reloads_the_entry(hass):
+    from custom_components.smart_vent_controller import _async_entry_updated
+
+    entry = _make_entry([{"name": "Den", "vent_entities": []}])
+    entry.add_to_hass(hass)
+
+    async def set_up():
+        coordinator = SmartVentControllerCoordinator(hass, entry)
+        await coordinator.async_initialize()
+        hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+        return coordinator
+
+    assert not (await set_up()).store.journal
+    with patch.object(hass.config_entries, "async_reload") as reload:
+        hass.config_entries.async_update_entry(entry, options={"store_journal": True})
+        await _async_entry_updated(hass, entry)
+        reload.assert_called_once_with(entry.entry_id)
+
+        # After the reload the store journals; other option changes keep it.
+        reload.reset_mock()
+        assert (await set_up()).store.journal
+        hass.config_entries.async_update_entry(
+            entry, options={"store_journal": True, "vent_rate_limit": 4}
+        )
+        await _async_entry_updated(hass, entry)
+        reload.assert_not_called()
+
+        hass.config_entries.async_update_entry(entry, options={"store_journal": False})
+        await _async_entry_updated(hass, entry)
+        reload.assert_called_once_with(entry.entry_id)
@@ -0,0 +1,145 @@
+"""Tests for the incremental target planner and relief index."""
+from custom_components.smart_vent_controller.algorithm import (
+    RoomBatch,
+    calculate_all_vent_targets,
+    select_relief_rooms,
+)
+from custom_components.smart_vent_controller.planner import (
+    IncrementalTargetPlanner,
+    ReliefCandidateIndex,
+)
+
+
+def _batch(temps):
+    batch = RoomBatch()
+    for i, temp in enumerate(temps):
+        batch.append(f"room_{i}", temp, 0.1)
+    return batch
+
+
+class TestIncrementalTargets:
+    def test_first_run_is_full_pass(self):
+        planner = IncrementalTargetPlanner()
+        batch = _batch([66.0, 68.0, 70.0])
+        targets = planner.targets(batch, "heating", 72.0, 30.0, "hybrid")
+        assert targets == calculate_all_vent_targets(batch, "heating", 72.0, 30.0, "hybrid")
+        assert planner.full_passes == 1
+        assert planner.rooms_recomputed == 3
+
+    def test_single_room_change_recomputes_one_room(self):
+        planner = IncrementalTargetPlanner()
+        planner.targets(_batch([66.0, 68.0, 70.0]), "heating", 72.0, 30.0, "learned")
+
+        changed = _batch([66.0, 69.0, 70.0])
+        targets = planner.targets(changed, "heating", 72.0, 30.0, "learned")
+
+        assert targets == calculate_all_vent_targets(changed, "heating", 72.0, 30.0, "learned")
+        assert planner.full_passes == 1
+        assert planner.incremental_passes == 1
+        assert planner.rooms_recomputed == 4
+
+    def test_unchanged_inputs_recompute_nothing(self):
+        planner = IncrementalTargetPlanner()
+        batch = _batch([66.0, 68.0])
+        planner.targets(batch, "heating", 72.0, 30.0, "simple")
+        planner.targets(batch, "heating", 72.0, 30.0, "simple")
+        assert planner.rooms_recomputed == 2
+
+    def test_global_change_forces_full_pass(self):
+        planner = IncrementalTargetPlanner()
+        batch = _batch([66.0, 68.0])
+        planner.targets(batch, "heating", 72.0, 30.0, "simple")
+        planner.targets(batch, "heating", 72.0, 25.0, "simple")
+        planner.targets(batch, "heating", 73.0, 25.0, "simple")
+        assert planner.full_passes == 3
+
+    def test_room_set_change_forces_full_pass(self):
+        planner = IncrementalTargetPlanner()
+        planner.targets(_batch([66.0, 68.0]), "heating", 72.0, 30.0, "simple")
+        planner.targets(_batch([66.0, 68.0, 70.0]), "heating", 72.0, 30.0, "simple")
+        assert planner.full_passes == 2
+
+    def test_returned_dict_is_a_copy(self):
+        planner = IncrementalTargetPlanner()
+        batch = _batch([66.0])
+        planner.targets(batch, "heating", 72.0, 30.0, "simple")["room_0"] = -1.0
+        assert planner.targets(batch, "heating", 72.0, 30.0, "simple")["room_0"] >= 0.0
+
+
+class TestPlanCache:
+    def test_hit_and_miss(self):
+        planner = IncrementalTargetPlanner()
+        assert planner.cached_plan(("a", 1)) is None
+        planner.store_plan(("a", 1), {"x": 40})
+        assert planner.cached_plan(("a", 1)) == {"x": 40}
+        assert planner.cached_plan(("a", 2)) is None
+        assert planner.stats()["plan_hits"] == 1
+        assert planner.stats()["plan_misses"] == 2
+
+    def test_invalidate(self):
+        planner = IncrementalTargetPlanner()
+        batch = _batch([66.0])
+        planner.targets(batch, "heating", 72.0, 30.0, "simple")
+        planner.store_plan("sig", {"room_0": 20})
+        planner.invalidate()
+        assert planner.cached_plan("sig") is None
+        planner.targets(batch, "heating", 72.0, 30.0, "simple")
+        assert planner.full_passes == 2
+
+
+def _relief_batch(rooms):
+    batch = RoomBatch()
+    for key, delta, occupied, priority in rooms:
+        batch.append(key, 70.0, delta=delta, occupied=occupied, priority=priority)
+    return batch
+
+
+_RELIEF_ROOMS = [
+    ("a", 1.0, False, 5),
+    ("b", -1.0, True, 5),
+    ("c", 0.2, False, 8),
+    ("d", 2.0, False, 5),
+    ("e", 0.0, False, 5),
+]
+
+
+class TestReliefCandidateIndex:
+    def test_matches_select_relief_rooms(self):
+        batch = _relief_batch(_RELIEF_ROOMS)
+        index = ReliefCandidateIndex()
+        index.update(batch)
+        for mode, action in (("heat", "heating"), ("cool", "cooling"), ("auto", "idle")):
+            for k in (1, 2, 3, 5):
+                expected = [
+                    r["key"]
+                    for r in select_relief_rooms(batch, ["c"], mode, action, k)
+                ]
+                assert index.select(["c"], mode, action, k) == expected
+
+    def test_rescores_only_changed_rooms(self):
+        index = ReliefCandidateIndex()
+        index.update(_relief_batch(_RELIEF_ROOMS))
+        assert index.rescored == 5
+        index.update(_relief_batch(_RELIEF_ROOMS))
+        assert index.rescored == 5
+
+        changed = list(_RELIEF_ROOMS)
+        changed[3] = ("d", 2.0, True, 5)
+        index.update(_relief_batch(changed))
+        assert index.rescored == 6
+        assert index.select([], "cool", "cooling", 1) == ["d"]
+        assert index.stats() == {"rooms": 5, "rescored": 6}
+
+    def test_removed_rooms_drop_out(self):
+        index = ReliefCandidateIndex()
+        index.update(_relief_batch(_RELIEF_ROOMS))
+        index.update(_relief_batch(_RELIEF_ROOMS[2:]))
+        assert "a" not in index.select([], "heat", "heating", 5)
+        assert "b" not in index.select([], "heat", "heating", 5)
+
+    def test_tie_order_follows_room_order(self):
+        index = ReliefCandidateIndex()
+        index.update(_relief_batch([("x", 0.0, False, 5), ("y", 0.0, False, 5)]))
+        assert index.select([], "heat", "heating", 2) == ["x", "y"]
+        index.update(_relief_batch([("y", 0.0, False, 5), ("x", 0.0, False, 5)]))
+        assert index.select([], "heat", "heating", 2) == ["y", "x"]
@@ -0,0 +1,140 @@
+"""Tests for the adaptive per-platform vent command rate limiter."""
+from custom_components.smart_vent_controller.ratelimit import (
+    AdaptiveRateLimiter,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _limiter(clock, **kwargs):
+    kwargs.setdefault("platform_of", lambda entity_id: entity_id.split("_", 1)[0])
+    return AdaptiveRateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class TestTokenBucket:
+    def test_burst_then_paced(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.5
+        assert bucket.reserve() == 1.0
+
+    def test_refill_is_capped_at_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=3, clock=clock)
+        bucket.reserve(3)
+
+        clock.now += 60
+        assert bucket.reserve(3) == 0.0
+        assert bucket.reserve() == 1.0
+
+
+async def test_platforms_have_separate_buckets():
+    clock = FakeClock()
+    limiter = _limiter(clock, max_rate=1.0, burst=1)
+
+    assert await limiter.acquire(["cover.zha_a"]) == 0.0
+    assert await limiter.acquire(["cover.zwave_a"]) == 0.0
+    assert await limiter.acquire(["cover.zha_b"]) == 1.0
+    assert clock.slept == [1.0]
+    stats = limiter.stats()["platforms"]
+    assert stats["cover.zha"]["commands"] == 2
+    assert stats["cover.zwave"]["commands"] == 1
+
+
+async def test_multi_entity_call_takes_one_token_per_entity():
+    clock = FakeClock()
+    limiter = _limiter(clock, max_rate=2.0, burst=2)
+
+    waited = await limiter.acquire(["cover.zha_a", "cover.zha_b", "cover.zha_c"])
+
+    assert waited == 0.5
+
+
+def test_slow_commands_halve_the_rate_and_fast_ones_restore_it():
+    clock = FakeClock()
+    limiter = _limiter(clock, max_rate=8.0, min_rate=1.0, target_latency=1.0)
+    vent = ["cover.zha_a"]
+
+    limiter.observe(vent, latency=2.5)
+    assert limiter.bucket("cover.zha").rate == 4.0
+    limiter.observe(vent, latency=0.1, success=False)
+    assert limiter.bucket("cover.zha").rate == 2.0
+    for _ in range(4):
+        limiter.observe(vent, latency=2.5)
+    assert limiter.bucket("cover.zha").rate == 1.0
+
+    for _ in range(20):
+        limiter.observe(vent, latency=0.2)
+    assert limiter.bucket("cover.zha").rate == 8.0
+    stats = limiter.stats()["platforms"]["cover.zha"]
+    assert stats["slow"] == 6
+    assert stats["decreases"] == 3
+
+
+def test_fixed_rate_when_not_adaptive():
+    clock = FakeClock()
+    limiter = _limiter(clock, max_rate=8.0, adaptive=False)
+
+    limiter.observe(["cover.zha_a"], latency=30.0, success=False)
+
+    assert limiter.bucket("cover.zha").rate == 8.0
+
+
+def test_platform_lookup_is_remembered_until_forgotten():
+    lookups = []
+
+    def platform_of(entity_id):
+        lookups.append(entity_id)
+        return "zha"
+
+    limiter = AdaptiveRateLimiter(5.0, platform_of=platform_of)
+    limiter.platform("cover.a")
+    limiter.platform("cover.a")
+    limiter.forget_platforms()
+    limiter.platform("cover.a")
+
+    assert lookups == ["cover.a", "cover.a"]
+
+
+def test_split_groups_by_platform_in_bursts():
+    limiter = _limiter(FakeClock(), max_rate=10.0, burst=2)
+
+    chunks = limiter.split(
+        ["cover.zha_a", "cover.zwave_a", "cover.zha_b", "cover.zha_c"]
+    )
+
+    assert chunks == [["cover.zha_a", "cover.zha_b"], ["cover.zha_c"], ["cover.zwave_a"]]
+
+
+def test_configure_keeps_learned_rates_within_the_new_limit():
+    clock = FakeClock()
+    limiter = _limiter(clock, max_rate=8.0, min_rate=1.0, target_latency=1.0)
+    vent = ["cover.zha_a"]
+    limiter.observe(vent, latency=2.5)
+    limiter.observe(["cover.zwave_a"], latency=0.1)
+
+    limiter.configure(6.0, target_latency=0.5, adaptive=True)
+    assert limiter.bucket("cover.zha").rate == 4.0
+    assert limiter.bucket("cover.zwave").rate == 6.0
+    assert limiter.bucket("cover.zwave").burst == 6.0
+    assert limiter.stats()["target_latency_ms"] == 500
+
+    limiter.configure(10.0, target_latency=0.5, adaptive=False)
+    assert limiter.bucket("cover.zha").rate == 10.0
+    limiter.observe(vent, latency=30.0, success=False)
+    assert limiter.bucket("cover.zha").rate == 10.0
@@ -0,0 +1,150 @@
+"""Tests for the binary efficiency sample history."""
+import os
+
+import pytest
+
+from custom_components.smart_vent_controller.samples import (
+    ACCEPTED,
+    HEADER,
+    REJECTED,
+    RECORD,
+    RING_HEADER,
+    EfficiencySample,
+    EfficiencySampleStore,
+    sample_mode,
+)
+
+
+def _sample(ts, rate=0.05, outcome=ACCEPTED):
+    return EfficiencySample(ts, 68.0, 70.5, 30.0, 60.0, rate, outcome)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "entry.samples")
+
+
+def test_nothing_is_created_until_the_first_sample(path, tmp_path):
+    store = EfficiencySampleStore(path)
+
+    assert store.samples("den", "heat") == []
+    assert store.summary() == {}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_samples_round_trip_per_room_and_mode(path):
+    store = EfficiencySampleStore(path, capacity=4)
+    store.append("den", "heat", _sample(1.0))
+    store.append("den", "cool", _sample(2.0, rate=None, outcome=REJECTED))
+    store.append("den", "heat", _sample(3.0, rate=0.07))
+
+    heat = store.samples("den", "heat")
+    assert [s.timestamp for s in heat] == [1.0, 3.0]
+    assert heat[1].rate == pytest.approx(0.07)
+    cool = store.samples("den", "cool")
+    assert cool[0].rate is None and cool[0].outcome == REJECTED
+    assert store.samples("office", "heat") == []
+
+
+def test_ring_overwrites_the_oldest_samples(path):
+    store = EfficiencySampleStore(path, capacity=3)
+    for ts in range(1, 6):
+        store.append("den", "heat", _sample(float(ts)))
+
+    assert [s.timestamp for s in store.samples("den", "heat")] == [3.0, 4.0, 5.0]
+
+
+def test_file_is_fixed_size_per_ring(path):
+    store = EfficiencySampleStore(path, capacity=8)
+    for ts in range(1, 20):
+        store.extend([
+            ("den", "heat", _sample(float(ts))),
+            ("office", "heat", _sample(float(ts))),
+        ])
+    store.close()
+
+    assert os.path.getsize(path) == HEADER.size + 2 * (
+        RING_HEADER.size + 8 * RECORD.size
+    )
+
+
+def test_reopened_file_resumes_each_ring(path):
+    store = EfficiencySampleStore(path, capacity=3)
+    for ts in range(1, 5):
+        store.append("den", "heat", _sample(float(ts)))
+    store.append("office", "cool", _sample(9.0))
+    store.close()
+
+    # The file's capacity wins over the one asked for.
+    reopened = EfficiencySampleStore(path, capacity=100)
+    reopened.append("den", "heat", _sample(5.0))
+
+    assert reopened.capacity == 3
+    assert [s.timestamp for s in reopened.samples("den", "heat")] == [3.0, 4.0, 5.0]
+    assert reopened.summary() == {
+        "den": {"heat": {"samples": 3, "accepted": 3, "median_rate": 0.05}},
+        "office": {"cool": {"samples": 1, "accepted": 1, "median_rate": 0.05}},
+    }
+
+
+def test_partial_trailing_region_is_dropped(path):
+    store = EfficiencySampleStore(path, capacity=2)
+    store.append("den", "heat", _sample(1.0))
+    store.close()
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 10)
+
+    reopened = EfficiencySampleStore(path, capacity=2)
+    reopened.append("office", "heat", _sample(2.0))
+
+    assert [s.timestamp for s in reopened.samples("office", "heat")] == [2.0]
+    assert [s.timestamp for s in reopened.samples("den", "heat")] == [1.0]
+
+
+def test_long_room_keys_get_separate_rings(path):
+    store = EfficiencySampleStore(path, capacity=2)
+    first = "upstairs_" * 8 + "north"
+    second = "upstairs_" * 8 + "south"
+    store.append(first, "heat", _sample(1.0))
+    store.append(second, "heat", _sample(2.0))
+
+    assert [s.timestamp for s in store.samples(first, "heat")] == [1.0]
+    assert [s.timestamp for s in store.samples(second, "heat")] == [2.0]
+    assert all(len(key.encode()) < RING_HEADER.size for key, _ in store.rings())
+    # The summary maps shortened ring keys back to the configured rooms.
+    assert set(store.summary([first, second])) == {first, second}
+
+
+def test_removed_rooms_release_their_rings(path):
+    store = EfficiencySampleStore(path, capacity=2)
+    for room in ("den", "office", "attic"):
+        store.append(room, "heat", _sample(1.0))
+    region = RING_HEADER.size + 2 * RECORD.size
+
+    assert store.retain(["den", "attic"]) == 1
+    assert os.path.getsize(path) == HEADER.size + 3 * region
+    # A new ring reuses the released region, without its old samples.
+    store.append("garage", "cool", _sample(2.0))
+    assert os.path.getsize(path) == HEADER.size + 3 * region
+    assert [s.timestamp for s in store.samples("garage", "cool")] == [2.0]
+    store.close()
+
+    reopened = EfficiencySampleStore(path)
+    assert reopened.retain(["den"]) == 2
+    # Released regions at the end of the file are truncated away.
+    assert os.path.getsize(path) == HEADER.size + region
+    assert sorted(reopened.rings()) == [("den", "heat")]
+    assert [s.timestamp for s in reopened.samples("den", "heat")] == [1.0]
+
+
+def test_foreign_file_is_rejected(path):
+    with open(path, "wb") as f:
+        f.write(b"not a sample file at all")
+
+    with pytest.raises(ValueError):
+        EfficiencySampleStore(path).samples("den", "heat")
+
+
+def test_sample_mode():
+    assert sample_mode("cooling") == "cool"
+    assert sample_mode("heat") == "heat"
@@ -0,0 +1,43 @@
+"""Vent control script plan tests."""
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smart_vent_controller.algorithm import RoomBatch
+from custom_components.smart_vent_controller.const import DOMAIN
+from custom_components.smart_vent_controller.scripts import VentControlScript
+
+
+def _script(hass):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"main_thermostat": "climate.main", "rooms": []},
+        options={},
+    )
+    entry.add_to_hass(hass)
+    return VentControlScript(hass, entry)
+
+
+def _house():
+    # Two closed rooms that need heat and one warm room held at min-open.
+    rooms = RoomBatch()
+    rooms.append("a", 68.0, 0.1, True, 4.0)
+    rooms.append("b", 68.0, 0.1, True, 4.0)
+    rooms.append("c", 73.0, 0.1, False, -1.0)
+    return {"a": 0.0, "b": 0.0}, {"c": 10.0}, rooms
+
+
+async def test_joint_plan_counts_closed_vents_after_the_airflow_boost(hass):
+    script = _script(hass)
+    # closed_thr 5, relief_pct 50, max_relief 1
+    args = (["a", "b"], "heat", "heating", "heating", 5, 0, 5, 50, 1)
+
+    targets, floors, rooms = _house()
+    sequential = script._sequential_plan(targets, floors, rooms, *args, False)
+    targets, floors, rooms = _house()
+    joint = await script._async_solve_joint_plan(
+        targets, floors, rooms, *args, 1.0, False
+    )
+
+    # The boost opens a and b past the closed threshold, so neither plan
+    # opens c as a relief vent.
+    assert sequential == {"a": 30, "b": 30, "c": 10}
+    assert joint == sequential
@@ -0,0 +1,181 @@
+"""Tests for the per-refresh house snapshot."""
+import dataclasses
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smart_vent_controller.cache import (
+    EntityStateCache,
+    RoomDataCache,
+)
+from custom_components.smart_vent_controller.const import DOMAIN
+from custom_components.smart_vent_controller.coordinator import (
+    SmartVentControllerCoordinator,
+)
+from custom_components.smart_vent_controller.snapshot import (
+    build_house_snapshot,
+    update_house_snapshot,
+)
+from custom_components.smart_vent_controller.topology import RoomTopology
+
+ROOMS = [
+    {
+        "name": "Living Room",
+        "temp_sensor": "sensor.living",
+        "climate_entity": "climate.living",
+        "occupancy_sensor": "binary_sensor.living",
+        "vent_entities": ["cover.living_1", "cover.living_2"],
+    },
+    {
+        "name": "Den",
+        "temp_sensor": "sensor.den",
+        "climate_entity": "climate.den",
+        "vent_entities": ["cover.den"],
+    },
+]
+
+TOPOLOGY = RoomTopology(ROOMS, "climate.main")
+
+
+def _set_states(hass):
+    hass.states.async_set("climate.main", "heat", {"hvac_action": "heating"})
+    hass.states.async_set("sensor.living", "68.5")
+    hass.states.async_set(
+        "climate.living", "heat", {"temperature": 72.0, "current_temperature": 70.0}
+    )
+    hass.states.async_set("binary_sensor.living", "on")
+    hass.states.async_set("cover.living_1", "open", {"current_position": 40})
+    hass.states.async_set("cover.living_2", "unavailable", {"current_position": 60})
+    hass.states.async_set("sensor.den", "unavailable")
+    hass.states.async_set(
+        "climate.den",
+        "heat_cool",
+        {"target_temp_low": 68.0, "target_temp_high": 74.0, "current_temperature": 69.0},
+    )
+
+
+async def _coordinator(hass):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"main_thermostat": "climate.main", "rooms": ROOMS},
+        options={"require_occupancy": False},
+    )
+    entry.add_to_hass(hass)
+    coordinator = SmartVentControllerCoordinator(hass, entry)
+    await coordinator.async_initialize()
+    return coordinator
+
+
+async def test_snapshot_resolves_room_readings(hass):
+    _set_states(hass)
+    snapshot = build_house_snapshot(hass, TOPOLOGY, {"den": 70.0}.get)
+
+    living = snapshot.rooms["living_room"]
+    assert living.current_temp == 68.5
+    assert living.target_temp == 72.0
+    assert living.delta == pytest.approx(3.5)
+    assert living.occupied is True
+    assert [v.available for v in living.vents] == [True, False]
+    assert living.vent_avg == 50.0
+
+    den = snapshot.rooms["den"]
+    assert den.current_temp == 69.0  # falls back to the climate entity
+    assert den.climate_target == 71.0
+    assert den.target_temp == 70.0  # integration setpoint wins
+    assert den.has_occupancy_sensor is False
+
+    assert snapshot.thermostat.hvac_action == "heating"
+    assert list(snapshot.rooms) == ["living_room", "den"]
+
+
+async def test_implausible_sensor_reading_falls_back_to_climate(hass):
+    _set_states(hass)
+    hass.states.async_set("sensor.living", "-40")
+
+    snapshot = build_house_snapshot(hass, TOPOLOGY)
+
+    assert snapshot.rooms["living_room"].current_temp == 70.0
+
+
+async def test_snapshot_is_immutable(hass):
+    _set_states(hass)
+    snapshot = build_house_snapshot(hass, TOPOLOGY)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.rooms["den"].current_temp = 1.0
+    with pytest.raises(TypeError):
+        snapshot.rooms["new"] = snapshot.rooms["den"]
+
+
+async def test_refresh_feeds_coordinator_data(hass):
+    _set_states(hass)
+    coordinator = await _coordinator(hass)
+
+    data = await coordinator._async_update_data()
+
+    assert data["living_room_temp"] == coordinator.snapshot.rooms["living_room"].current_temp
+    assert data["living_room_vent_avg"] == 50.0
+    assert data["living_room_occupied"] is True
+    assert "den_occupied" not in data
+    assert data["hvac_action"] == "heating"
+
+
+async def test_consumers_share_the_refresh_snapshot(hass):
+    _set_states(hass)
+    coordinator = await _coordinator(hass)
+    await coordinator._async_update_data()
+    snapshot = coordinator.snapshot
+
+    # A later reading is not visible until the next refresh.
+    hass.states.async_set("sensor.living", "75.0")
+    await hass.async_block_till_done()
+    assert coordinator.snapshot is snapshot
+    assert coordinator.snapshot.rooms["living_room"].current_temp == 68.5
+    assert "living_room" in coordinator.get_rooms_to_condition_value(snapshot).split(",")
+
+    # Without a snapshot the rooms-to-condition check reads current states.
+    assert "living_room" not in coordinator.get_rooms_to_condition_value().split(",")
+    assert coordinator.snapshot.rooms["living_room"].current_temp == 75.0
+
+
+async def test_update_rereads_only_invalidated_rooms(hass):
+    _set_states(hass)
+    room_cache = RoomDataCache(ttl_seconds=None)
+    entity_cache = EntityStateCache(ttl_seconds=None)
+    previous = update_house_snapshot(hass, TOPOLOGY, room_cache, entity_cache)
+    hass.states.async_set("sensor.living", "71.0")
+    hass.states.async_set("sensor.den", "60.0")
+    room_cache.invalidate_room("living_room")
+
+    snapshot = update_house_snapshot(
+        hass, TOPOLOGY, room_cache, entity_cache, {"den": 70.0}.get
+    )
+
+    assert snapshot.rooms["living_room"].current_temp == 71.0
+    # Den was not invalidated: its reading is carried over, its setpoint is not.
+    assert snapshot.rooms["den"].current_temp == 69.0
+    assert snapshot.rooms["den"].setpoint == 70.0
+    assert snapshot.thermostat == previous.thermostat
+    assert room_cache.stats()["misses"] == 3
+    assert entity_cache.stats()["hits"] == 1
+
+
+async def test_poll_rereads_rooms_changed_since_last_poll(hass):
+    _set_states(hass)
+    coordinator = await _coordinator(hass)
+    await coordinator._async_update_data()
+    den = coordinator.snapshot.rooms["den"]
+    reread = coordinator.rooms_reread
+
+    hass.states.async_set("cover.living_1", "open", {"current_position": 80})
+    await hass.async_block_till_done()
+    data = await coordinator._async_update_data()
+
+    assert coordinator.changed_rooms == {"living_room"}
+    assert data["rooms_changed"] == 1
+    assert data["living_room_vent_avg"] == 70.0
+    assert coordinator.snapshot.rooms["den"] is den
+    assert coordinator.rooms_reread == reread + 1
+
+    await coordinator._async_update_data()
+    assert coordinator.state_index_stats()["rooms_changed_last_interval"] == 0
+    coordinator.async_stop_tracking()
@@ -0,0 +1,85 @@
+"""Tests for the single-lookup state access layer."""
+from unittest.mock import patch
+
+from homeassistant.core import StateMachine
+
+from custom_components.smart_vent_controller.error_handling import (
+    get_safe_attribute,
+    get_safe_state,
+    validate_entity_state,
+)
+from custom_components.smart_vent_controller.state_access import (
+    get_available_state,
+    read_float,
+    read_position,
+    read_room_temperature,
+    read_target_temperature,
+)
+
+
+async def test_available_state_checks_domain_and_availability(hass):
+    hass.states.async_set("sensor.temp", "70.5")
+    hass.states.async_set("sensor.gone", "unavailable")
+
+    assert get_available_state(hass, "sensor.temp").state == "70.5"
+    assert get_available_state(hass, "sensor.temp", "climate") is None
+    assert get_available_state(hass, "sensor.gone") is None
+    assert get_available_state(hass, "sensor.missing") is None
+    assert get_available_state(hass, "") is None
+    assert get_available_state(hass, None) is None
+
+
+async def test_validation_never_lists_entity_ids(hass):
+    hass.states.async_set("cover.vent", "open", {"current_position": 40})
+
+    with patch.object(
+        StateMachine, "async_entity_ids", autospec=True
+    ) as ids_mock, patch.object(
+        StateMachine, "get", autospec=True, side_effect=StateMachine.get
+    ) as get_mock:
+        assert validate_entity_state(hass, "cover.vent", "cover") is True
+        assert get_safe_state(hass, "cover.vent") == "open"
+        assert get_safe_attribute(hass, "cover.vent", "current_position") == 40
+
+    assert ids_mock.call_count == 0
+    assert get_mock.call_count == 3
+
+
+async def test_read_float_parses_and_bounds(hass):
+    hass.states.async_set("sensor.temp", "71.2")
+    hass.states.async_set("sensor.bad", "warm")
+
+    assert read_float(hass, "sensor.temp") == 71.2
+    assert read_float(hass, "sensor.temp", max_val=70.0) is None
+    assert read_float(hass, "sensor.bad") is None
+
+
+async def test_read_position(hass):
+    hass.states.async_set("cover.ok", "open", {"current_position": 55})
+    hass.states.async_set("cover.no_pos", "open")
+    hass.states.async_set("cover.off", "unavailable", {"current_position": 55})
+
+    assert read_position(hass, "cover.ok") == 55
+    assert read_position(hass, "cover.no_pos", default=30) == 30
+    assert read_position(hass, "cover.off", default=30) is None
+    assert read_position(hass, "sensor.not_a_cover", default=30) is None
+
+
+async def test_room_temperature_falls_back_to_climate(hass):
+    hass.states.async_set("sensor.room", "unknown")
+    hass.states.async_set("climate.room", "heat", {"current_temperature": 68.0})
+
+    assert read_room_temperature(hass, "sensor.room", "climate.room") == 68.0
+    hass.states.async_set("sensor.room", "69.5")
+    assert read_room_temperature(hass, "sensor.room", "climate.room") == 69.5
+
+
+async def test_target_temperature_uses_range_midpoint(hass):
+    hass.states.async_set(
+        "climate.room", "heat_cool", {"target_temp_low": 68.0, "target_temp_high": 74.0}
+    )
+    assert read_target_temperature(hass, "climate.room") == 71.0
+
+    hass.states.async_set("climate.room", "heat", {"temperature": 72.0})
+    assert read_target_temperature(hass, "climate.room") == 72.0
+    assert read_target_temperature(hass, "climate.room", max_val=70.0) is None
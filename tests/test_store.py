@@ -1,4 +1,6 @@
 """Tests for the SmartVentStore persistence layer."""
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 
 from custom_components.smart_vent_controller.store import SmartVentStore
@@ -114,3 +116,258 @@ class TestExportImport:
         assert store2.get_heating_rate("a") == 0.1
         assert store2.get_cooling_rate("b") == 0.2
         assert store2.max_running_minutes == 45.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def coalescing_store(hass):
+    clock = FakeClock()
+    store = SmartVentStore(
+        hass,
+        "coalesce",
+        save_delay=5,
+        max_save_delay=30,
+        runtime_checkpoint=300,
+        clock=clock,
+    )
+    for store_file in (store._durable, store._runtime):
+        store_file.store = MagicMock()
+        store_file.store.async_save = AsyncMock()
+    return store, clock
+
+
+class TestSaveCoalescing:
+    def test_writes_are_delayed_but_never_past_the_max_delay(self, coalescing_store):
+        store, clock = coalescing_store
+        durable = store._durable.store
+        delays = []
+        for step in (0, 4, 20, 4, 4):
+            clock.now += step
+            store.set_room_setpoint("den", 70.0 + step)
+            store.schedule_save()
+            delays.append(durable.async_delay_save.call_args.args[1])
+
+        assert delays == [5, 5, 5, 2, 0]
+        assert store.dirty
+        assert store._durable.writes == 0
+
+    def test_delayed_write_clears_dirty(self, coalescing_store):
+        store, clock = coalescing_store
+        store.set_heating_rate("den", 0.2)
+        store.schedule_save()
+        data_func = store._durable.store.async_delay_save.call_args.args[0]
+
+        assert data_func()["heating_rates"] == {"den": 0.2}
+        assert not store.dirty
+
+        # The next change starts a new max-delay window.
+        clock.now += 100
+        store.set_heating_rate("den", 0.3)
+        store.schedule_save()
+        assert store._durable.store.async_delay_save.call_args.args[1] == 5
+        assert store.save_stats()["durable"] == {
+            "dirty": True,
+            "save_requests": 2,
+            "writes": 1,
+        }
+
+    async def test_flush_writes_only_pending_changes(self, coalescing_store):
+        store, _ = coalescing_store
+
+        await store.async_flush()
+        store._durable.store.async_save.assert_not_called()
+
+        store.set_room_setpoint("den", 71.0)
+        store.schedule_save()
+        await store.async_flush()
+        store._durable.store.async_save.assert_awaited_once()
+        store._runtime.store.async_save.assert_not_called()
+        assert not store.dirty
+
+
+class TestHotColdSplit:
+    def test_runtime_changes_only_checkpoint_the_runtime_file(self, coalescing_store):
+        store, clock = coalescing_store
+        for step in range(3):
+            clock.now += 60
+            store.set_vent_last_adjusted("cover.den", clock.now)
+            store.last_thermostat_setpoint = 70.0 + step
+            store.schedule_save()
+
+        store._durable.store.async_delay_save.assert_not_called()
+        runtime = store._runtime.store.async_delay_save
+        assert [c.args[1] for c in runtime.call_args_list] == [300, 240, 180]
+        data = runtime.call_args.args[0]()
+        assert data["vent_last_adjusted"] == {"cover.den": 1180.0}
+        assert "heating_rates" not in data
+
+    def test_learned_rates_go_to_the_durable_file(self, coalescing_store):
+        store, _ = coalescing_store
+        store.set_cooling_rate("den", 0.1)
+        store.cycle_end_ts = 5.0
+        store.schedule_save()
+
+        durable = store._durable.store.async_delay_save.call_args.args[0]()
+        runtime = store._runtime.store.async_delay_save.call_args.args[0]()
+        assert durable == {"cooling_rates": {"den": 0.1}}
+        assert runtime == {"cycle_end_ts": 5.0}
+
+    async def test_single_file_data_is_split_on_load(self, coalescing_store):
+        store, _ = coalescing_store
+        store._durable.store.async_load = AsyncMock(return_value={
+            "heating_rates": {"den": 0.2},
+            "vent_last_adjusted": {"cover.den": 10.0},
+            "cycle_start_ts": 3.0,
+        })
+        store._runtime.store.async_load = AsyncMock(return_value=None)
+
+        await store.async_load()
+
+        assert store.get_heating_rate("den") == 0.2
+        assert store.get_vent_last_adjusted("cover.den") == 10.0
+        assert store.cycle_start_ts == 3.0
+        assert store._durable.data == {"heating_rates": {"den": 0.2}}
+        store._durable.store.async_delay_save.assert_called_once()
+        store._runtime.store.async_delay_save.assert_called_once()
+
+
+async def _journal_store(hass, tmp_path, journal=True):
+    store = SmartVentStore(hass, "journal", journal=journal)
+    store._durable.journal_file = str(tmp_path / "durable.journal")
+    await store.async_load()
+    return store
+
+
+class TestJournal:
+    async def test_changes_are_appended_and_replayed(self, hass, tmp_path):
+        store = await _journal_store(hass, tmp_path)
+        store.set_heating_rate("den", 0.2)
+        store.set_room_override("den", 99.0)
+        store.clear_room_override("den")
+        store.schedule_save()
+        await hass.async_block_till_done()
+
+        assert (tmp_path / "durable.journal").read_text().splitlines() == [
+            '["i","heating_rates","den",0.2]',
+            '["i","room_overrides","den",{"until":99.0}]',
+            '["d","room_overrides","den"]',
+        ]
+        assert store.save_stats()["durable"]["journal"]["appends"] == 1
+
+        reloaded = await _journal_store(hass, tmp_path)
+        assert reloaded.get_heating_rate("den") == 0.2
+        assert reloaded.get_room_override_until("den") is None
+
+    async def test_journal_is_compacted_past_the_threshold(self, hass, tmp_path):
+        store = await _journal_store(hass, tmp_path)
+        store._durable.compact_bytes = 100
+        for step in range(6):
+            store.set_heating_rate(f"room_{step}", 0.1)
+            store.schedule_save()
+            await hass.async_block_till_done()
+
+        stats = store.save_stats()["durable"]["journal"]
+        assert stats["compactions"] == 1
+        assert stats["bytes"] < 100
+
+        reloaded = await _journal_store(hass, tmp_path)
+        assert all(reloaded.get_heating_rate(f"room_{step}") == 0.1 for step in range(6))
+
+    async def test_torn_record_is_ignored(self, hass, tmp_path):
+        (tmp_path / "durable.journal").write_text(
+            '["i","cooling_rates","den",0.3]\n["i","cooling_rates","of'
+        )
+
+        store = await _journal_store(hass, tmp_path)
+
+        assert store.get_cooling_rate("den") == 0.3
+        assert store.get_cooling_rate("office") == 0
+
+    async def test_changes_after_a_torn_record_survive_a_reload(self, hass, tmp_path):
+        (tmp_path / "durable.journal").write_text(
+            '["i","cooling_rates","den",0.3]\n["i","cooling_rates","of'
+        )
+        store = await _journal_store(hass, tmp_path)
+        store.set_cooling_rate("office", 0.4)
+        store.set_heating_rate("den", 0.2)
+        store.schedule_save()
+        await hass.async_block_till_done()
+
+        reloaded = await _journal_store(hass, tmp_path)
+
+        assert reloaded.get_cooling_rate("den") == 0.3
+        assert reloaded.get_cooling_rate("office") == 0.4
+        assert reloaded.get_heating_rate("den") == 0.2
+
+    async def test_leftover_journal_is_folded_in_when_disabled(self, hass, tmp_path):
+        (tmp_path / "durable.journal").write_text('["s","max_running_minutes",90.0]\n')
+
+        store = await _journal_store(hass, tmp_path, journal=False)
+        await hass.async_block_till_done()
+
+        assert store.max_running_minutes == 90.0
+        assert not (tmp_path / "durable.journal").exists()
+        reloaded = await _journal_store(hass, tmp_path, journal=False)
+        assert reloaded.max_running_minutes == 90.0
+
+
+class TestGarbageCollection:
+    def _populate(self, store):
+        for room in ("den", "old_den"):
+            store.set_heating_rate(room, 0.1)
+            store.set_cooling_rate(room, 0.1)
+            store.set_room_setpoint(room, 70.0)
+            store.set_cycle_start_temp(room, 68.0)
+        store.set_room_override("den", 500.0)
+        store.set_room_override("office", 2000.0)
+        store.set_vent_last_adjusted("cover.den", 900.0)
+        store.set_vent_last_adjusted("cover.den_recent", 990.0)
+        store.set_vent_last_adjusted("cover.swapped", 990.0)
+
+    def test_removes_entries_of_unconfigured_rooms_and_vents(self, store):
+        self._populate(store)
+
+        result = store.collect_garbage(
+            ["den", "office"], ["cover.den", "cover.den_recent"], now_ts=1000.0
+        )
+
+        assert store.get_heating_rate("old_den") == 0
+        assert store.get_room_setpoint("old_den") is None
+        assert store.get_cycle_start_temp("old_den") is None
+        assert store.get_heating_rate("den") == 0.1
+        # Expired overrides go too; live ones stay.
+        assert store.get_room_override_until("den") is None
+        assert store.get_room_override_until("office") == 2000.0
+        assert store.get_vent_last_adjusted("cover.swapped") == 0
+        assert store.get_vent_last_adjusted("cover.den") == 900.0
+        assert result["removed"] == 6
+        assert result["bytes_reclaimed"] > 0
+        assert store.save_stats()["garbage_collection"]["removed"] == 6
+
+    def test_age_eviction_is_optional(self, store):
+        self._populate(store)
+        vents = ["cover.den", "cover.den_recent", "cover.swapped"]
+
+        store.collect_garbage(["den", "old_den", "office"], vents, now_ts=1000.0)
+        assert store.get_vent_last_adjusted("cover.den") == 900.0
+
+        store.collect_garbage(
+            ["den", "old_den", "office"], vents, now_ts=1000.0, max_age=50
+        )
+        assert store.get_vent_last_adjusted("cover.den") == 0
+        assert store.get_vent_last_adjusted("cover.den_recent") == 990.0
+
+    def test_nothing_is_removed_without_configured_rooms(self, store):
+        self._populate(store)
+
+        result = store.collect_garbage([], [], now_ts=0.0)
+
+        assert result == {"removed": 0, "bytes_reclaimed": 0}
+        assert store.get_heating_rate("old_den") == 0.1
@@ -0,0 +1,75 @@
+"""Tests for the compiled room topology."""
+from custom_components.smart_vent_controller.topology import RoomTopology, room_key
+
+ROOMS = [
+    {
+        "name": "Living Room",
+        "temp_sensor": "sensor.living",
+        "climate_entity": "climate.shared",
+        "occupancy_sensor": "binary_sensor.living",
+        "vent_entities": ["cover.living_1", "cover.living_2"],
+        "priority": 8,
+    },
+    {
+        "name": "Den",
+        "climate_entity": "climate.shared",
+        "vent_entities": ["cover.den", "cover.living_2"],
+    },
+]
+
+
+def test_room_key():
+    assert room_key("Master Bedroom") == "master_bedroom"
+
+
+def test_compiles_rooms_in_order():
+    topology = RoomTopology(ROOMS, "climate.main")
+
+    assert len(topology) == 2
+    assert topology.keys == ("living_room", "den")
+    assert topology.ids == {"living_room": 0, "den": 1}
+    living = topology.get("living_room")
+    assert living.id == 0
+    assert living.vents == ("cover.living_1", "cover.living_2")
+    assert living.priority == 8
+    den = topology.get("den")
+    assert den.temp_sensor is None
+    assert den.priority == 5
+    assert topology.find("Den") is den
+    assert topology.get("attic") is None
+
+
+def test_entity_reverse_index():
+    topology = RoomTopology(ROOMS, "climate.main")
+
+    assert topology.entity_rooms["sensor.living"] == (0,)
+    assert topology.entity_rooms["climate.shared"] == (0, 1)
+    assert topology.entity_rooms["cover.living_2"] == (0, 1)
+    assert "climate.main" not in topology.entity_rooms
+    assert topology.tracked_entities()[-1] == "climate.main"
+    assert topology.vents == ("cover.living_1", "cover.living_2", "cover.den")
+
+
+def test_parse_csv_keeps_known_rooms():
+    topology = RoomTopology(ROOMS)
+
+    assert topology.parse_csv("den, attic,living_room") == ["den", "living_room"]
+    assert topology.parse_csv("none") == []
+    assert topology.parse_csv("") == []
+
+
+def test_duplicate_keys_keep_first_room():
+    topology = RoomTopology(ROOMS + [{"name": "den", "vent_entities": ["cover.x"]}])
+
+    assert len(topology) == 2
+    assert "cover.x" not in topology.entity_rooms
+
+
+def test_is_current_tracks_list_identity():
+    data = {"main_thermostat": "climate.main", "rooms": ROOMS}
+    topology = RoomTopology.from_entry_data(data)
+
+    assert topology.is_current(data)
+    assert topology.is_current(dict(data))
+    assert not topology.is_current({**data, "rooms": list(ROOMS)})
+    assert not topology.is_current({**data, "main_thermostat": "climate.other"})